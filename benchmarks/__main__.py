@@ -0,0 +1,95 @@
+"""
+Run the benchmark suite of the dispatch hot path, no network needed.
+
+:Example:
+
+    $ python -m benchmarks -o before.json
+    $ git checkout my-branch
+    $ python -m benchmarks -o after.json --compare before.json
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from tiny_listener import __version__
+
+from .harness import Result
+
+SUITES = ["routing", "hooks", "dispatch", "timeouts", "memory", "ingress", "codec"]
+
+
+def git_revision() -> str:
+    try:
+        return (
+            subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float) -> int:
+    """Print the change of every result against the baseline, return the number of regressions"""
+    previous = {result["key"]: result for result in baseline}
+    regressions = 0
+    for result in results:
+        old = previous.get(result["key"])
+        if old is None or not old["value"]:
+            continue
+        change = result["value"] / old["value"] - 1
+        worse = -change if result["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{result['key']:<72} {old['value']:>14,.1f} -> {result['value']:>14,.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the tiny-listener dispatch hot path.")
+    parser.add_argument("-s", "--suite", action="append", choices=SUITES, help="Suites to run, default to all.")
+    parser.add_argument("-q", "--quick", action="store_true", help="Smaller workloads, for a smoke test.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    parser.add_argument("-c", "--compare", help="Compare with the results of a previous JSON file.")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1, help="Change counted as a regression.")
+    args = parser.parse_args()
+
+    results: List[Result] = []
+    for suite in args.suite or SUITES:
+        module = importlib.import_module(f".bench_{suite}", __package__)
+        for result in module.run(args.quick):  # type: ignore
+            print(f"{result.key:<72} {result.value:>14,.1f} {result.unit}")
+            results.append(result)
+
+    report = {
+        "meta": {
+            "version": __version__,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "time": time.time(),
+            "quick": args.quick,
+        },
+        "results": [result.to_dict() for result in results],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline['meta']['revision']}:")
+        if compare(report["results"], baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Event frames encoded and decoded by `tiny_listener.codec`, against pickle and JSON.
+"""
+
+import json
+import pickle
+from typing import Any, Callable, Dict, List, Tuple
+
+from tiny_listener import decode_event, encode_event
+
+from .harness import Result, ops_per_sec
+
+SMALL = {"user_id": 12345, "name": "alice", "tags": ["a", "b"], "score": 1.5, "active": True}
+LARGE = {"user_id": 12345, "payload": b"x" * (1 << 16)}
+
+Codec = Tuple[Callable[[str, str, Dict[str, Any]], bytes], Callable[[bytes], Any]]
+
+CODECS: Dict[str, Codec] = {
+    "codec": (encode_event, decode_event),
+    "pickle": (lambda path, cid, data: pickle.dumps((path, cid, data), protocol=5), pickle.loads),
+    "json": (lambda path, cid, data: json.dumps([path, cid, data]).encode(), json.loads),
+}
+
+
+def run(quick: bool = False) -> List[Result]:
+    number = 2000 if quick else 20000
+    results = []
+    for size, data in (("small", SMALL), ("large", LARGE)):
+        for name, (encode, decode) in CODECS.items():
+            if name == "json" and size == "large":
+                continue  # bytes are not JSON serializable
+            frame = encode("/user/12345", "ctx", data)
+            params = {"codec": name, "data": size}
+            results.append(
+                Result("encode", params, ops_per_sec(lambda: encode("/user/1", "ctx", data), number), "ops/s")
+            )
+            results.append(Result("decode", params, ops_per_sec(lambda: decode(frame), number), "ops/s"))
+            results.append(Result("frame_size", params, len(frame), "bytes", higher_is_better=False))
+    return results
@@ -0,0 +1,74 @@
+"""
+`Context.new_event` and `trigger_event` throughput, with and without middleware and timeouts.
+"""
+
+import asyncio
+import time
+from typing import List
+
+from tiny_listener import Listener
+
+from .harness import Result, ops_per_sec
+
+
+class App(Listener):
+    async def listen(self) -> None:
+        ...
+
+
+def build(middleware: bool) -> Listener:
+    app = App()
+
+    @app.on_event("/user/{uid:int}")
+    async def handler() -> None:
+        ...
+
+    if middleware:
+
+        @app.before_event
+        async def before() -> None:
+            ...
+
+        @app.after_event
+        async def after() -> None:
+            ...
+
+    return app
+
+
+def events_per_sec(middleware: bool, timeout: bool, number: int, eager: bool = False) -> float:
+    async def _run() -> float:
+        app = build(middleware)
+        app.eager = eager
+        ctx = app.new_ctx()
+        start = time.perf_counter()
+        for i in range(number):
+            ctx.trigger_event(f"/user/{i}", timeout=10 if timeout else None)
+            ctx.events.clear()
+        await app.drain()
+        return time.perf_counter() - start
+
+    return number / min(asyncio.run(_run()) for _ in range(3))
+
+
+def run(quick: bool = False) -> List[Result]:
+    number = 5000 if quick else 50000
+    results = []
+
+    app = build(False)
+    ctx = app.new_ctx()
+    route = app.routes["handler"]
+
+    def new_event() -> None:
+        ctx.new_event(route, {})
+        ctx.events.clear()
+
+    results.append(Result("new_event", {}, ops_per_sec(new_event, number), "ops/s"))
+
+    for middleware in (False, True):
+        for timeout in (False, True):
+            value = events_per_sec(middleware, timeout, number)
+            results.append(Result("trigger_event", {"middleware": middleware, "timeout": timeout}, value, "events/s"))
+    value = events_per_sec(False, False, number, eager=True)
+    results.append(Result("trigger_event", {"middleware": False, "timeout": False, "eager": True}, value, "events/s"))
+    return results
@@ -0,0 +1,61 @@
+"""
+`_Hook.as_hook` injection cost by number of injected params and nested `Depends` depth.
+"""
+
+from typing import Any, List
+
+from tiny_listener import Context, Data, Depends, Event, Hook, Listener, Param
+
+from .harness import Result, async_ops_per_sec
+
+
+class App(Listener):
+    async def listen(self) -> None:
+        ...
+
+
+def make_params_fn(n: int) -> Any:
+    names = [f"p{i}" for i in range(n)]
+    namespace: dict = {"Param": Param}
+    args = ", ".join(f"{name}: Param" for name in names)
+    exec(f"async def fn({args}):\n    return None", namespace)
+    return namespace["fn"], {name: i for i, name in enumerate(names)}
+
+
+def make_depends_fn(depth: int) -> Any:
+    async def leaf(event: Event, ctx: Context, value: Data) -> Any:
+        return value
+
+    fn = leaf
+    for _ in range(depth):
+
+        async def node(value: Any = Depends(fn, use_cache=False)) -> Any:
+            return value
+
+        fn = node
+    return fn
+
+
+def run(quick: bool = False) -> List[Result]:
+    results = []
+    number = 2000 if quick else 20000
+    app = App()
+
+    async def placeholder() -> None:
+        ...
+
+    app.add_on_event_hook(placeholder, "/placeholder")
+    ctx = app.new_ctx()
+    event = Event(ctx, app.routes["placeholder"], data={"value": 1})
+
+    for n in (0, 1, 5, 10):
+        fn, params = make_params_fn(n)
+        hook = Hook(fn)
+        value = async_ops_per_sec(lambda: hook(event, params), number)
+        results.append(Result("hook_injection", {"params": n}, value, "calls/s"))
+
+    for depth in (1, 3, 5):
+        hook = Hook(make_depends_fn(depth))
+        value = async_ops_per_sec(lambda: hook(event, {}), number)
+        results.append(Result("hook_depends", {"depth": depth}, value, "calls/s"))
+    return results
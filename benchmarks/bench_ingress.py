@@ -0,0 +1,110 @@
+"""
+Records handed from a producer to a consumer: a shared memory ring against a pickling pipe,
+in the same process (the cost of the transport alone) and between two processes.
+"""
+
+import multiprocessing
+import time
+from multiprocessing.connection import Connection
+from typing import List
+
+from tiny_listener import SharedRing
+
+from .harness import Result, ops_per_sec
+
+PAYLOAD = b"x" * 200
+BATCH = 64
+
+
+def ring_throughput(number: int) -> float:
+    ring = SharedRing.create(size=1 << 20)
+
+    def _batch() -> None:
+        for _ in range(BATCH):
+            ring.put("/user/1", PAYLOAD, "cid")
+        ring.get(0, BATCH)
+
+    try:
+        return ops_per_sec(_batch, number) * BATCH
+    finally:
+        ring.close()
+
+
+def pipe_throughput(number: int) -> float:
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+
+    def _batch() -> None:
+        for _ in range(BATCH):
+            sender.send(("/user/1", "cid", PAYLOAD))
+        for _ in range(BATCH):
+            receiver.recv()
+
+    try:
+        return ops_per_sec(_batch, number) * BATCH
+    finally:
+        receiver.close()
+        sender.close()
+
+
+def _ring_consumer(name: str, count: int) -> None:
+    ring = SharedRing.attach(name)
+    received = 0
+    while received < count:
+        received += len(ring.get(0, BATCH))
+    ring.close()
+
+
+def _pipe_consumer(receiver: Connection, count: int) -> None:
+    for _ in range(count):
+        receiver.recv()
+
+
+def ring_process_throughput(count: int) -> float:
+    ring = SharedRing.create(size=1 << 20)
+    consumer = multiprocessing.Process(target=_ring_consumer, args=(ring.name, count))
+    consumer.start()
+    try:
+        start = time.perf_counter()
+        for _ in range(count):
+            while not ring.put("/user/1", PAYLOAD, "cid"):
+                pass
+        consumer.join()
+        return count / (time.perf_counter() - start)
+    finally:
+        ring.close()
+
+
+def pipe_process_throughput(count: int) -> float:
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    consumer = multiprocessing.Process(target=_pipe_consumer, args=(receiver, count))
+    consumer.start()
+    try:
+        start = time.perf_counter()
+        for _ in range(count):
+            sender.send(("/user/1", "cid", PAYLOAD))
+        consumer.join()
+        return count / (time.perf_counter() - start)
+    finally:
+        receiver.close()
+        sender.close()
+
+
+def run(quick: bool = False) -> List[Result]:
+    number = 200 if quick else 2000
+    count = 20000 if quick else 200000
+    return [
+        Result("ingress_records_per_sec", {"transport": "shm_ring"}, ring_throughput(number), "records/s"),
+        Result("ingress_records_per_sec", {"transport": "pipe"}, pipe_throughput(number), "records/s"),
+        Result(
+            "ingress_records_per_sec",
+            {"transport": "shm_ring", "processes": 2},
+            ring_process_throughput(count),
+            "records/s",
+        ),
+        Result(
+            "ingress_records_per_sec",
+            {"transport": "pipe", "processes": 2},
+            pipe_process_throughput(count),
+            "records/s",
+        ),
+    ]
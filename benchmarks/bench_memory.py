@@ -0,0 +1,51 @@
+"""
+Memory held per live context and per live event.
+"""
+
+import asyncio
+import gc
+import tracemalloc
+from typing import List
+
+from tiny_listener import Listener
+
+from .harness import Result
+
+
+class App(Listener):
+    async def listen(self) -> None:
+        ...
+
+
+def bytes_per_item(number: int, events_per_ctx: int) -> float:
+    async def _run() -> float:
+        app = App()
+
+        @app.on_event("/user/{uid:int}")
+        async def handler() -> None:
+            ...
+
+        route = app.routes["handler"]
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(number):
+            ctx = app.new_ctx()
+            for _ in range(events_per_ctx):
+                ctx.new_event(route, {"uid": 1})
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return (after - before) / number
+
+    return asyncio.run(_run())
+
+
+def run(quick: bool = False) -> List[Result]:
+    number = 2000 if quick else 20000
+    per_ctx = bytes_per_item(number, 0)
+    per_ctx_with_event = bytes_per_item(number, 1)
+    return [
+        Result("memory_per_context", {}, per_ctx, "bytes", higher_is_better=False),
+        Result("memory_per_event", {}, per_ctx_with_event - per_ctx, "bytes", higher_is_better=False),
+    ]
@@ -0,0 +1,38 @@
+"""
+`Listener.match_route` against route tables of growing size.
+"""
+
+from typing import List
+
+from tiny_listener import Listener
+
+from .harness import Result, ops_per_sec
+
+
+class App(Listener):
+    async def listen(self) -> None:
+        ...
+
+
+def build(size: int) -> Listener:
+    app = App()
+    for i in range(size):
+
+        async def handler() -> None:
+            ...
+
+        handler.__name__ = f"route_{i}"
+        app.add_on_event_hook(handler, f"/service_{i}/user/{{uid:int}}/{{action}}")
+    return app
+
+
+def run(quick: bool = False) -> List[Result]:
+    results = []
+    for size in (10, 100, 1000) if quick else (10, 100, 1000, 10000):
+        app = build(size)
+        number = max(10, 20000 // size)
+        for position, idx in (("first", 0), ("last", size - 1)):
+            path = f"/service_{idx}/user/42/login"
+            value = ops_per_sec(lambda: app.match_route(path), number)
+            results.append(Result("match_route", {"routes": size, "position": position}, value, "ops/s"))
+    return results
@@ -0,0 +1,92 @@
+"""
+Compare `asyncio.wait_for` with the listener scheduler at many concurrent timed events.
+
+:Example:
+
+    $ python -m benchmarks.bench_timeouts -n 100000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from tiny_listener import Listener, Scheduler
+
+from .harness import Result
+
+
+async def handler(gate: asyncio.Event) -> None:
+    await gate.wait()
+
+
+async def bench_wait_for(n: int) -> float:
+    gate = asyncio.Event()
+
+    async def timed() -> None:
+        await asyncio.wait_for(handler(gate), timeout=10)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(timed()) for _ in range(n)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def bench_scheduler(n: int) -> float:
+    gate = asyncio.Event()
+    scheduler = Scheduler()
+
+    async def timed() -> None:
+        with scheduler.timeout(10):
+            await handler(gate)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(timed()) for _ in range(n)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def bench_trigger_event(n: int) -> float:
+    class App(Listener):
+        async def listen(self) -> None:
+            ...
+
+    app = App()
+    gate = asyncio.Event()
+
+    @app.on_event()
+    async def foo() -> None:
+        await gate.wait()
+
+    start = time.perf_counter()
+    tasks = [app.trigger_event("/foo", timeout=10) for _ in range(n)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def run(quick: bool = False) -> List[Result]:
+    n = 10_000 if quick else 100_000
+    return [
+        Result("timed_events", {"impl": bench.__name__[6:], "concurrency": n}, n / asyncio.run(bench(n)), "events/s")
+        for bench in (bench_wait_for, bench_scheduler, bench_trigger_event)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=100_000, help="Number of concurrent timed events.")
+    args = parser.parse_args()
+
+    for bench in (bench_wait_for, bench_scheduler, bench_trigger_event):
+        elapsed = asyncio.run(bench(args.n))
+        print(f"{bench.__name__:<24} {args.n / elapsed:>12,.0f} events/s  {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
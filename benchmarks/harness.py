@@ -0,0 +1,46 @@
+import asyncio
+import gc
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple
+
+
+class Result(NamedTuple):
+    name: str
+    params: Dict[str, Any]
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]" if params else self.name
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"key": self.key, **self._asdict()}
+
+
+def ops_per_sec(fn: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Best throughput of `repeat` runs of `number` calls"""
+    timings = []
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append(time.perf_counter() - start)
+    return number / min(timings)
+
+
+def async_ops_per_sec(fn: Callable[[], Awaitable[Any]], number: int, repeat: int = 5) -> float:
+    """Best throughput of `repeat` runs of `number` awaited calls, in a fresh event loop"""
+
+    async def _run() -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        return time.perf_counter() - start
+
+    gc.collect()
+    timings = [asyncio.run(_run()) for _ in range(repeat)]
+    return number / min(timings)
@@ -13,7 +13,6 @@ See: https://molto0504.github.io/tiny-listener/usage-mqtt-client/
     INFO: bedroom       20 ℃
 """
 
-import asyncio
 import random
 
 from asyncio_mqtt import Client
@@ -27,7 +26,7 @@ class App(Listener):
     async def listen(self):
         async with Client(SERVER_HOST) as client:
             await client.subscribe("/iot/home/+/temperature")
-            self.trigger_event("/mock_iot_device", data={"client": client})
+            self.add_periodic_event("/mock_iot_device", interval=1, data={"client": client})
             async with client.messages() as messages:
                 # keep listening mqtt messages and trigger `handle_mqtt_msg` event
                 async for msg in messages:
@@ -40,12 +39,10 @@ app = App()
 
 @app.on_event("/mock_iot_device")
 async def mock_iot_device(client: Data):
-    """Mock an IoT device that publishes temperature data"""
-    while True:
-        room = random.choices(["living_room", "kitchen", "bedroom", "bathroom", "balcony"])[0]
-        temperature = random.randint(10, 30)
-        await client.publish(f"/iot/home/{room}/temperature", temperature)
-        await asyncio.sleep(1)
+    """Mock an IoT device that publishes temperature data every second"""
+    room = random.choices(["living_room", "kitchen", "bedroom", "bathroom", "balcony"])[0]
+    temperature = random.randint(10, 30)
+    await client.publish(f"/iot/home/{room}/temperature", temperature)
 
 
 @app.on_event("/iot/home/{room}/temperature")
@@ -15,44 +15,69 @@ See: https://molto0504.github.io/tiny-listener/usage-rabbitmq-consumer/
 """
 
 import asyncio
+from typing import AsyncIterator, List
 
 import aio_pika
 
-from tiny_listener import Data, Listener, Param
+from tiny_listener import Broker, Data, Message, Param, QueueConsumerListener
 
 
-class App(Listener):
-    def __init__(self):
-        super().__init__()
+class AioPikaBroker(Broker):
+    def __init__(self, url: str, queue: str):
+        self.url = url
+        self.queue_name = queue
         self.conn = None
-
+        self.channel = None
+        self.queue = None
+
+    async def connect(self):
+        self.conn = await aio_pika.connect_robust(self.url)
+        self.channel = await self.conn.channel()
+        self.queue = await self.channel.declare_queue(self.queue_name, auto_delete=True)
+
+    async def consume(self, prefetch: int) -> AsyncIterator[Message]:
+        await self.channel.set_qos(prefetch_count=prefetch)
+        async with self.queue.iterator() as messages:
+            async for msg in messages:
+                yield Message(
+                    msg.delivery_tag,
+                    f"/app/{msg.app_id}/consume",
+                    msg.body,
+                    msg.headers,
+                    msg.timestamp.timestamp() if msg.timestamp else None,
+                    msg.redelivered,
+                    raw=msg,
+                )
+
+    async def ack(self, messages: List[Message]):
+        for message in messages:
+            await message.raw.ack()
+
+    async def nack(self, messages: List[Message], requeue: bool):
+        for message in messages:
+            await message.raw.nack(requeue=requeue)
+
+    async def close(self):
+        await self.conn.close()
+
+
+class App(QueueConsumerListener):
     async def listen(self):
-        self.conn = await aio_pika.connect_robust("amqp://127.0.0.1/")
-        async with self.conn:
-            channel = await self.conn.channel()
-            queue = await channel.declare_queue("test_queue", auto_delete=True)
-            app.trigger_event("/mock_producer", data={"channel": channel})
-            async with queue.iterator() as msg_queue:
-                async for msg in msg_queue:
-                    async with msg.process():
-                        app.trigger_event(f"/app/{msg.app_id}/consume", data={"data": msg.body})
-
-
-app = App()
+        await super().listen()
+        self.trigger_event("/mock_producer")
 
 
-@app.shutdown
-async def shutdown():
-    await app.conn.close()
+app = App(AioPikaBroker("amqp://127.0.0.1/", "test_queue"), prefetch=10)
 
 
 @app.on_event("/mock_producer")
-async def produce(channel: Data):
+async def produce():
     for i in range(10):
-        await channel.default_exchange.publish(aio_pika.Message(body=bytes(i), app_id=str(i)), routing_key="test_queue")
+        message = aio_pika.Message(body=bytes(i), app_id=str(i))
+        await app.broker.channel.default_exchange.publish(message, routing_key="test_queue")
         await asyncio.sleep(1)
 
 
 @app.on_event("/app/{app_id}/consume")
-async def consume(data: Data, app_id: Param):
-    print(f"INFO: App[{app_id}] consume: {data}")
+async def consume(message: Data, app_id: Param):
+    print(f"INFO: App[{app_id}] consume: {message.body}")
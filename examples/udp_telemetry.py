@@ -0,0 +1,18 @@
+"""
+See: https://molto0504.github.io/tiny-listener/usage-udp-telemetry/
+"""
+
+from collections import Counter
+
+from tiny_listener import Data, UDPListener
+
+app = UDPListener("127.0.0.1", 8125, batch_event="metrics")
+counters: Counter = Counter()
+
+
+@app.on_event("metrics")
+async def metrics(datagrams: Data):
+    for payload, _ in datagrams:
+        name, _, value = payload.decode().partition(":")
+        counters[name] += int(value.split("|")[0] or 1)
+    print(dict(counters))
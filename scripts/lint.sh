@@ -3,7 +3,7 @@
 set -e
 set -x
 
-paths=( "tiny_listener" "tests" "examples")
+paths=( "tiny_listener" "tests" "examples" "benchmarks")
 
 isort \
 --combine-as \
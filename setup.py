@@ -18,6 +18,9 @@ setup(
     install_requires=[
         "click>=8.1.3",
     ],
+    extras_require={
+        "http": ["httptools"],
+    },
     license="MIT",
     classifiers=[
         "Intended Audience :: Developers",
@@ -0,0 +1,180 @@
+import asyncio
+import signal
+import time
+
+import pytest
+
+from tiny_listener import (
+    AdmissionController,
+    EventRejected,
+    InflightPolicy,
+    LagPolicy,
+    Listener,
+    ListenerClosed,
+    ListenerError,
+    LoopMonitor,
+    QueueAgePolicy,
+    Span,
+    SpanExporter,
+    Tracer,
+)
+
+
+class App(Listener):
+    async def listen(self):
+        ...
+
+
+@pytest.mark.asyncio
+async def test_reject():
+    app = App(admission=AdmissionController(InflightPolicy(limit=1)))
+    gate = asyncio.Event()
+
+    @app.on_event("/low")
+    async def low():
+        await gate.wait()
+
+    @app.on_event("/high", priority=1)
+    async def high():
+        await gate.wait()
+
+    task = app.trigger_event("/low")
+    with pytest.raises(EventRejected):
+        app.trigger_event("/low")
+    high_task = app.trigger_event("/high")
+    gate.set()
+    await asyncio.gather(task, high_task)
+    await app.trigger_event("/low")
+
+    routes = app.metrics()["routes"]
+    assert routes["low"]["events"] == 2
+    assert routes["low"]["shed"] == 1
+    assert routes["high"]["events"] == 1
+    assert routes["high"]["shed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_defer():
+    app = App(admission=AdmissionController(InflightPolicy(limit=1), defer=0.02, max_defers=2))
+    gate = asyncio.Event()
+
+    @app.on_event("/work")
+    async def work():
+        await gate.wait()
+        return "done"
+
+    first = app.trigger_event("/work")
+    deferred = app.trigger_event("/work")
+    rejected = app.trigger_event("/work")
+    await asyncio.sleep(0.03)
+    gate.set()
+    await first
+    await deferred
+    assert [event.result for ctx in app.ctxs.values() for event in ctx.events[app.routes["work"]]] == ["done", "done"]
+    with pytest.raises(EventRejected):
+        await rejected
+
+    routes = app.metrics()["routes"]
+    assert routes["work"]["deferred"] == 4
+    assert routes["work"]["shed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_defer_span():
+    spans = []
+
+    class Exporter(SpanExporter):
+        def export(self, span: Span) -> None:
+            spans.append(span)
+
+    app = App(admission=AdmissionController(InflightPolicy(limit=1), defer=0.01), tracer=Tracer(Exporter()))
+    gate = asyncio.Event()
+
+    @app.on_event("/work")
+    async def work():
+        await gate.wait()
+
+    first = app.trigger_event("/work")
+    deferred = app.trigger_event("/work")
+    gate.set()
+    await asyncio.gather(first, deferred)
+    assert len(spans) == 2 and all(span.duration < 1 for span in spans)
+
+
+@pytest.mark.asyncio
+async def test_defer_closed():
+    app = App(admission=AdmissionController(InflightPolicy(limit=0), defer=0.01))
+
+    @app.on_event("/work")
+    async def work():
+        ...
+
+    future = app.trigger_event("/work")
+    app._Listener__exiting.set()  # noqa
+    with pytest.raises(ListenerClosed):
+        await future
+
+
+@pytest.mark.asyncio
+async def test_defer_drain():
+    app = App(admission=AdmissionController(InflightPolicy(limit=1), defer=0.01))
+    gate = asyncio.Event()
+
+    @app.on_event("/work")
+    async def work():
+        await gate.wait()
+
+    first = app.trigger_event("/work")
+    deferred = app.trigger_event("/work")
+    assert await app.drain(0) == 2
+    asyncio.get_event_loop().call_later(0.02, gate.set)
+    await app.graceful_shutdown(signal.SIGINT)
+    assert first.done() and deferred.cancelled() and not app._deferred  # noqa
+
+
+@pytest.mark.asyncio
+async def test_lag_policy():
+    monitor = LoopMonitor()
+    app = App(monitor=monitor, admission=AdmissionController(LagPolicy(target=0.1)))
+
+    @app.on_event()
+    async def foo():
+        ...
+
+    await app.trigger_event("/foo")
+    monitor.lag = 0.2
+    with pytest.raises(EventRejected):
+        app.trigger_event("/foo")
+
+    with pytest.raises(ListenerError, match="LoopMonitor"):
+        App(admission=AdmissionController(LagPolicy(target=0.1)))
+
+
+def test_queue_age():
+    controller = AdmissionController(QueueAgePolicy(target=0.1), decay=0.05)
+    assert controller.queue_age == 0
+    controller.observe_queue_age(10)
+    assert 0 < controller.queue_age < 10
+    age = controller.queue_age
+    time.sleep(0.01)
+    assert controller.queue_age < age
+    assert controller.snapshot() == {"queue_age": pytest.approx(controller.queue_age, abs=1)}
+
+
+@pytest.mark.asyncio
+async def test_queue_age_policy():
+    controller = AdmissionController(QueueAgePolicy(target=0.01), decay=0.01)
+    app = App(admission=controller)
+
+    @app.on_event()
+    async def foo():
+        ...
+
+    task = app.trigger_event("/foo")
+    time.sleep(0.05)
+    await task
+    assert app.metrics()["queue_age"] > 0.01
+    with pytest.raises(EventRejected):
+        app.trigger_event("/foo")
+    await asyncio.sleep(0.1)
+    await app.trigger_event("/foo")
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from tiny_listener import Listener, Param
+from tiny_listener.bench import Template, _Driver, load_templates, run_bench
+
+
+@pytest.fixture
+def app() -> Listener:
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    return App()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '[{"path": "/user/{n}", "weight": 3}, {"path": "/go", "data": {"x": 1}, "cid": "c"}]',
+        '{"path": "/user/{n}", "weight": 3}\n\n{"path": "/go", "data": {"x": 1}, "cid": "c"}\n',
+    ],
+)
+def test_load_templates(content: str):
+    with TemporaryDirectory() as path:
+        filename = os.path.join(path, "events.json")
+        with open(filename, "w") as f:
+            f.write(content)
+        assert load_templates(filename) == [
+            Template("/user/{n}", {}, 3, None),
+            Template("/go", {"x": 1}, 1, "c"),
+        ]
+
+        with open(filename, "w") as f:
+            f.write("[]")
+        with pytest.raises(ValueError):
+            load_templates(filename)
+
+
+def test_template_render():
+    assert Template("/user/{n}", {}).render(3) == "/user/3"
+    assert len(Template("/user/{uuid}", {}).render(3)) == len("/user/") + 36
+    assert Template("/go", {}).render(3) == "/go"
+
+
+@pytest.mark.asyncio
+async def test_run_bench(app: Listener):
+    calls = []
+
+    @app.on_event("/user/{uid:int}")
+    async def user(uid: Param):
+        calls.append(uid)
+        await asyncio.sleep(0.001)
+
+    @app.on_event("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+
+    @app.startup
+    async def startup():
+        calls.append("startup")
+
+    report = await run_bench(
+        app,
+        [Template("/user/{n}", {}), Template("/slow", {})],
+        count=50,
+        concurrency=5,
+        timeout=0.01,
+        seed=0,
+    )
+    assert calls[0] == "startup"
+    assert report.count == 50
+    assert report.routes["user"].count + report.routes["slow"].count == 50
+    assert report.routes["slow"].errors == {"TimeoutError": report.routes["slow"].count}
+    assert report.routes["user"].latency.percentile(0.5) >= 0.001
+    assert json.loads(json.dumps(report.to_dict()))["count"] == 50
+    assert "events/s" in report.format()
+
+
+@pytest.mark.asyncio
+async def test_run_bench_duration_rate(app: Listener):
+    @app.on_event("/go")
+    async def go():
+        ...
+
+    report = await run_bench(app, [Template("/go", {})], count=None, duration=0.1, rate=100)
+    assert 5 <= report.count <= 11
+    assert report.throughput > 0
+
+
+def test_route_name_cache(app: Listener):
+    @app.on_event("/user/{uid:int}")
+    async def user():
+        ...
+
+    driver = _Driver(app, concurrency=1, timeout=None)
+    driver.cache_size = 10
+    assert [driver.route_name(f"/user/{i}") for i in range(100)] == ["user"] * 100
+    assert driver.route_name("/missing") == "<not found>"
+    assert len(driver.names) == 10 and "/missing" in driver.names
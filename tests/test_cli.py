@@ -1,10 +1,11 @@
+import json
 import os
 import sys
 from tempfile import TemporaryDirectory
 
 from click.testing import CliRunner
 
-from tiny_listener import __version__
+from tiny_listener import Recorder, __version__
 from tiny_listener.__main__ import main
 
 
@@ -41,3 +42,69 @@ app = FakeApp()
         result = runner.invoke(main, ["main:app"])
         assert result.exit_code == 0
         assert result.output == "Hello, World!\n"
+
+
+def test_cli_bench():
+    code = """
+from tiny_listener import Listener, Param
+
+class FakeApp(Listener):
+    async def listen(self): ...
+
+app = FakeApp()
+
+@app.on_event("/user/{uid:int}")
+async def user(uid: Param):
+    ...
+
+@app.on_event("/boom")
+async def boom():
+    raise ValueError()
+"""
+    templates = '{"path": "/user/{n}", "weight": 3}\n{"path": "/boom"}\n{"path": "/missing"}\n'
+    with TemporaryDirectory() as path:
+        with open(os.path.join(path, "bench_app.py"), "w") as f:
+            f.write(code)
+        with open(os.path.join(path, "events.jsonl"), "w") as f:
+            f.write(templates)
+
+        runner = CliRunner()
+        args = ["bench", "--app-dir", path, "-t", os.path.join(path, "events.jsonl"), "-n", "100", "--json"]
+        result = runner.invoke(main, args + ["bench_app:app"])
+        assert result.exit_code == 0
+        report = json.loads(result.output)
+        assert report["count"] == 100
+        routes = report["routes"]
+        assert routes["user"]["errors"] == {}
+        assert routes["boom"]["errors"] == {"ValueError": routes["boom"]["count"]}
+        assert routes["<not found>"]["errors"] == {"EventNotFound": routes["<not found>"]["count"]}
+        assert sum(route["count"] for route in routes.values()) == 100
+
+
+def test_cli_replay():
+    code = """
+from tiny_listener import Listener, Param
+
+class FakeApp(Listener):
+    async def listen(self): ...
+
+app = FakeApp()
+
+@app.on_event("/user/{uid:int}")
+async def user(uid: Param):
+    ...
+"""
+    with TemporaryDirectory() as path:
+        with open(os.path.join(path, "replay_app.py"), "w") as f:
+            f.write(code)
+        recording = os.path.join(path, "events.rec")
+        recorder = Recorder(recording)
+        for i in range(10):
+            recorder.record(f"/user/{i}", None, {"i": i}, timestamp=i)
+        recorder.close()
+
+        runner = CliRunner()
+        args = ["replay", "--app-dir", path, "--max-speed", "--json", "replay_app:app", recording]
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        assert json.loads(result.output)["routes"]["user"]["count"] == 10
@@ -0,0 +1,170 @@
+import asyncio
+import socket
+from typing import List
+
+import pytest
+
+from tiny_listener import (
+    Cluster,
+    Event,
+    EventNotFound,
+    HashRing,
+    Listener,
+    Param,
+    RemoteError,
+)
+
+
+class App(Listener):
+    async def listen(self):
+        ...
+
+
+def free_node() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def make_app(node: str, peers: List[str], **kwargs) -> App:
+    app = App(cluster=Cluster(node, peers, **kwargs))
+    app.handled = []
+
+    @app.on_event("/user/{uid}")
+    async def user(uid: Param, event: Event):
+        app.handled.append(uid)
+        event.ctx.scope["count"] = event.ctx.scope.get("count", 0) + 1
+        return {"node": app.cluster.node, "count": event.ctx.scope["count"]}
+
+    @app.on_event("/fail")
+    async def fail():
+        raise KeyError("boom")
+
+    @app.on_event("/object")
+    async def obj():
+        return object()
+
+    return app
+
+
+async def wait_for(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+def test_ring():
+    ring = HashRing(["a", "b", "c"])
+    keys = [f"key-{i}" for i in range(3000)]
+    owners = {key: ring.node_for(key) for key in keys}
+    for node in "abc":
+        assert 700 < list(owners.values()).count(node) < 1300
+
+    ring.add("d")
+    moved = [key for key in keys if ring.node_for(key) != owners[key]]
+    assert all(ring.node_for(key) == "d" for key in moved)
+    assert 400 < len(moved) < 1100
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == owners
+    assert not ring.add("a") and not ring.remove("d")
+    with pytest.raises(LookupError):
+        HashRing().node_for("key")
+
+
+@pytest.mark.asyncio
+async def test_forward():
+    node1, node2 = free_node(), free_node()
+    app1, app2 = make_app(node1, [node2]), make_app(node2, [node1])
+    await app1.cluster.start(app1)
+    await app2.cluster.start(app2)
+    await wait_for(lambda: len(app1.cluster.ring) == 2 and len(app2.cluster.ring) == 2)
+
+    cids = [f"cid-{i}" for i in range(40)]
+    await asyncio.gather(*(app1.trigger_event(f"/user/{i}", cid=cid) for i, cid in enumerate(cids)))
+    await asyncio.gather(*(app2.trigger_event(f"/user/{i}", cid=cid) for i, cid in enumerate(cids)))
+    for app in (app1, app2):
+        owned = [str(i) for i, cid in enumerate(cids) if app.cluster.owner(cid) == app.cluster.node]
+        assert 0 < len(owned) < len(cids)
+        assert sorted(app.handled) == sorted(owned * 2)
+    assert app1.cluster.forwarded + app2.cluster.forwarded == app1.cluster.received + app2.cluster.received == 40
+    for app in (app1, app2):  # kept by the owner for the next events of the cid
+        assert {cid for cid in cids if cid in app.ctxs} == {
+            cid for cid in cids if app.cluster.owner(cid) == app.cluster.node
+        }
+    # app2 received its cids first, so its own events found their contexts
+    assert all(app1.ctxs[cid].scope["count"] == 1 for cid in cids if cid in app1.ctxs)
+    assert all(app2.ctxs[cid].scope["count"] == 2 for cid in cids if cid in app2.ctxs)
+
+    remote = next(cid for cid in cids if app1.cluster.owner(cid) == node2)
+    results = [await app1.trigger_event("/user/x", cid=remote) for _ in range(3)]
+    assert results == [{"node": node2, "count": count} for count in (3, 4, 5)]  # the result of the remote handler
+
+    with pytest.raises(RemoteError, match="KeyError"):
+        await app1.trigger_event("/fail", cid=remote)
+    with pytest.raises(EventNotFound):
+        await app1.trigger_event("/unknown", cid=remote)
+    with pytest.raises(RemoteError, match="can not be encoded"):
+        await app1.trigger_event("/object", cid=remote)
+    assert app1.metrics()["cluster_nodes"] == 2 and app1.metrics()["cluster_pending"] == 0
+
+    await app1.cluster.close()
+    await app2.cluster.close()
+
+
+@pytest.mark.asyncio
+async def test_max_ctxs():
+    node1, node2 = free_node(), free_node()
+    app1, app2 = make_app(node1, [node2]), make_app(node2, [node1], max_ctxs=2)
+    await app1.cluster.start(app1)
+    await app2.cluster.start(app2)
+    await wait_for(lambda: len(app1.cluster.ring) == 2 and len(app2.cluster.ring) == 2)
+
+    remote = [cid for cid in (f"cid-{i}" for i in range(100)) if app1.cluster.owner(cid) == node2][:3]
+    for cid in remote:
+        await app1.trigger_event("/user/1", cid=cid)
+    assert set(app2.ctxs) == set(remote[1:])  # the least recently used context is dropped
+    await app1.cluster.close()
+    await app2.cluster.close()
+
+
+@pytest.mark.asyncio
+async def test_join_leave():
+    node1, node2 = free_node(), free_node()
+    app1 = make_app(node1, [], reconnect_interval=0.01)
+    await app1.cluster.start(app1)
+    assert len(app1.cluster.ring) == 1
+
+    app2 = make_app(node2, [node1])
+    await app2.cluster.start(app2)  # hello
+    await wait_for(lambda: len(app1.cluster.ring) == 2)
+
+    await app2.cluster.close()  # bye
+    await wait_for(lambda: len(app1.cluster.ring) == 1)
+    await asyncio.gather(*(app1.trigger_event(f"/user/{i}", cid=f"cid-{i}") for i in range(10)))
+    assert len(app1.handled) == 10 and app1.cluster.forwarded == 0
+    await asyncio.sleep(0.05)
+    assert len(app1.cluster.ring) == 1  # a node which left is not reconnected
+    await app1.cluster.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable():
+    node1, node2 = free_node(), free_node()
+    app1 = make_app(node1, [node2], reconnect_interval=0.01)
+    await app1.cluster.start(app1)
+    assert len(app1.cluster.ring) == 1
+    await app1.trigger_event("/user/1", cid="cid-1")
+    assert app1.handled == ["1"]
+
+    app2 = make_app(node2, [])
+    await app2.cluster.start(app2)
+    await wait_for(lambda: len(app1.cluster.ring) == 2 and len(app2.cluster.ring) == 2)
+
+    app1.cluster.pools[node2][0].transport.abort()  # lost without a bye
+    await asyncio.sleep(0)
+    assert len(app1.cluster.ring) == 1
+    await wait_for(lambda: len(app1.cluster.ring) == 2)  # connected again
+    await app1.cluster.close()
+    await app2.cluster.close()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from tiny_listener import Data, Event, Listener, Param, RouteError
+from tiny_listener.coalesce import Batch
+
+
+@pytest.fixture
+def app() -> Listener:
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    return App()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_latest(app: Listener):
+    calls = []
+
+    @app.on_event("/sensor/{name}", coalesce=0.05)
+    async def sensor(name: Param, value: Data):
+        calls.append((name, value))
+        return value
+
+    tasks = [app.trigger_event("/sensor/foo", data={"value": i}) for i in range(3)]
+    other = app.trigger_event("/sensor/bar", data={"value": 9})
+    assert tasks[0] is tasks[1] is tasks[2]
+    assert other is not tasks[0]
+    await asyncio.gather(tasks[0], other)
+
+    assert sorted(calls) == [("bar", 9), ("foo", 2)]
+    events = [event for ctx in app.ctxs.values() for event in ctx.events[app.routes["sensor"]]]
+    assert len(events) == 4
+    assert all(event.is_done for event in events)
+    assert sorted(event.result for event in events) == [2, 2, 2, 9]
+    assert app._batches == {}  # noqa
+
+
+@pytest.mark.asyncio
+async def test_coalesce_first(app: Listener):
+    @app.on_event("/sensor", coalesce=0.01, merge="first")
+    async def sensor(value: Data):
+        return value
+
+    tasks = [app.trigger_event("/sensor", data={"value": i}) for i in range(3)]
+    await tasks[0]
+    assert [event.result for ctx in app.ctxs.values() for event in ctx.events[app.routes["sensor"]]] == [0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_reducer(app: Listener):
+    def total(acc, data):
+        return {"value": acc["value"] + data["value"]}
+
+    @app.on_event("/sensor", coalesce=0.01, merge=total)
+    async def sensor(value: Data):
+        return value
+
+    ctx = app.new_ctx()
+    for i in range(4):
+        ctx.trigger_event("/sensor", data={"value": i})
+    await app.drain()
+    assert [event.result for event in ctx.events[app.routes["sensor"]]] == [6, 6, 6, 6]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_error(app: Listener):
+    @app.on_event("/sensor", coalesce=0.01)
+    async def sensor():
+        raise ValueError()
+
+    ctx = app.new_ctx()
+    task = ctx.trigger_event("/sensor")
+    ctx.trigger_event("/sensor")
+    with pytest.raises(ValueError):
+        await task
+    assert [type(event.error) for event in ctx.events[app.routes["sensor"]]] == [ValueError, ValueError]
+
+
+def test_batch(app: Listener):
+    @app.on_event("/sensor")
+    async def sensor():
+        ...
+
+    ctx = app.new_ctx()
+    batch = Batch(Event(ctx, app.routes["sensor"]))
+    batch.join(Event(ctx, app.routes["sensor"]))
+    assert len(batch) == 2
+    with pytest.raises(ValueError):
+        Batch(Event(ctx, app.routes["sensor"]), merge="_unknown_")
+
+
+@pytest.mark.parametrize("opts", [{"coalesce": 0.1, "merge": "_unknown_"}, {"coalesce": "0.1"}, {"coalesce": -1}])
+def test_invalid_opts(app: Listener, opts):
+    with pytest.raises(RouteError):
+        app.add_on_event_hook(lambda: None, "/sensor", **opts)
+    assert not app.routes
@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from enum import IntEnum
+
+import pytest
+
+from tiny_listener import (
+    Event,
+    EventFrame,
+    Listener,
+    Param,
+    codec,
+    decode_event,
+    dump_event,
+    encode_event,
+)
+from tiny_listener.codec import dumps, loads
+
+VALUES = [
+    None,
+    True,
+    False,
+    0,
+    -128,
+    127,
+    128,
+    -(2**63),
+    2**63 - 1,
+    2**63,
+    -(2**200),
+    1.5,
+    float("inf"),
+    "",
+    "✓" * 100,
+    "x" * 300,
+    b"",
+    b"\x00" * 300,
+    [],
+    [1, [2, [3]]],
+    (1, "a", None),
+    {},
+    {"a": 1, 2: "b", None: [b"c"], (1, 2): {"nested": ()}},
+]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_round_trip(value):
+    assert loads(dumps(value), copy=True) == value
+    assert type(loads(dumps(value), copy=True)) is type(value)
+
+
+def test_zero_copy():
+    payload = b"x" * 1000
+    buffer = dumps({"payload": payload, "small": b"y"})
+    value = loads(buffer)
+    assert isinstance(value["payload"], memoryview) and value["payload"].obj is buffer
+    assert value["payload"] == payload and value["small"] == b"y"
+    assert loads(dumps(bytearray(b"ab"))) == b"ab"
+    assert loads(dumps(memoryview(b"ab"))) == b"ab"
+
+
+def test_default():
+    with pytest.raises(TypeError):
+        dumps({"obj": object()})
+    assert loads(dumps({"obj": {1}}, default=sorted)) == {"obj": [1]}
+    assert loads(dumps([object], default=repr)) == [repr(object)]
+
+
+def test_subclasses():
+    class Color(IntEnum):
+        RED = 1
+
+    class Name(str):
+        ...
+
+    value = OrderedDict([(Name("color"), Color.RED), ("name", Name("x")), ("flag", Color.RED == 1)])
+    assert loads(dumps(value)) == {"color": 1, "name": "x", "flag": True}
+    assert type(loads(dumps(Color.RED))) is int
+
+    class Items(list):
+        ...
+
+    assert loads(dumps(Items([1, 2]))) == [1, 2]
+    assert loads(dumps({"items": Items([Items()])})) == {"items": [[]]}
+
+
+@pytest.mark.parametrize("buffer", [b"", b"\xff", dumps("abc")[:-1], dumps([1, 2])[:-1], dumps(1) + b"\x00"])
+def test_invalid(buffer):
+    with pytest.raises(ValueError):
+        loads(buffer)
+
+
+def test_invalid_key():
+    with pytest.raises(ValueError):
+        loads(bytes([codec.DICT]) + (1).to_bytes(4, "little") + dumps([]) + dumps(1))
+
+
+def test_event_frame():
+    frame = encode_event("/user/1", "ctx_✓", {"payload": b"raw", "n": 1}, result=[1, 2])
+    decoded = decode_event(frame)
+    assert decoded[:2] == ("/user/1", "ctx_✓")
+    assert isinstance(decoded.data["payload"], memoryview)
+    assert decode_event(frame, copy=True) == EventFrame("/user/1", "ctx_✓", {"payload": b"raw", "n": 1}, [1, 2])
+    assert decode_event(encode_event("/a")) == EventFrame("/a", None, None, None)
+
+    for buffer in (frame[:3], frame[:10], b"\x02" + frame[1:]):
+        with pytest.raises(ValueError):
+            decode_event(buffer)
+
+
+@pytest.mark.asyncio
+async def test_dump_event():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App()
+    events = []
+
+    @app.on_event("/user/{uid:int}")
+    async def user(uid: Param, event: Event):
+        events.append(event)
+        return {"uid": uid}
+
+    await app.new_ctx("ctx").trigger_event("/user/1", data={"tags": ("a",)})
+    event = events[0]
+    assert decode_event(dump_event(event, "/user/1")) == ("/user/1", "ctx", {"tags": ("a",)}, {"uid": 1})
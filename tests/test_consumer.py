@@ -0,0 +1,133 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from tiny_listener import Data, MemoryBroker, Param, QueueConsumerListener
+
+
+async def consume(app: QueueConsumerListener, broker: MemoryBroker) -> None:
+    await app.listen()
+    for _ in range(200):
+        await asyncio.sleep(0.005)
+        if not broker.queue and not broker.unacked:
+            break
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_prefetch():
+    broker = MemoryBroker()
+    app = QueueConsumerListener(broker, prefetch=8, ack_batch=100)
+    assert app.ack_batch == 4
+    running = 0
+    peak = 0
+
+    @app.on_event("/job/{n:int}")
+    async def job(n: Param, message: Data):
+        nonlocal running, peak
+        assert message.body == b"%d" % n
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+
+    for i in range(100):
+        broker.publish(f"/job/{i}", b"%d" % i)
+    await consume(app, broker)
+
+    assert len(broker.acked) == 100
+    assert peak <= 8
+    assert broker.ack_calls <= 100 // 4 + 5
+    assert app.acked == 100
+    assert app.unacked == 0
+    assert not app.ctxs
+
+
+@pytest.mark.asyncio
+async def test_nack():
+    broker = MemoryBroker()
+    app = QueueConsumerListener(broker, prefetch=4, ack_interval=0.001)
+    attempts = []
+
+    @app.on_event("/fail/{n:int}")
+    async def fail(n: Param, message: Data):
+        attempts.append((n, message.redelivered))
+        if n == 0 or not message.redelivered:
+            raise ValueError()
+
+    broker.publish("/fail/0")
+    broker.publish("/fail/1")
+    broker.publish("/missing")
+    await consume(app, broker)
+
+    assert sorted(attempts) == [(0, False), (0, True), (1, False), (1, True)]
+    assert [m.path for m in broker.acked] == ["/fail/1"]
+    assert sorted(m.path for m in broker.dead) == ["/fail/0", "/missing"]
+    assert app.nacked == 4
+
+    app = QueueConsumerListener(broker, timeout=0.01, requeue=False, ack_interval=0.001)
+
+    @app.on_event("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+
+    broker.publish("/slow")
+    await consume(app, broker)
+    assert broker.dead[-1].path == "/slow"
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    broker = MemoryBroker()
+    app = QueueConsumerListener(broker, prefetch=2)
+    release = asyncio.Event()
+
+    @app.on_event("/block")
+    async def block():
+        await release.wait()
+
+    for _ in range(5):
+        broker.publish("/block")
+    await app.listen()
+    await asyncio.sleep(0.01)
+
+    metrics = app.metrics()
+    assert metrics["consumer_lag"] == 3
+    assert metrics["consumer_unacked"] == 2
+    assert 0 <= metrics["consumer_age"] < 1
+    broker.unacked[1].published_at = app._published[broker.unacked[1]] = time.time() - 60  # the oldest one
+    assert app.metrics()["consumer_age"] >= 60
+    assert metrics["inflight"] == 2
+
+    release.set()
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if len(broker.acked) == 5:
+            break
+    assert app.metrics()["consumer_lag"] == 0
+    assert app.metrics()["consumer_acked"] == 5
+    assert app.metrics()["consumer_age"] == 0
+    await app._close()
+
+
+def test_shutdown():
+    broker = MemoryBroker()
+    app = QueueConsumerListener(broker, ack_interval=0.001)
+    handled = []
+
+    @app.on_event("/job/{n:int}")
+    async def job(n: Param):
+        handled.append(n)
+        if n == 0:
+            os.kill(os.getpid(), signal.SIGINT)
+            await asyncio.sleep(0.01)
+            broker.publish("/job/1")  # during the drain
+            await asyncio.sleep(0.05)
+
+    broker.publish("/job/0")
+    app.run()
+    assert handled == [0] and app.nacked == 0
+    assert [m.path for m in broker.queue] == ["/job/1"] and not broker.unacked
@@ -0,0 +1,211 @@
+import asyncio
+from typing import Dict, Tuple
+
+import pytest
+
+from tiny_listener import Data, HTTPListener, Param, Request
+from tiny_listener.http import httptools
+
+
+@pytest.fixture(params=[False, pytest.param(True, marks=pytest.mark.skipif(httptools is None, reason="no httptools"))])
+def use_httptools(request) -> bool:
+    return request.param
+
+
+async def serve(use_httptools: bool, **kwargs) -> HTTPListener:
+    app = HTTPListener("127.0.0.1", 0, use_httptools=use_httptools, **kwargs)
+
+    @app.on_event("GET:/user/{name}")
+    async def user(request: Data, name: Param):
+        request.respond(200, f"Hello, {name}!", headers=[("content-type", "text/plain")])
+
+    @app.on_event("GET:/slow/{delay:float}")
+    async def slow(delay: Param):
+        await asyncio.sleep(delay)
+        return f"slept {delay}"
+
+    @app.on_event("POST:/echo")
+    async def echo(request: Data):
+        return request.body
+
+    @app.on_event("GET:/none")
+    async def none():
+        ...
+
+    @app.on_event("GET:/error")
+    async def error():
+        raise ValueError()
+
+    @app.on_event("GET:/dict")
+    async def dict_():
+        return {"not": "bytes"}
+
+    await app.listen()
+    return app
+
+
+async def connect(app: HTTPListener) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    port = app.server.sockets[0].getsockname()[1]
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    head = (await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)).decode()
+    lines = head.split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+
+@pytest.mark.asyncio
+async def test_keep_alive(use_httptools: bool):
+    app = await serve(use_httptools)
+    reader, writer = await connect(app)
+    for name in ("alice", "bob%20b"):
+        writer.write(f"GET /user/{name}?x=1 HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+        status, headers, body = await read_response(reader)
+        assert status == 200
+        assert headers["content-type"] == "text/plain"
+        assert "date" in headers
+        assert "connection" not in headers
+        assert body == f"Hello, {name.replace('%20', ' ')}!".encode()
+    assert len(app.connections) == 1
+    assert not app.ctxs
+    writer.close()
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_pipelining(use_httptools: bool):
+    app = await serve(use_httptools)
+    reader, writer = await connect(app)
+    writes = []
+    writer.write(
+        b"GET /slow/0.05 HTTP/1.1\r\n\r\n"
+        b"GET /slow/0 HTTP/1.1\r\n\r\n"
+        b"POST /echo HTTP/1.1\r\ncontent-length: 5\r\n\r\nhello"
+        b"GET /user/x HTTP/1.1\r\n"
+    )
+    await asyncio.sleep(0.01)
+    (conn,) = app.connections
+    write = conn.transport.write
+    conn.transport.write = lambda data: writes.append(data) or write(data)
+    writer.write(b"\r\n")
+
+    assert (await read_response(reader))[2] == b"slept 0.05"
+    responses = [await read_response(reader) for _ in range(3)]
+    assert [body for _, _, body in responses] == [b"slept 0.0", b"hello", b"Hello, x!"]
+    assert len(writes) == 1
+    writer.close()
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_statuses(use_httptools: bool):
+    app = await serve(use_httptools)
+    reader, writer = await connect(app)
+    writer.write(b"GET /missing HTTP/1.1\r\n\r\nGET /none HTTP/1.1\r\n\r\nGET /error HTTP/1.1\r\n\r\n")
+    writer.write(b"GET /dict HTTP/1.1\r\n\r\n")
+    assert [(await read_response(reader))[0] for _ in range(4)] == [404, 204, 500, 500]
+
+    writer.write(b"HEAD /user/x HTTP/1.1\r\n\r\n")
+    writer.write(b"GET /user/y HTTP/1.1\r\n\r\n")
+    head = await reader.readuntil(b"\r\n\r\n")
+    assert b"content-length: 9\r\n" in head
+    assert (await read_response(reader))[2] == b"Hello, y!"
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_chunked_and_continue(use_httptools: bool):
+    app = await serve(use_httptools)
+    reader, writer = await connect(app)
+    writer.write(b"POST /echo HTTP/1.1\r\ntransfer-encoding: chunked\r\nexpect: 100-continue\r\n\r\n")
+    assert await reader.readuntil(b"\r\n\r\n") == b"HTTP/1.1 100 Continue\r\n\r\n"
+    writer.write(b"5;ext=1\r\nhello\r\n")
+    await asyncio.sleep(0.01)
+    writer.write(b"6\r\n world\r\n0\r\nx-trailer: 1\r\n\r\n")
+    assert (await read_response(reader))[2] == b"hello world"
+    writer.write(b"POST /echo HTTP/1.1\r\ntransfer-encoding: chunked\r\n\r\n3\r\nabc\r\n0\r\n\r\n")
+    assert (await read_response(reader))[2] == b"abc"
+    await app._close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "request_, status, headers",
+    [
+        (b"GET /user/x HTTP/1.1\r\nconnection: close\r\n\r\n", 200, {"connection": "close"}),
+        (b"GET /user/x HTTP/1.0\r\n\r\n", 200, {"connection": "close"}),
+        (b"BAD\r\n\r\n", 400, {"connection": "close"}),
+        (b"GET / HTTP/2.0\r\n\r\n", 505, {"connection": "close"}),
+        (b"POST /echo HTTP/1.1\r\ncontent-length: 99999\r\n\r\n", 413, {"connection": "close"}),
+        (b"POST /echo HTTP/1.1\r\ncontent-length: -5\r\n\r\n", 400, {"connection": "close"}),
+        (b"POST /echo HTTP/1.1\r\ncontent-length: +5\r\n\r\nhello", 400, {"connection": "close"}),
+        (
+            b"POST /echo HTTP/1.1\r\ntransfer-encoding: gzip\r\n\r\nGET /x HTTP/1.1\r\n\r\n",
+            400,
+            {"connection": "close"},
+        ),
+        (b"POST /echo HTTP/1.1\r\ntransfer-encoding: notchunked\r\n\r\n", 400, {"connection": "close"}),
+        (b"POST /echo HTTP/1.1\r\ntransfer-encoding: gzip, chunked\r\n\r\n0\r\n\r\n", 501, {"connection": "close"}),
+        (
+            b"POST /echo HTTP/1.1\r\ncontent-length: 4\r\ntransfer-encoding: chunked\r\n\r\n0\r\n\r\n",
+            400,
+            {"connection": "close"},
+        ),
+    ],
+)
+async def test_close(use_httptools: bool, request_: bytes, status: int, headers: Dict[str, str]):
+    app = await serve(use_httptools, max_body_size=1024)
+    reader, writer = await connect(app)
+    writer.write(request_)
+    response = await read_response(reader)
+    assert response[0] == status
+    assert headers.items() <= response[1].items()
+    assert await reader.read() == b""
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_1_0(use_httptools: bool):
+    app = await serve(use_httptools)
+    reader, writer = await connect(app)
+    for _ in range(2):
+        writer.write(b"GET /user/x HTTP/1.0\r\nconnection: keep-alive\r\n\r\n")
+        assert (await read_response(reader))[0] == 200
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_timeouts(use_httptools: bool):
+    app = await serve(use_httptools, keep_alive_timeout=0.05, request_timeout=0.02)
+    reader, writer = await connect(app)
+    writer.write(b"GET /slow/1 HTTP/1.1\r\n\r\n")
+    assert (await read_response(reader))[0] == 504
+    assert not app.ctxs
+    assert await asyncio.wait_for(reader.read(), 1) == b""
+    assert not app.connections
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_pause_pipeline(use_httptools: bool):
+    app = await serve(use_httptools, max_pipeline=2)
+    reader, writer = await connect(app)
+    writer.write(b"GET /slow/0.05 HTTP/1.1\r\n\r\n" * 2)
+    await asyncio.sleep(0.01)
+    (conn,) = app.connections
+    assert not conn.transport.is_reading()
+    assert [(await read_response(reader))[2] for _ in range(2)] == [b"slept 0.05"] * 2
+    assert conn.transport.is_reading()
+    await app._close()
+
+
+def test_request():
+    request = Request(None, "GET", "/a%2Fb?x=1&y=2", "1.1", [("host", "test")])  # type: ignore
+    assert request.path == "/a/b"
+    assert request.query == "x=1&y=2"
+    assert request.header("host") == "test"
+    assert request.header("missing", "-") == "-"
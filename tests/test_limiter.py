@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from tiny_listener import AIMDLimiter, GradientLimiter, Limiter, Listener
+
+
+class FixedLimiter(Limiter):
+    def update(self, latency: float, dropped: bool) -> float:
+        return self._limit
+
+
+@pytest.mark.asyncio
+async def test_limiter_acquire_release():
+    limiter = FixedLimiter(initial=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    assert limiter.inflight == 2
+
+    waiter = asyncio.get_event_loop().create_task(limiter.acquire())
+    cancelled = asyncio.get_event_loop().create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.snapshot() == {"limit": 2, "inflight": 2, "waiting": 2}
+    cancelled.cancel()
+    limiter.release(0.1)
+    await waiter
+    assert limiter.inflight == 2
+    limiter.release(0.1)
+    limiter.release(0.1)
+    assert limiter.inflight == 0
+    assert limiter.snapshot() == {"limit": 2, "inflight": 0, "waiting": 0}
+
+
+@pytest.mark.asyncio
+async def test_limiter_granted_then_cancelled():
+    limiter = FixedLimiter(initial=1)
+    await limiter.acquire()
+    waiter = asyncio.get_event_loop().create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release(0.1)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.inflight == 0
+
+
+def test_aimd():
+    limiter = AIMDLimiter(initial=10, min_limit=2, max_limit=12, max_latency=1)
+    limiter.inflight = 6
+    limiter.release(0.1)
+    assert limiter.limit == 11
+    limiter.inflight = 1
+    limiter.release(0.1)
+    assert limiter.limit == 11
+    limiter.inflight = 10
+    for _ in range(5):
+        limiter.inflight += 1
+        limiter.release(0.1)
+    assert limiter.limit == 12
+    limiter.inflight += 1
+    limiter.release(2)
+    assert limiter.limit == 10
+    for _ in range(50):
+        limiter.inflight += 1
+        limiter.release(0.1, dropped=True)
+    assert limiter.limit == 2
+
+
+def test_gradient():
+    limiter = GradientLimiter(initial=20, max_limit=100)
+    for _ in range(50):
+        limiter.inflight += 1
+        limiter.release(0.01)
+    grown = limiter.limit
+    assert grown > 20
+    for _ in range(20):
+        limiter.inflight += 1
+        limiter.release(0.1)
+    assert limiter.limit < grown
+    shrunk = limiter.limit
+    limiter.inflight += 1
+    limiter.release(0.01, dropped=True)
+    assert limiter.limit < shrunk
+    limiter.inflight += 1
+    limiter.release(0)
+
+
+@pytest.mark.asyncio
+async def test_route_limiter():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App()
+    limiter = AIMDLimiter(initial=2, max_limit=2)
+    running = []
+    peak = []
+
+    @app.on_event("/query", limiter=limiter)
+    async def query():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    @app.on_event("/slow", limiter=AIMDLimiter(initial=4))
+    async def slow():
+        await asyncio.sleep(1)
+
+    assert app.metrics()["routes"]["query"]["limit"] == 2
+    await asyncio.gather(*[app.trigger_event("/query") for _ in range(6)])
+    assert max(peak) == 2
+    assert limiter.inflight == 0
+
+    with pytest.raises(asyncio.TimeoutError):
+        await app.trigger_event("/slow", timeout=0.01)
+    assert app.metrics()["routes"]["slow"]["limit"] == 3
@@ -14,6 +14,7 @@ from tiny_listener import (
     EventAlreadyExists,
     EventNotFound,
     Listener,
+    ListenerClosed,
     ListenerNotFound,
     get_current_running_listener,
 )
@@ -205,6 +206,71 @@ def test_graceful_shutdown(app: Listener):
     assert step == [0, 1, 2]
 
 
+def test_graceful_shutdown_drain(app: Listener):
+    step = []
+
+    @app.on_event("/slow")
+    async def slow():
+        await asyncio.sleep(0.1)
+        step.append("slow")
+
+    @app.startup
+    async def step_0():
+        app.trigger_event("/slow")
+        os.kill(os.getpid(), signal.SIGINT)
+
+    @app.shutdown
+    async def step_1():
+        step.append("shutdown")
+        with pytest.raises(ListenerClosed):
+            app.trigger_event("/slow")
+
+    app.run()
+
+    assert step == ["slow", "shutdown"]
+    assert app.inflight == {}
+
+
+def test_graceful_shutdown_drain_timeout(app: Listener):
+    step = []
+    app.drain_timeout = 0.1
+    app.drain_interval = 0.01
+
+    @app.on_event("/slow")
+    async def slow():
+        await asyncio.sleep(10)
+        step.append("slow")
+
+    @app.startup
+    async def step_0():
+        app.trigger_event("/slow")
+        os.kill(os.getpid(), signal.SIGINT)
+
+    @app.shutdown
+    async def step_1():
+        step.append("shutdown")
+
+    app.run()
+
+    assert step == ["shutdown"]
+
+
+@pytest.mark.asyncio
+async def test_drain(app: Listener):
+    @app.on_event()
+    async def foo():
+        await asyncio.sleep(0.05)
+
+    app.trigger_event("/foo")
+    assert len(app.inflight) == 1
+    assert await app.drain(timeout=1) == 0
+    assert app.inflight == {}
+
+    app.trigger_event("/foo")
+    assert await app.drain(timeout=0) == 1
+    await app.drain()
+
+
 def test_force_shutdown(app: Listener):
     with patch.object(app._Listener__exiting, "is_set", return_value=True):  # noqa
 
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from tiny_listener import Listener
+from tiny_listener.metrics import Histogram, to_prometheus
+
+
+@pytest.fixture
+def app() -> Listener:
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    return App()
+
+
+def test_histogram():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) == 0
+    assert histogram.snapshot()["min"] == 0
+
+    for i in range(1, 10001):
+        histogram.record(i / 1e4)
+
+    assert histogram.count == 10000
+    assert histogram.min == 0.0001
+    assert histogram.max == 1
+    for q in (0.01, 0.5, 0.9, 0.99, 0.999):
+        assert histogram.percentile(q) == pytest.approx(q, rel=0.07)
+    assert histogram.percentile(1) == 1
+
+
+@pytest.mark.parametrize("micros", [0, 1, 31, 32, 33, 63, 64, 1000, 123456789])
+def test_histogram_bucket(micros: int):
+    value = Histogram.value(Histogram.index(micros))
+    assert value == pytest.approx(micros / 1e6, rel=0.0625, abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_listener_metrics(app: Listener):
+    @app.on_event("/ok")
+    async def ok():
+        ...
+
+    @app.on_event("/error")
+    async def error():
+        raise ValueError()
+
+    @app.on_event("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+
+    await app.trigger_event("/ok")
+    await app.trigger_event("/ok")
+    with pytest.raises(ValueError):
+        await app.trigger_event("/error")
+    with pytest.raises(asyncio.TimeoutError):
+        await app.trigger_event("/slow", timeout=0.01)
+
+    metrics = app.metrics()
+    assert metrics["ctxs"] == 4
+    assert metrics["inflight"] == 0
+    routes = metrics["routes"]
+    assert routes["ok"]["events"] == 2
+    assert routes["ok"]["latency"]["count"] == 2
+    assert routes["ok"]["errors"] == {}
+    assert routes["error"]["errors"] == {"ValueError": 1}
+    assert routes["slow"]["timeouts"] == 1
+    assert routes["slow"]["latency"]["max"] >= 0.01
+
+    text = to_prometheus(metrics)
+    assert "tiny_listener_ctxs 4\n" in text
+    assert 'tiny_listener_events_total{route="ok"} 2\n' in text
+    assert 'tiny_listener_errors_total{route="error",exception="ValueError"} 1\n' in text
+    assert 'tiny_listener_latency_seconds_count{route="ok"} 2\n' in text
+    assert "# TYPE tiny_listener_latency_seconds summary" in text
+    assert "tiny_listener_inflight 0\n" in text and 'tiny_listener_route_inflight{route="ok"} 0\n' in text
+    families = [line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")]
+    assert len(families) == len(set(families))
+
+
+def test_prometheus_escape():
+    snapshot = {"routes": {'a"b\\c': {"events": 1, "errors": {}, "latency": Histogram().snapshot()}}}
+    assert 'tiny_listener_events_total{route="a\\"b\\\\c"} 1\n' in to_prometheus(snapshot)
+
+
+@pytest.mark.asyncio
+async def test_serve_metrics(app: Listener):
+    @app.on_event("/ok")
+    async def ok():
+        ...
+
+    await app.trigger_event("/ok")
+    server = await app.serve_metrics(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b'tiny_listener_events_total{route="ok"} 1\n' in response
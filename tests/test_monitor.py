@@ -0,0 +1,57 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from tiny_listener import Listener, LoopMonitor
+from tiny_listener.monitor import LOOP
+
+
+@pytest.mark.asyncio
+async def test_monitor():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    app = App(monitor=monitor)
+
+    @app.on_event("/block")
+    async def block():
+        time.sleep(0.2)
+
+    monitor.start(app)
+    assert monitor.running is True
+    try:
+        await asyncio.sleep(0.05)
+        await app.new_ctx("blocking_ctx").trigger_event("/block")
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+    assert monitor.running is False
+
+    snapshot = monitor.snapshot()
+    assert snapshot["lags"]["count"] > 0
+    assert snapshot["lags"]["max"] >= 0.15
+    stall = snapshot["stalls"]["block"]
+    assert stall["count"] == 1
+    assert stall["cids"] == ["blocking_ctx"]
+    assert stall["max"] >= 0.15
+    assert "time.sleep(0.2)" in stall["stacks"][0]["stack"]
+    assert snapshot["stalls"][LOOP]["count"] == 1
+    assert app.metrics()["loop_lag"] == monitor.lag
+
+
+def test_monitor_lifecycle():
+    class App(Listener):
+        async def listen(self):
+            os.kill(os.getpid(), signal.SIGINT)
+
+    monitor = LoopMonitor()
+    app = App(monitor=monitor)
+    app.run()
+    assert monitor.running is False
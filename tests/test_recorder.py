@@ -0,0 +1,140 @@
+import asyncio
+import os
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from tiny_listener import EventNotFound, Listener, Param, Recorder, read_records
+from tiny_listener.bench import run_replay
+from tiny_listener.recorder import HEADER, RECORD
+
+
+@pytest.fixture
+def app() -> Listener:
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    return App()
+
+
+@pytest.fixture
+def filename():
+    with TemporaryDirectory() as path:
+        yield os.path.join(path, "events.rec")
+
+
+def test_record_read(filename: str):
+    recorder = Recorder(filename)
+    recorder.record("/user/1", None, None)
+    recorder.record("/user/2", "ctx_✓", {"n": 1, "tags": ["a"], "obj": object, "raw": b"\x00"})
+    recorder.close()
+
+    recorder = Recorder(filename)
+    recorder.record("/user/3", "", {})
+    recorder.close()
+    assert recorder.count == 1
+
+    records = list(read_records(filename))
+    assert [(r.path, r.cid, r.data) for r in records] == [
+        ("/user/1", None, None),
+        ("/user/2", "ctx_✓", {"n": 1, "tags": ["a"], "obj": repr(object), "raw": b"\x00"}),
+        ("/user/3", "", {}),
+    ]
+    assert records[0].timestamp <= records[1].timestamp <= records[2].timestamp
+
+
+def test_read_truncated(filename: str):
+    recorder = Recorder(filename)
+    recorder.record("/a", None, {"x": 1})
+    recorder.record("/b", None, {"x": 2})
+    recorder.close()
+
+    with open(filename, "r+b") as f:
+        f.truncate(os.path.getsize(filename) - 1)
+    assert [r.path for r in read_records(filename)] == ["/a"]
+
+
+def test_bad_recording(filename: str):
+    with open(filename, "wb") as f:
+        f.write(b"{}")
+    with pytest.raises(ValueError):
+        list(read_records(filename))
+    with pytest.raises(ValueError):
+        Recorder(filename)
+
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(b"TLREC", 99))
+    with pytest.raises(ValueError, match="version"):
+        list(read_records(filename))
+
+
+def test_read_version_1(filename: str):
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(b"TLREC", 1))
+        f.write(RECORD.pack(1.5, 2, -1, 7) + b'/a{"x":1}')
+    assert list(read_records(filename)) == [(1.5, "/a", None, {"x": 1})]
+    with pytest.raises(ValueError, match="version 1"):
+        Recorder(filename)
+
+
+def test_no_leak(filename: str, monkeypatch):
+    opened = []
+
+    def tracked_open(*args, **kwargs):
+        opened.append(open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr("tiny_listener.recorder.open", tracked_open, raising=False)
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(b"TLREC", 1))
+    with pytest.raises(ValueError):
+        Recorder(filename)
+    assert all(f.closed for f in opened)
+
+
+@pytest.mark.asyncio
+async def test_listener_recorder(app: Listener, filename: str):
+    app.recorder = Recorder(filename)
+
+    @app.on_event("/user/{uid:int}")
+    async def user(uid: Param):
+        ...
+
+    await app.trigger_event("/user/1", data={"a": 1})
+    app.new_ctx("ctx")
+    await app.trigger_event("/user/2", cid="ctx")
+    with pytest.raises(EventNotFound):
+        app.trigger_event("/missing")
+    app.recorder.close()
+
+    assert [r[1:] for r in read_records(filename)] == [
+        ("/user/1", None, {"a": 1}),
+        ("/user/2", "ctx", None),
+        ("/missing", None, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_replay(app: Listener, filename: str):
+    calls = []
+
+    @app.on_event("/user/{uid:int}")
+    async def user(uid: Param):
+        calls.append((uid, asyncio.get_event_loop().time()))
+
+    recorder = Recorder(filename)
+    for i, path in enumerate(["/user/0", "/user/1", "/missing", "/user/2"]):
+        recorder.record(path, None, None, timestamp=1000 + i * 0.1)
+    recorder.close()
+
+    report = await run_replay(app, filename, speed=2)
+    assert report.count == 4
+    assert report.routes["<not found>"].errors == {"EventNotFound": 1}
+    assert [uid for uid, _ in calls] == [0, 1, 2]
+    assert calls[2][1] - calls[0][1] == pytest.approx(0.15, abs=0.05)
+
+    calls.clear()
+    report = await run_replay(app, filename, speed=None)
+    assert report.count == 4
+    assert calls[2][1] - calls[0][1] < 0.05
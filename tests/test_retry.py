@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from tiny_listener import (
+    Event,
+    Listener,
+    Param,
+    Retry,
+    RouteError,
+    Span,
+    SpanExporter,
+    Tracer,
+)
+from tiny_listener.metrics import to_prometheus
+
+
+class App(Listener):
+    async def listen(self):
+        ...
+
+
+def test_delay():
+    retry = Retry(backoff=0.1, max_backoff=0.3, jitter=False)
+    assert [retry.delay(attempt) for attempt in (1, 2, 3, 4)] == [0.1, 0.2, 0.3, 0.3]
+    retry = Retry(backoff=0.1, multiplier=3)
+    assert all(0 <= retry.delay(2) <= 0.3 for _ in range(100))
+
+
+@pytest.mark.parametrize("kwargs", [{"attempts": 0}, {"backoff": -1}, {"max_backoff": -1}, {"multiplier": 0.5}])
+def test_invalid(kwargs):
+    with pytest.raises(ValueError):
+        Retry(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retry():
+    app = App()
+    attempts = []
+
+    @app.on_event("/flaky/{n:int}", retry=Retry(attempts=5, backoff=0.01, jitter=False))
+    async def flaky(n: Param, event: Event):
+        attempts.append(event.attempt)
+        if event.attempt <= n:
+            raise ConnectionError()
+        return event.attempt
+
+    ctx = app.new_ctx()
+    future = ctx.trigger_event("/flaky/2")
+    await asyncio.sleep(0.005)
+    assert attempts == [1]
+    assert not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]  # no sleeping task
+    assert list(app.inflight) == [future] and len(app.scheduler) == 1
+
+    await future
+    [event] = ctx.events[app.routes["flaky"]]  # the same event for every attempt
+    assert attempts == [1, 2, 3] and event.result == 3 and event.is_done and event.error is None
+    metrics = app.metrics()["routes"]["flaky"]
+    assert metrics["retries"] == 2 and metrics["errors"] == {"ConnectionError": 2}
+    assert 'tiny_listener_retries_total{route="flaky"} 2' in to_prometheus(app.metrics())
+    assert not app.inflight
+
+
+@pytest.mark.asyncio
+async def test_give_up():
+    app = App()
+    attempts, errors = [], []
+
+    @app.on_event("/fail/{kind}", retry=Retry(attempts=3, backoff=0, retry_on=(ConnectionError,)))
+    async def fail(kind: Param, event: Event):
+        attempts.append(event.attempt)
+        raise ConnectionError() if kind == "network" else ValueError()
+
+    with pytest.raises(ConnectionError):
+        await app.trigger_event("/fail/network")
+    assert attempts == [1, 2, 3]
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        await app.trigger_event("/fail/value")
+    assert attempts == [1]
+
+    @app.on_error(ConnectionError)
+    async def on_error(event: Event):
+        errors.append(event.attempt)
+
+    await app.trigger_event("/fail/network")
+    assert errors == [3]  # the error hooks only see the last failure
+    assert app.metrics()["routes"]["fail"]["retries"] == 4
+
+
+@pytest.mark.asyncio
+async def test_retry_spans():
+    spans = []
+
+    class Exporter(SpanExporter):
+        def export(self, span: Span) -> None:
+            spans.append(span)
+
+    app = App(tracer=Tracer(Exporter()))
+
+    @app.on_event("/flaky", retry=Retry(attempts=3, backoff=0, jitter=False))
+    async def flaky(event: Event):
+        if event.attempt < 3:
+            raise ConnectionError()
+
+    @app.on_event("/parent")
+    async def parent():
+        await app.trigger_event("/flaky")
+
+    await app.trigger_event("/parent")
+    first, second, third, root = spans
+    assert root.name == "parent" and first.parent_id == root.span_id
+    assert second.parent_id == first.span_id and third.parent_id == second.span_id
+    assert {span.trace_id for span in spans} == {root.trace_id}
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    app = App()
+
+    @app.on_event(retry=Retry(backoff=10, jitter=False))
+    async def fail():
+        raise ConnectionError()
+
+    future = app.trigger_event("/fail")
+    await asyncio.sleep(0.001)
+    assert len(app.scheduler) == 1
+    future.cancel()
+    await asyncio.sleep(0)
+    assert len(app.scheduler) == 0 and not app.inflight
+
+
+def test_coalesce():
+    app = App()
+    with pytest.raises(RouteError):
+        app.add_on_event_hook(lambda: None, "/x", retry=Retry(), coalesce=0.1)
@@ -0,0 +1,255 @@
+import asyncio
+import os
+import signal
+import time
+from datetime import datetime
+
+import pytest
+
+from tiny_listener import Cron, Event, EventNotFound, Listener, Param, Scheduler
+
+
+@pytest.mark.asyncio
+async def test_call_later():
+    scheduler = Scheduler()
+    result = []
+    scheduler.call_later(0.03, result.append, 3)
+    scheduler.call_later(0.01, result.append, 1)
+    handle = scheduler.call_later(0.02, result.append, 2)
+    assert len(scheduler) == 3
+
+    handle.cancel()
+    handle.cancel()
+    assert handle.cancelled is True
+    assert len(scheduler) == 2
+
+    await asyncio.sleep(0.05)
+    assert result == [1, 3]
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_callback_error():
+    scheduler = Scheduler()
+    result = []
+    scheduler.call_later(0, lambda: 1 / 0)
+    scheduler.call_later(0, result.append, 1)
+    await asyncio.sleep(0.01)
+    assert result == [1]
+
+
+@pytest.mark.asyncio
+async def test_compact():
+    scheduler = Scheduler()
+    handles = [scheduler.call_later(10, print) for _ in range(Scheduler.COMPACT_MIN_SIZE * 2)]
+    for handle in handles:
+        handle.cancel()
+    scheduler.call_later(10, print)
+    assert len(scheduler._heap) == 1  # noqa
+    assert len(scheduler) == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout():
+    scheduler = Scheduler()
+
+    with scheduler.timeout(None):
+        await asyncio.sleep(0)
+
+    with scheduler.timeout(1) as timeout:
+        await asyncio.sleep(0)
+    assert timeout.expired is False
+    assert len(scheduler) == 0
+
+    with pytest.raises(asyncio.TimeoutError):
+        with scheduler.timeout(0.01) as timeout:
+            await asyncio.sleep(1)
+    assert timeout.expired is True
+
+    with pytest.raises(asyncio.TimeoutError):
+        with scheduler.timeout(0):
+            raise AssertionError("should not run")
+
+
+@pytest.mark.asyncio
+async def test_timeout_outer_cancel():
+    scheduler = Scheduler()
+
+    async def wait():
+        with scheduler.timeout(10):
+            await asyncio.sleep(1)
+
+    task = asyncio.get_event_loop().create_task(wait())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_timeout_outside_task():
+    with pytest.raises(RuntimeError):
+        with Scheduler().timeout(1):
+            ...
+
+
+@pytest.mark.asyncio
+async def test_trigger_event_timeout():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App()
+
+    @app.on_event()
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await app.trigger_event("/slow", timeout=0.01)
+    assert len(app.scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_every():
+    scheduler = Scheduler()
+    result = []
+    job = scheduler.every(0.01, result.append, 1)
+    await asyncio.sleep(0.055)
+    assert 4 <= job.runs == len(result) <= 6
+    job.cancel()
+    assert job.cancelled and len(scheduler) == 0
+    await asyncio.sleep(0.02)
+    assert job.runs == len(result)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("missed, runs", [("skip", 1), ("catch_up", 4), ("delay", 1)])
+async def test_missed_ticks(missed: str, runs: int):
+    scheduler = Scheduler()
+    result = []
+    job = scheduler.every(0.02, result.append, 1, missed=missed, delay=0)
+    await asyncio.sleep(0)
+    time.sleep(0.07)  # the loop is blocked for 3 ticks and a half
+    await asyncio.sleep(0.001)
+    await asyncio.sleep(0.001)
+    now = scheduler.time()
+    assert len(result) == runs if missed != "catch_up" else len(result) >= runs  # the sleep may overrun
+    if missed == "skip":
+        assert job.skipped >= 3 and now < job.next <= now + 0.02
+    elif missed == "delay":
+        assert job.skipped == 0 and job.next == pytest.approx(now + 0.02, abs=0.005)
+    job.cancel()
+
+
+@pytest.mark.asyncio
+async def test_jitter():
+    scheduler = Scheduler()
+    jobs = [scheduler.every(1, print, jitter=0.5) for _ in range(20)]
+    whens = {job.handle.when for job in jobs}
+    start = scheduler.time()
+    assert len(whens) == 20 and all(start < when <= start + 1.5 for when in whens)
+    assert all(0 <= job.handle.when - job.next <= 0.5 for job in jobs)  # the grid itself does not drift
+
+
+@pytest.mark.asyncio
+async def test_many_jobs():
+    scheduler = Scheduler()
+    counter = [0]
+
+    def tick():
+        counter[0] += 1
+
+    jobs = [scheduler.every(0.05, tick, jitter=0.05) for _ in range(20000)]
+    assert len(scheduler) == 20000
+    await asyncio.sleep(0.2)
+    assert counter[0] >= 20000
+    for job in jobs:
+        job.cancel()
+    assert len(scheduler) == 0
+
+
+def test_cron():
+    start = datetime(2024, 1, 31, 23, 58, 30).timestamp()
+    assert datetime.fromtimestamp(Cron("* * * * *").next(start)) == datetime(2024, 1, 31, 23, 59)
+    assert datetime.fromtimestamp(Cron("*/15 * * * *").next(start)) == datetime(2024, 2, 1, 0, 0)
+    assert datetime.fromtimestamp(Cron("30 9 * * 1-5").next(start)) == datetime(2024, 2, 1, 9, 30)
+    assert datetime.fromtimestamp(Cron("0 0 29 2 *").next(start)) == datetime(2024, 2, 29)
+    assert datetime.fromtimestamp(Cron("0 12 1 * 0").next(start)) == datetime(2024, 2, 1, 12)  # day or weekday
+    assert datetime.fromtimestamp(Cron("0 12 * * 7").next(start)) == datetime(2024, 2, 4, 12)  # Sunday
+    assert datetime.fromtimestamp(Cron("5,10-12/2 3 1 6,12 *").next(start)) == datetime(2024, 6, 1, 3, 5)
+    for expr in ("* * * *", "60 * * * *", "a * * * *", "*/0 * * * *", "5-1 * * * *"):
+        with pytest.raises(ValueError):
+            Cron(expr)
+    with pytest.raises(ValueError):
+        Cron("0 0 30 2 *").next(start)
+
+
+@pytest.mark.asyncio
+async def test_cron_job():
+    scheduler = Scheduler()
+    job = scheduler.cron("* * * * *", print)
+    assert 0 < job.next - time.time() <= 60
+    assert job.handle.when - scheduler.time() == pytest.approx(job.next - time.time(), abs=0.01)
+    job.cancel()
+    with pytest.raises(ValueError):
+        scheduler.every(1, print, missed="never")
+
+
+@pytest.mark.asyncio
+async def test_trigger_event_delay():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App()
+    done = []
+
+    @app.on_event("/user/{uid}")
+    async def user(uid: Param):
+        done.append((uid, app.scheduler.time()))
+
+    start = app.scheduler.time()
+    later = app.trigger_event("/user/later", delay=0.03)
+    sooner = app.trigger_event("/user/sooner", at=time.time() + 0.01)
+    cancelled = app.trigger_event("/user/cancelled", delay=0.02)
+    now = app.trigger_event("/user/now", delay=0)
+    assert app.metrics()["delayed"] == 3 and len(app.scheduler) == 3
+    cancelled.cancel()
+    await asyncio.gather(later, sooner, now)
+    assert [uid for uid, _ in done] == ["now", "sooner", "later"]
+    assert done[2][1] - start >= 0.03 - Scheduler.RESOLUTION
+    assert app.metrics()["delayed"] == 0 and len(app.scheduler) == 0
+    with pytest.raises(EventNotFound):
+        app.trigger_event("/unknown", delay=1)
+
+
+def test_listener_every():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App()
+    ticks, ctxs = [], set()
+
+    @app.every(0.01)
+    async def heartbeat(event: Event):
+        ticks.append(event.route.path)
+        ctxs.add(event.ctx.cid)
+        if len(ticks) == 3:
+            os.kill(os.getpid(), signal.SIGINT)
+
+    @app.cron("* * * * *", path="/report")
+    async def report():
+        ...
+
+    delayed = []
+
+    @app.startup
+    async def start():
+        delayed.append(app.trigger_event("/report", delay=10))
+
+    app.run()
+    assert ticks == ["heartbeat"] * 3 and len(ctxs) == 3
+    assert not app.ctxs  # a context per tick, dropped once done
+    assert all(job.cancelled for job in app.jobs) and delayed[0].cancelled()
+    assert app.metrics()["jobs"] == 0
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+import pytest
+
+from tiny_listener import (
+    Depends,
+    Event,
+    Listener,
+    ListenerClosed,
+    Param,
+    ShardDispatcher,
+)
+
+
+class App(Listener):
+    async def listen(self):
+        ...
+
+
+def make_app() -> App:
+    app = App()
+    app.seen = []
+    app.builds = 0
+
+    async def build():
+        app.builds += 1
+        return object()
+
+    @app.on_event("/user/{uid}")
+    async def user(uid: Param, event: Event, dep=Depends(build, use_cache=True)):
+        app.seen.append((event.ctx.cid, uid, threading.get_ident()))
+        await asyncio.sleep(0.01)
+
+    @app.on_event("/fail")
+    async def fail():
+        raise KeyError("boom")
+
+    return app
+
+
+def test_affinity():
+    shards = ShardDispatcher(make_app, workers=3, hot_keys=2)
+    shards.start(timeout=5)
+    try:
+        futures = [shards.trigger_event(f"/user/{i}", cid=f"cid-{i % 5}") for i in range(30)]
+        futures += [shards.trigger_event("/user/anonymous") for _ in range(3)]
+        for future in futures:
+            assert future.result(5) is None
+
+        threads = {}
+        for shard in shards.shards:
+            for cid, uid, thread in shard.listener.seen:
+                assert thread == shard.thread.ident
+                if not uid.startswith("anonymous"):
+                    assert shards.shard_for(cid) is shard
+                    threads.setdefault(cid, set()).add(thread)
+        assert len(threads) == 5 and all(len(t) == 1 for t in threads.values())
+        assert sum(len(shard.listener.seen) for shard in shards.shards) == 33
+        for shard in shards.shards:  # kept on their worker for the next events
+            assert {cid for cid in shard.listener.ctxs if cid.startswith("cid-")} == {
+                cid for cid in threads if shards.shard_for(cid) is shard
+            }
+
+        with pytest.raises(KeyError):
+            shards.trigger_event("/fail", cid="cid-0").result(5)
+
+        metrics = shards.metrics()
+        assert sum(shard["events"] for shard in metrics["shards"]) == 34
+        assert all(shard["inflight"] == 0 for shard in metrics["shards"])
+        hot = dict(metrics["shards"][shards.shards.index(shards.shard_for("cid-0"))]["hot_keys"])
+        assert hot["cid-0"] == 7 and len(hot) <= 2
+        assert metrics["skew"] >= 1
+        assert all(not shard["hot_keys"] for shard in shards.metrics()["shards"])  # counted since the previous call
+    finally:
+        shards.stop(timeout=5)
+    assert all(not shard.thread.is_alive() for shard in shards.shards)
+    with pytest.raises(ListenerClosed):
+        shards.trigger_event("/user/1", cid="cid-1")
+
+
+def test_shared_context():
+    shards = ShardDispatcher(make_app, workers=2)
+    shards.start(timeout=5)
+    try:
+        futures = [shards.trigger_event(f"/user/{i}", cid="customer") for i in range(10)]
+        for future in futures:
+            future.result(5)
+        assert shards.shard_for("customer").listener.builds == 1  # the Depends cache of the context is shared
+    finally:
+        shards.stop(timeout=5)
+
+
+def test_context_kept():
+    shards = ShardDispatcher(make_app, workers=2, max_ctxs=2)
+    shards.start(timeout=5)
+    try:
+        for i in range(3):
+            shards.trigger_event(f"/user/{i}", cid="same").result(5)
+        shard = shards.shard_for("same")
+        assert shard.listener.builds == 1  # sequential events share the context and its cache
+
+        cids = [f"cid-{i}" for i in range(20)]
+        cids = [cid for cid in cids if shards.shard_for(cid) is shard][:3]
+        for cid in cids:
+            shards.trigger_event("/user/1", cid=cid).result(5)
+        assert set(shard.listener.ctxs) == set(cids[1:])  # the least recently used one is dropped
+    finally:
+        shards.stop(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_wrap_future():
+    shards = ShardDispatcher(make_app, workers=2)
+    shards.start(timeout=5)
+    try:
+        await asyncio.gather(*(asyncio.wrap_future(shards.trigger_event("/user/1", cid=str(i))) for i in range(4)))
+    finally:
+        shards.stop(timeout=5)
+
+
+def test_concurrent_callers():
+    shards = ShardDispatcher(make_app, workers=2, hot_keys=100)
+    shards.start(timeout=5)
+    futures = []
+
+    def send(n: int) -> None:
+        futures.extend(shards.trigger_event(f"/user/{i}", cid=f"cid-{i % 10}") for i in range(n))
+
+    try:
+        threads = [threading.Thread(target=send, args=(200,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            future.result(5)
+        metrics = shards.metrics()
+        assert sum(shard["events"] for shard in metrics["shards"]) == 800
+        assert sum(count for shard in metrics["shards"] for _, count in shard["hot_keys"]) == 800
+        assert all(shard["inflight"] == 0 for shard in metrics["shards"])
+    finally:
+        shards.stop(timeout=5)
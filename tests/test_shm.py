@@ -0,0 +1,104 @@
+import asyncio
+import sys
+from multiprocessing import shared_memory
+
+import pytest
+
+from tiny_listener import Data, Param, RingFull, SharedMemoryListener, SharedRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRing.create(size=256, consumers=2)
+    yield ring
+    ring.close()
+
+
+def test_ring(ring: SharedRing):
+    reader = SharedRing.attach(ring.name)
+    received = {0: [], 1: []}
+    for i in range(100):
+        cid = f"cid-{i % 4}" if i % 2 else None
+        while not ring.put(f"event/{i}", b"x" * (i % 30), cid=cid):
+            for consumer in received:
+                received[consumer] += reader.get(consumer, limit=2)
+    for consumer in received:
+        received[consumer] += reader.get(consumer)
+    assert ring.used == 0
+
+    items = sorted(received[0] + received[1], key=lambda item: int(item[0].split("/")[1]))
+    assert [(int(path.split("/")[1]), len(data)) for path, _, data in items] == [(i, i % 30) for i in range(100)]
+    for cid in ("cid-1", "cid-3"):
+        owners = [consumer for consumer, items in received.items() if any(item[1] == cid for item in items)]
+        assert len(owners) == 1
+        paths = [path for path, item_cid, _ in received[owners[0]] if item_cid == cid]
+        assert paths == sorted(paths, key=lambda path: int(path.split("/")[1]))
+    reader.close()
+
+
+def test_ring_full(ring: SharedRing):
+    with pytest.raises(RingFull):
+        ring.put("big", bytes(ring.capacity))
+    while ring.put("event", b"data"):
+        pass
+    assert ring.used > ring.capacity - 32
+    SharedRing.attach(ring.name).get(0)
+    assert not ring.put("event")  # consumer 1 did not read yet
+
+
+def test_attach_invalid():
+    shm = shared_memory.SharedMemory(create=True, size=1024)
+    with pytest.raises(ValueError):
+        SharedRing.attach(shm.name)
+    shm.close()
+    shm.unlink()
+
+    with pytest.raises(ValueError):
+        SharedRing.create(consumers=0)
+
+
+@pytest.mark.asyncio
+async def test_listener_invalid_consumer(ring: SharedRing):
+    app = SharedMemoryListener(ring.name, consumer=2)
+    with pytest.raises(ValueError, match="no consumer 2"):
+        await app.listen()
+    assert app.ring is None
+
+
+PRODUCER = """
+import sys
+from tiny_listener import SharedRing
+
+ring = SharedRing.attach(sys.argv[1])
+for i in range(int(sys.argv[2])):
+    while not ring.put(f"order/{i}", str(i).encode(), cid=f"customer-{i % 3}"):
+        pass
+ring.close()
+"""
+
+
+@pytest.mark.asyncio
+async def test_listener():
+    ring = SharedRing.create(size=4096)
+    app = SharedMemoryListener(ring.name, batch_size=16)
+    orders = []
+
+    @app.on_event("order/{order_id}")
+    async def order(order_id: Param, data: Data):
+        assert data == order_id.encode()
+        orders.append(int(order_id))
+
+    await app.listen()
+    producer = await asyncio.create_subprocess_exec(sys.executable, "-c", PRODUCER, ring.name, "500")
+    while len(orders) < 500:
+        await asyncio.sleep(0.01)
+    assert await producer.wait() == 0
+    assert sorted(orders) == list(range(500))
+    assert app.received == 500 and not app.ctxs
+
+    ring.put("unknown")
+    ring.put("order/1", b"1", cid="customer")
+    await asyncio.sleep(0.01)
+    assert app.dropped == 1 and not app.ctxs
+    await app._close()
+    ring.close()
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from tiny_listener import Data, Listener, Param, Span, SpanExporter, SpillQueue, Tracer
+
+
+class App(Listener):
+    async def listen(self):
+        ...
+
+
+def make_app(**kwargs) -> App:
+    app = App(spill=SpillQueue(**kwargs))
+    app.started = []
+    app.gate = asyncio.Event()
+
+    @app.on_event("/user/{uid}/{n:int}")
+    async def user(uid: Param, n: Param, payload: Data):
+        app.started.append((uid, n))
+        await app.gate.wait()
+        return len(payload)
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_spill():
+    app = make_app(high_water=4, low_water=1, segment_size=256, interval=0.001)
+    futures = [
+        app.trigger_event(f"/user/{i % 3}/{i}", cid=f"cid-{i % 3}", timeout=5, data={"payload": b"x" * i * 10})
+        for i in range(30)
+    ]
+    await asyncio.sleep(0)
+    assert len(app.started) == 4
+    assert len(app.spill) == 26 and app.metrics()["spilled"] == 26
+    assert len(app.spill._segments) > 1
+
+    app.gate.set()
+    await asyncio.wait_for(asyncio.gather(*futures), 1)
+    assert app.spill.spilled == 26 and len(app.spill) == 0
+    for uid in "012":
+        assert [n for started_uid, n in app.started if started_uid == uid] == list(range(int(uid), 30, 3))
+    assert not app.spill._cids
+    await asyncio.sleep(0)
+    assert app.spill.feeder is None
+
+
+@pytest.mark.asyncio
+async def test_cid_order():
+    app = make_app(high_water=2, low_water=0, interval=0.05)
+    app.trigger_event("/user/a/0", cid="a", data={"payload": b""})
+    app.trigger_event("/user/a/1", cid="a", data={"payload": b""})
+    spilled = app.trigger_event("/user/a/2", cid="a", data={"payload": b""})
+    await asyncio.sleep(0)
+    app.gate.set()
+    while app.inflight:  # the in-flight events are done, the spilled one is not dispatched yet
+        await asyncio.sleep(0)
+    later = app.trigger_event("/user/a/3", cid="a", data={"payload": b""})
+    other = app.trigger_event("/user/b/0", cid="b", data={"payload": b""})
+    assert len(app.spill) == 2
+    await asyncio.wait_for(asyncio.gather(spilled, later, other), 1)
+    assert app.started == [("a", 0), ("a", 1), ("b", 0), ("a", 2), ("a", 3)]
+
+
+@pytest.mark.asyncio
+async def test_close():
+    app = make_app(high_water=1)
+    app.trigger_event("/user/a/0", data={"payload": b""})
+    spilled = app.trigger_event("/user/a/1", data={"payload": b""})
+    with pytest.raises(TypeError):
+        app.trigger_event("/user/a/2", data={"payload": object()})
+    app.spill.close()
+    assert spilled.cancelled() and len(app.spill) == 0 and app.spill.feeder is None
+    app.gate.set()
+
+
+@pytest.mark.asyncio
+async def test_spilled_span():
+    spans = []
+
+    class Exporter(SpanExporter):
+        def export(self, span: Span) -> None:
+            spans.append(span)
+
+    app = App(spill=SpillQueue(high_water=1, low_water=0, interval=0.001), tracer=Tracer(Exporter()))
+
+    @app.on_event("/work")
+    async def work():
+        await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(app.trigger_event("/work") for _ in range(3)))
+    assert app.spill.spilled == 2
+    assert len(spans) == 3 and all(span.duration < 1 for span in spans)
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import signal
+from tempfile import TemporaryDirectory
+from typing import List
+
+import pytest
+
+from tiny_listener import Data, FileTailListener
+
+
+@pytest.fixture
+def tmp():
+    with TemporaryDirectory() as path:
+        yield path
+
+
+def write(filename: str, data: bytes, mode: str = "ab") -> None:
+    with open(filename, mode) as f:
+        f.write(data)
+
+
+def make_app(files: List[str], **kwargs) -> FileTailListener:
+    app = FileTailListener(files, **kwargs)
+    app.received = []
+
+    @app.on_event("{_:path}")
+    async def record(record: Data, filename: Data):
+        app.received.append((os.path.basename(filename), record))
+
+    return app
+
+
+async def settle(app: FileTailListener) -> List[str]:
+    for _ in range(3):
+        while app.poll():
+            pass
+    if app.inflight:
+        await asyncio.wait(list(app.inflight))
+    await asyncio.sleep(0)
+    received = [record for _, record in app.received]
+    app.received.clear()
+    return received
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_mmap", [True, False])
+async def test_follow(tmp: str, use_mmap: bool):
+    log = os.path.join(tmp, "app.log")
+    write(log, b"a\nb\n\nc")
+    app = make_app([log, os.path.join(tmp, "later.log")], use_mmap=use_mmap, chunk_size=4)
+    await app.listen()
+
+    assert await settle(app) == ["a", "b"]
+    write(log, b"c\nd\n")
+    assert await settle(app) == ["cc", "d"]
+
+    write(os.path.join(tmp, "later.log"), "é\n".encode())
+    assert app.received == [] and await settle(app) == ["é"]
+
+    write(log, b"x" * 10 + b"\n")
+    assert await settle(app) == ["xxxx", "xxxx", "xx"]
+    assert not app.ctxs
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_truncate_rotate(tmp: str):
+    log = os.path.join(tmp, "app.log")
+    write(log, b"1\n2\n")
+    app = make_app([log])
+    await app.listen()
+    assert await settle(app) == ["1", "2"]
+
+    write(log, b"3\n", "wb")
+    assert await settle(app) == ["3"]
+
+    write(log, b"4\npartial")
+    os.rename(log, log + ".1")
+    write(log, b"5\n")
+    assert await settle(app) == ["4", "partial", "5"]
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint(tmp: str):
+    log = os.path.join(tmp, "app.log")
+    checkpoint = os.path.join(tmp, "offsets.json")
+    write(log, b"1\n2\n")
+
+    app = make_app([log], checkpoint=checkpoint)
+    await app.listen()
+    assert await settle(app) == ["1", "2"]
+    await app._close()
+
+    write(log, b"3\n")
+    app = make_app([log], checkpoint=checkpoint)
+    await app.listen()
+    assert await settle(app) == ["3"]
+    await app._close()
+
+    write(log + ".new", b"new\n")
+    os.replace(log + ".new", log)
+    app = make_app([log], checkpoint=checkpoint)
+    await app.listen()
+    assert await settle(app) == ["new"]
+    await app._close()
+
+
+def test_shutdown(tmp: str):
+    log = os.path.join(tmp, "app.log")
+    checkpoint = os.path.join(tmp, "offsets.json")
+    write(log, b"slow\n")
+    app = FileTailListener([log], checkpoint=checkpoint, interval=0.01)
+
+    @app.on_event("slow")
+    async def slow():
+        os.kill(os.getpid(), signal.SIGINT)
+        await asyncio.sleep(0.05)
+        write(log, b"late\n")  # during the drain
+        await asyncio.sleep(0.1)
+
+    app.run()
+    assert app.records == 1 and app.dropped == 0
+
+    async def restart() -> List[str]:
+        app = make_app([log], checkpoint=checkpoint)
+        await app.listen()
+        received = await settle(app)
+        await app._close()
+        return received
+
+    assert asyncio.new_event_loop().run_until_complete(restart()) == ["late"]
+
+
+@pytest.mark.asyncio
+async def test_to_path(tmp: str):
+    log = os.path.join(tmp, "app.log")
+    write(log, b"old\n")
+    levels = []
+    to_path = lambda record, _: record.split(" ")[0] if " " in record else None  # noqa: E731
+    app = FileTailListener([log], to_path=to_path, interval=0.01, from_end=True)
+
+    @app.on_event("ERROR")
+    async def error(record: Data):
+        levels.append(record)
+
+    await app.listen()
+    write(log, b"INFO ok\nERROR boom\nskipped\n")
+    await asyncio.sleep(0.05)
+    assert levels == ["ERROR boom"]
+    assert app.records == 2
+    assert app.dropped == 1
+    await app._close()
@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import sys
+
+import pytest
+
+from tiny_listener import Listener, Scheduler
+from tiny_listener.tasks import create_eager_task
+
+var = contextvars.ContextVar("var", default="origin")
+
+
+@pytest.mark.asyncio
+async def test_eager_done_inline():
+    step = []
+
+    async def foo():
+        step.append(1)
+        var.set("changed")
+        return "foo"
+
+    future = create_eager_task(foo())
+    assert step == [1]
+    assert future.done()
+    assert await future == "foo"
+    assert var.get() == "origin"
+
+
+@pytest.mark.asyncio
+async def test_eager_suspend():
+    step = []
+
+    async def foo():
+        step.append(1)
+        await asyncio.sleep(0.01)
+        step.append(2)
+        return "foo"
+
+    task = create_eager_task(foo())
+    assert step == [1]
+    assert not task.done()
+    assert await task == "foo"
+    assert step == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_eager_error():
+    async def foo():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await create_eager_task(foo())
+
+    async def bar():
+        raise asyncio.CancelledError()
+
+    assert create_eager_task(bar()).cancelled()
+
+    async def baz():
+        await asyncio.sleep(0)
+        raise KeyError()
+
+    with pytest.raises(KeyError):
+        await create_eager_task(baz())
+
+
+@pytest.mark.asyncio
+async def test_eager_cancel_and_timeout():
+    scheduler = Scheduler()
+
+    tasks = []
+
+    async def foo():
+        tasks.append(asyncio.current_task())
+        with scheduler.timeout(0.01):
+            await asyncio.sleep(1)
+
+    task = create_eager_task(foo())
+    assert tasks == [task] and task is not asyncio.current_task()
+    with pytest.raises(asyncio.TimeoutError):
+        await task
+
+    task = create_eager_task(asyncio.sleep(1))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="asyncio.timeout is new in 3.11")
+@pytest.mark.asyncio
+async def test_eager_asyncio_timeout():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App(eager=True)
+
+    @app.on_event("/slow")
+    async def slow():
+        async with asyncio.timeout(0.01):  # type: ignore
+            await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await app.trigger_event("/slow")
+    await asyncio.sleep(0.02)  # the caller is not cancelled
+
+    loop = asyncio.get_event_loop()
+    triggered = loop.create_future()
+    loop.call_soon(lambda: triggered.set_result(app.trigger_event("/slow")))  # outside of any task
+    with pytest.raises(asyncio.TimeoutError):
+        await (await triggered)
+
+
+def test_eager_loop_not_running():
+    loop = asyncio.new_event_loop()
+    try:
+        task = create_eager_task(asyncio.sleep(0), loop)
+        assert isinstance(task, asyncio.Task)
+        loop.run_until_complete(task)
+    finally:
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_listener_eager():
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    app = App(eager=True)
+    step = []
+
+    @app.on_event("/sync")
+    async def sync():
+        step.append("sync")
+
+    @app.on_event("/lazy", eager=False)
+    async def lazy():
+        step.append("lazy")
+
+    task = app.trigger_event("/sync")
+    assert step == ["sync"]
+    assert task.done()
+    assert app.inflight == {}
+
+    task = app.trigger_event("/lazy")
+    assert step == ["sync"]
+    assert app.inflight == {task: app.ctxs[next(reversed(app.ctxs))].events[app.routes["lazy"]][0]}
+    await task
+    assert step == ["sync", "lazy"]
@@ -0,0 +1,167 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+
+from tiny_listener import Context, Data, Depends, EventNotFound, ListenerError, Param
+from tiny_listener.tcp import Connection, TCPListener
+
+
+class App(TCPListener):
+    def __init__(self, **kwargs):
+        super().__init__("127.0.0.1", 0, **kwargs)
+        self.errors: List[Tuple[str, ListenerError]] = []
+
+    def on_error_line(self, connection: Connection, line: str, error: ListenerError) -> None:
+        self.errors.append((line, error))
+        connection.write(b"?\n")
+
+
+async def serve(**kwargs) -> App:
+    app = App(**kwargs)
+    await app.listen()
+    return app
+
+
+async def connect(app: App) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    port = app.server.sockets[0].getsockname()[1]
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+@pytest.mark.asyncio
+async def test_lines():
+    app = await serve()
+    calls = []
+
+    async def get_peer(ctx: Context):
+        calls.append("depends")
+        return ctx.scope["connection"].peername
+
+    @app.on_event("echo {word}")
+    async def echo(word: Param, connection: Data, peer=Depends(get_peer)):
+        calls.append(word)
+        connection.write(f"{word}\n".encode())
+
+    reader, writer = await connect(app)
+    writer.write(b"echo a\r\necho b\n\necho c\nmissing\necho ")
+    await writer.drain()
+    replies = [await reader.readline() for _ in range(4)]
+    assert sorted(replies) == [b"?\n", b"a\n", b"b\n", b"c\n"]
+    writer.write(b"d\n")
+    assert await reader.readline() == b"d\n"
+
+    assert calls.count("depends") == 1
+    assert [word for word in calls if word != "depends"] == ["a", "b", "c", "d"]
+    assert [line for line, _ in app.errors] == ["missing"]
+    assert isinstance(app.errors[0][1], EventNotFound)
+
+    (connection,) = app.connections
+    assert connection.ctx.cid in app.ctxs
+    assert sum(len(events) for events in connection.ctx.events.values()) <= 1
+
+    writer.close()
+    await writer.wait_closed()
+    await asyncio.sleep(0.01)
+    assert not app.connections
+    assert connection.ctx.cid not in app.ctxs
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_write_coalescing():
+    app = await serve()
+
+    @app.on_event("burst")
+    async def burst(connection: Data):
+        for i in range(100):
+            connection.write(b"x")
+        connection.write(b"\n")
+
+    writes = []
+    reader, writer = await connect(app)
+    writer.write(b"burst\n")
+    await writer.drain()
+    await asyncio.sleep(0.01)
+    (connection,) = app.connections
+    write = connection.transport.write
+    connection.transport.write = lambda data: writes.append(data) or write(data)
+    writer.write(b"burst\n")
+    assert await reader.readline() == b"x" * 100 + b"\n"
+    assert await reader.readline() == b"x" * 100 + b"\n"
+    assert writes == [b"x" * 100 + b"\n"]
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_large_lines():
+    app = await serve(buffer_size=16, max_line_size=1024)
+    received = []
+
+    @app.on_event("{line}")
+    async def line(line: Param):
+        received.append(line)
+
+    reader, writer = await connect(app)
+    for size in (10, 100, 500):
+        writer.write(b"a" * size + b"\n")
+        await writer.drain()
+        await asyncio.sleep(0.01)
+    assert [len(line) for line in received] == [10, 100, 500]
+
+    writer.write(b"b" * 4096)
+    await writer.drain()
+    with pytest.raises(ConnectionResetError):
+        await reader.read()
+    assert len(received) == 3
+    assert not app.connections
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_half_close():
+    app = await serve()
+
+    @app.on_event("slow")
+    async def slow(connection: Data):
+        await asyncio.sleep(0.05)
+        connection.write(b"done\n")
+
+    reader, writer = await connect(app)
+    writer.write(b"slow")
+    writer.write_eof()
+    assert await reader.read() == b"done\n"
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_backpressure():
+    app = await serve(high_water=4, low_water=1)
+    release = asyncio.Event()
+    running = []
+
+    @app.on_event("block {n}")
+    async def block(n: Param):
+        running.append(n)
+        await release.wait()
+
+    reader, writer = await connect(app)
+    for i in range(4):
+        writer.write(f"block {i}\n".encode())
+        await writer.drain()
+        await asyncio.sleep(0.01)
+    assert app.paused
+    (connection,) = app.connections
+    assert not connection.transport.is_reading()
+
+    writer.write(b"block 4\n")
+    await writer.drain()
+    await asyncio.sleep(0.01)
+    assert len(running) == 4
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert not app.paused
+    assert connection.transport.is_reading()
+    await asyncio.sleep(0.01)
+    assert running == ["0", "1", "2", "3", "4"]
+    await app._close()
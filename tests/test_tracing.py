@@ -0,0 +1,127 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from typing import List
+
+import pytest
+
+from tiny_listener import (
+    Context,
+    Depends,
+    JSONLinesExporter,
+    Listener,
+    Span,
+    SpanExporter,
+    Tracer,
+)
+
+
+class MemoryExporter(SpanExporter):
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exporter() -> MemoryExporter:
+    return MemoryExporter()
+
+
+@pytest.fixture
+def app(exporter: MemoryExporter) -> Listener:
+    class App(Listener):
+        async def listen(self):
+            ...
+
+    return App(tracer=Tracer(exporter))
+
+
+def test_span():
+    parent = Span("parent", "/parent", "cid")
+    span = Span("child", "/child", "cid", parent=parent)
+    assert parent.parent_id is None
+    assert len(parent.trace_id) == 32
+    assert len(parent.span_id) == 16
+    assert span.trace_id == parent.trace_id
+    assert span.parent_id == parent.span_id
+
+    since = span.mark("handler", span.mark("match", 0))
+    assert since > 0
+    span.finish(ValueError())
+    data = span.to_dict()
+    assert data["error"] == "ValueError"
+    assert [phase["name"] for phase in data["phases"]] == ["match", "handler"]
+    assert data["duration"] > 0
+
+
+@pytest.mark.asyncio
+async def test_trace_chain(app: Listener, exporter: MemoryExporter):
+    async def get_user():
+        return "bob"
+
+    @app.before_event
+    async def before():
+        ...
+
+    @app.on_event("/parent")
+    async def parent(ctx: Context, user: str = Depends(get_user)):
+        await ctx.trigger_event("/child")
+
+    @app.on_event("/child")
+    async def child():
+        raise ValueError()
+
+    @app.on_error(ValueError)
+    async def on_error():
+        ...
+
+    await app.trigger_event("/parent")
+    child_span, parent_span = exporter.spans
+    assert parent_span.name == "parent"
+    assert parent_span.parent_id is None
+    assert parent_span.error is None
+    assert child_span.name == "child"
+    assert child_span.path == "/child"
+    assert child_span.cid == parent_span.cid
+    assert child_span.trace_id == parent_span.trace_id
+    assert child_span.parent_id == parent_span.span_id
+    assert child_span.error == "ValueError"
+    assert [name for name, *_ in parent_span.phases] == [
+        "match",
+        "before_event",
+        "Depends(get_user)",
+        "handler",
+        "after_event",
+    ]
+    assert [name for name, *_ in child_span.phases] == ["match", "before_event"]
+
+    await app.trigger_event("/child")
+    assert exporter.spans[-1].trace_id != parent_span.trace_id
+
+
+@pytest.mark.asyncio
+async def test_json_lines_exporter():
+    with TemporaryDirectory() as path:
+        filename = os.path.join(path, "spans.jsonl")
+        tracer = Tracer(JSONLinesExporter(filename))
+
+        class App(Listener):
+            async def listen(self):
+                ...
+
+        app = App(tracer=tracer)
+
+        @app.on_event()
+        async def foo():
+            ...
+
+        await app.trigger_event("/foo")
+        await app.trigger_event("/foo")
+        tracer.close()
+
+        with open(filename) as f:
+            spans = [json.loads(line) for line in f]
+        assert [span["name"] for span in spans] == ["foo", "foo"]
+        assert spans[0]["trace_id"] != spans[1]["trace_id"]
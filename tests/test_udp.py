@@ -0,0 +1,88 @@
+import asyncio
+import socket
+
+import pytest
+
+from tiny_listener import Data, Param, UDPListener
+
+
+async def serve(**kwargs) -> UDPListener:
+    app = UDPListener("127.0.0.1", 0, **kwargs)
+    await app.listen()
+    return app
+
+
+def client() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+@pytest.mark.asyncio
+async def test_datagrams():
+    app = await serve(batch_size=4)
+    received = []
+
+    @app.on_event("ping {n:int}")
+    async def ping(n: Param, datagram: Data, addr: Data):
+        received.append((n, datagram))
+        app.sendto(b"pong %d" % n, addr)
+
+    sock = client()
+    for i in range(10):
+        sock.sendto(b"ping %d\n" % i, app.address)
+    sock.sendto(b"missing", app.address)
+    await asyncio.sleep(0.05)
+
+    assert sorted(received) == [(i, b"ping %d\n" % i) for i in range(10)]
+    assert app.received == 11
+    assert app.dropped == 1
+    assert not app.ctxs
+    sock.setblocking(False)
+    assert sorted(sock.recv(64) for _ in range(10)) == sorted(b"pong %d" % i for i in range(10))
+    sock.close()
+    await app._close()
+    assert app.sock is None
+
+
+@pytest.mark.asyncio
+async def test_batch_event():
+    app = await serve(batch_size=8, batch_event="telemetry", buffer_size=16)
+    batches = []
+
+    @app.on_event("telemetry")
+    async def telemetry(datagrams: Data):
+        batches.append(datagrams)
+
+    sock = client()
+    for i in range(20):
+        sock.sendto(b"%d" % i + b"." * 20, app.address)
+    await asyncio.sleep(0.05)
+
+    assert [len(batch) for batch in batches] == [8, 8, 4]
+    payloads = [payload for batch in batches for payload, _ in batch]
+    assert payloads == [(b"%d" % i + b"." * 20)[:16] for i in range(20)]
+    assert {addr for batch in batches for _, addr in batch} == {sock.getsockname()}
+    assert not app.ctxs
+    sock.close()
+    await app._close()
+
+
+@pytest.mark.asyncio
+async def test_all_interfaces():
+    app = UDPListener(None, 0)
+    await app.listen()
+    received = []
+
+    @app.on_event("ping")
+    async def ping():
+        received.append("ping")
+
+    host = app.address[0]
+    assert host in ("0.0.0.0", "::")
+    sock = client()
+    sock.sendto(b"ping", ("127.0.0.1", app.address[1]))
+    await asyncio.sleep(0.05)
+    assert received == ["ping"]
+    sock.close()
+    await app._close()
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import signal
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from tiny_listener import Data, Listener, Param, WriteAheadLog
+
+
+class App(Listener):
+    async def listen(self):
+        ...
+
+
+@pytest.fixture
+def directory():
+    with TemporaryDirectory() as path:
+        yield path
+
+
+def segments(directory: str):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".wal"))
+
+
+@pytest.mark.asyncio
+async def test_group_commit(directory: str):
+    wal = WriteAheadLog(directory)
+    seqs = [wal.append(f"/user/{i}", None, {"i": i}) for i in range(100)]
+    assert wal.pending == 100
+    await wal.sync()
+    assert wal.commits == 1
+    for seq in seqs[:60]:
+        wal.done(seq)
+    wal.done(seqs[0])
+    assert wal.pending == 40
+    await wal.close()
+
+    wal = WriteAheadLog(directory)
+    recovered = wal.recover()
+    assert [frame.data for frame in recovered] == [{"i": i} for i in range(60, 100)]
+    seq = wal.append("/user/100", None, None)
+    assert seq == 100
+    await wal.close()
+    assert len(segments(directory)) == 1  # the old segment is removed once recovered
+
+    assert [frame.path for frame in WriteAheadLog(directory).recover()] == ["/user/100"]
+
+
+@pytest.mark.asyncio
+async def test_segments(directory: str):
+    wal = WriteAheadLog(directory, segment_size=1000, fsync=False)
+    seqs = []
+    for i in range(50):
+        seqs.append(wal.append("/user/1", "cid", {"payload": b"x" * 100}))
+        await wal.sync()
+    assert len(segments(directory)) > 5
+    for seq in seqs[:45]:
+        wal.done(seq)
+    await wal.sync()
+    assert len(segments(directory)) <= 2
+    await wal.close()
+    assert len(WriteAheadLog(directory).recover()) == 5
+
+
+@pytest.mark.asyncio
+async def test_segments_removed_in_order(directory: str):
+    wal = WriteAheadLog(directory, segment_size=1, fsync=False)
+    x, _ = wal.append("/x", None, None), wal.append("/y", None, None)
+    await wal.sync()
+    z = wal.append("/z", None, None)
+    wal.done(x)  # written in the segment of /z, while /y keeps the older one
+    await wal.sync()
+    wal.done(z)
+    await wal.sync()
+    assert len(segments(directory)) == 3
+    # crash, nothing closed
+    assert [frame.path for frame in WriteAheadLog(directory).recover()] == ["/y"]
+
+
+@pytest.mark.asyncio
+async def test_torn_entry(directory: str):
+    wal = WriteAheadLog(directory)
+    wal.append("/a", None, None)
+    wal.append("/b", None, None)
+    await wal.close()
+    (segment,) = segments(directory)
+    with open(os.path.join(directory, segment), "r+b") as f:
+        f.truncate(os.path.getsize(f.name) - 1)
+    assert [frame.path for frame in WriteAheadLog(directory).recover()] == ["/a"]
+
+
+def test_encode_error(directory: str):
+    wal = WriteAheadLog(directory)
+    with pytest.raises(TypeError):
+        wal.append("/a", None, {"obj": object()})
+    assert wal.pending == 0
+    assert WriteAheadLog(os.path.join(directory, "other"), default=repr).append("/a", None, {"obj": object()}) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wait_commit", [True, False])
+async def test_dispatch_after_commit(directory: str, wait_commit: bool):
+    app = App(wal=WriteAheadLog(directory, wait_commit=wait_commit), eager=True)
+    durable = []
+
+    @app.on_event("/user/{uid}")
+    async def user(uid: Param):
+        durable.append([frame.path for frame in WriteAheadLog(directory).recover()])
+
+    futures = [app.trigger_event(f"/user/{i}") for i in range(10)]
+    if wait_commit:
+        assert durable == [] and app.wal.commits == 0  # held until the batch is synced
+    else:
+        assert durable == [[]] * 10
+    await asyncio.gather(*futures)
+    if wait_commit:
+        assert app.wal.commits >= 1
+        assert all(paths == [f"/user/{i}" for i in range(10)] for paths in durable)
+    assert app.wal.pending == 0
+    await app.wal.close()
+
+
+def test_listener_replay(directory: str):
+    app = App(wal=WriteAheadLog(directory), drain_timeout=0.05, drain_interval=0.01)
+    done, pending = [], []
+
+    @app.on_event("/user/{uid}")
+    async def user(uid: Param, delay: Data):
+        await asyncio.sleep(delay)
+        done.append(uid)
+
+    @app.on_event("/fail")
+    async def fail():
+        raise ValueError()
+
+    @app.startup
+    async def start():
+        app.trigger_event("/user/1", data={"delay": 0})
+        app.trigger_event("/user/2", data={"delay": 10})  # cancelled by the drain deadline
+        app.trigger_event("/fail")
+        await asyncio.sleep(0.01)
+        pending.append(app.metrics()["wal_pending"])
+        os.kill(os.getpid(), signal.SIGINT)
+
+    app.run()
+    assert done == ["1"] and pending == [1]
+
+    app = App(wal=WriteAheadLog(directory))
+    replayed = []
+
+    @app.on_event("/user/{uid}")
+    async def replay(uid: Param, delay: Data):
+        replayed.append((uid, delay))
+        os.kill(os.getpid(), signal.SIGINT)
+
+    app.run()
+    assert replayed == [("2", 10)]
+    assert WriteAheadLog(directory).recover() == []
@@ -3,6 +3,16 @@
 
 __version__ = "1.2.1"
 
+from .admission import (
+    AdmissionController,
+    InflightPolicy,
+    LagPolicy,
+    Policy,
+    QueueAgePolicy,
+)
+from .cluster import Cluster, HashRing
+from .codec import EventFrame, decode_event, dump_event, encode_event
+from .consumer import Broker, MemoryBroker, Message, QueueConsumerListener
 from .context import Context, Scope
 from .errors import (
     ContextAlreadyExists,
@@ -12,15 +22,34 @@ from .errors import (
     EventAlreadyExists,
     EventDataError,
     EventNotFound,
+    EventRejected,
+    ListenerClosed,
+    ListenerError,
     ListenerNotFound,
     PathParamsError,
+    RemoteError,
+    RingFull,
     RouteError,
 )
 from .event import Event
 from .hook import Data, Depends, Hook, Param, depend
+from .http import HTTPConnection, HTTPListener, Request
+from .limiter import AIMDLimiter, GradientLimiter, Limiter
 from .listener import Listener, get_current_running_listener
+from .monitor import LoopMonitor
+from .recorder import Record, Recorder, read_records
+from .retry import Retry
 from .routing import Route, compile_path
+from .scheduler import Cron, Job, Scheduler, Timeout
+from .shard import Shard, ShardDispatcher
+from .shm import SharedMemoryListener, SharedRing
+from .spill import SpillQueue
+from .tail import FileTailListener
+from .tcp import Connection, TCPListener
+from .tracing import JSONLinesExporter, Span, SpanExporter, Tracer
+from .udp import UDPListener
 from .utils import check_coro_func, import_from_string, is_main_thread
+from .wal import WriteAheadLog
 
 __all__ = [
     "__version__",
@@ -36,6 +65,8 @@ __all__ = [
     "DuplicateListener",
     "get_current_running_listener",
     "ListenerNotFound",
+    "ListenerClosed",
+    "ListenerError",
     "Scope",
     "Event",
     "EventAlreadyDone",
@@ -49,6 +80,53 @@ __all__ = [
     "Route",
     "RouteError",
     "compile_path",
+    "Scheduler",
+    "Timeout",
+    "Job",
+    "Cron",
+    "Retry",
+    "Span",
+    "SpanExporter",
+    "JSONLinesExporter",
+    "Tracer",
+    "LoopMonitor",
+    "AdmissionController",
+    "Policy",
+    "LagPolicy",
+    "QueueAgePolicy",
+    "InflightPolicy",
+    "EventRejected",
+    "Limiter",
+    "AIMDLimiter",
+    "GradientLimiter",
+    "Recorder",
+    "Record",
+    "read_records",
+    "TCPListener",
+    "Connection",
+    "HTTPListener",
+    "HTTPConnection",
+    "Request",
+    "UDPListener",
+    "QueueConsumerListener",
+    "Broker",
+    "MemoryBroker",
+    "Message",
+    "FileTailListener",
+    "SharedRing",
+    "SharedMemoryListener",
+    "RingFull",
+    "EventFrame",
+    "encode_event",
+    "decode_event",
+    "dump_event",
+    "WriteAheadLog",
+    "SpillQueue",
+    "Cluster",
+    "HashRing",
+    "RemoteError",
+    "Shard",
+    "ShardDispatcher",
     "import_from_string",
     "EventAlreadyExists",
 ]
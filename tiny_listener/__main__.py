@@ -1,9 +1,11 @@
+import json
 import sys
-from typing import Any
+from typing import Any, List, Union
 
 import click
 
 import tiny_listener
+from tiny_listener.bench import Report, load_templates, run_bench, run_replay
 
 
 def show_version(ctx: click.Context, _: Any, value: Any) -> None:
@@ -12,8 +14,30 @@ def show_version(ctx: click.Context, _: Any, value: Any) -> None:
         ctx.exit()
 
 
-@click.command()
-@click.option("--app-dir", "app_dir", default=".", show_default=True, help="Your APP directory.")
+def load_app(app_dir: str, app: str) -> tiny_listener.Listener:
+    sys.path.insert(0, app_dir)
+    try:
+        return tiny_listener.import_from_string(app)
+    except Exception as e:
+        click.echo(e)
+        sys.exit(1)
+
+
+def echo_report(report: Report, as_json: bool) -> None:
+    click.echo(json.dumps(report.to_dict(), indent=2) if as_json else report.format())
+
+
+class DefaultGroup(click.Group):
+    """Arguments which are not a command are given to the `run` command, so `tiny-listener main:app` works"""
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        own_opts = {opt for param in self.get_params(ctx) for opt in param.opts}
+        if args and args[0] not in self.commands and args[0] not in own_opts:
+            args.insert(0, "run")
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup)
 @click.option(
     "--version",
     is_flag=True,
@@ -22,16 +46,100 @@ def show_version(ctx: click.Context, _: Any, value: Any) -> None:
     is_eager=True,
     help="Display version info.",
 )
+def main() -> None:
+    pass
+
+
+@main.command()
+@click.option("--app-dir", "app_dir", default=".", show_default=True, help="Your APP directory.")
 @click.argument("app")
-def main(app_dir: str, app: str) -> None:
-    sys.path.insert(0, app_dir)
-    try:
-        listener: tiny_listener.Listener = tiny_listener.import_from_string(app)
-    except Exception as e:
-        click.echo(e)
-        sys.exit(1)
-    else:
-        listener.run()
+def run(app_dir: str, app: str) -> None:
+    """Run the APP listener, e.g. `tiny-listener run main:app` or simply `tiny-listener main:app`."""
+    listener = load_app(app_dir, app)
+    listener.run()
+
+
+@main.command()
+@click.option("--app-dir", "app_dir", default=".", show_default=True, help="Your APP directory.")
+@click.option(
+    "-t",
+    "--template",
+    "template",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help='JSON (lines) file of events to generate, e.g. {"path": "/user/{n}", "data": {}, "weight": 1}.',
+)
+@click.option("-n", "--count", type=int, default=None, help="Number of events, default to 10000 without --duration.")
+@click.option("-d", "--duration", type=float, default=None, help="Max seconds of the run.")
+@click.option("-r", "--rate", type=float, default=None, help="Target events per second, default to max speed.")
+@click.option("-c", "--concurrency", type=int, default=1000, show_default=True, help="Max events in flight.")
+@click.option("--timeout", type=float, default=None, help="Timeout of each event.")
+@click.option("--seed", type=int, default=None, help="Seed of the template selection.")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON.")
+@click.argument("app")
+def bench(
+    app_dir: str,
+    template: str,
+    count: Union[int, None],
+    duration: Union[float, None],
+    rate: Union[float, None],
+    concurrency: int,
+    timeout: Union[float, None],
+    seed: Union[int, None],
+    as_json: bool,
+    app: str,
+) -> None:
+    """Load test the APP in-process with synthetic events, its `listen()` is not called."""
+    listener = load_app(app_dir, app)
+    templates = load_templates(template)
+    loop = listener.setup_event_loop()
+    report = loop.run_until_complete(
+        run_bench(
+            listener,
+            templates,
+            count=10000 if count is None and duration is None else count,
+            duration=duration,
+            rate=rate,
+            concurrency=concurrency,
+            timeout=timeout,
+            seed=seed,
+        )
+    )
+    echo_report(report, as_json)
+
+
+@main.command()
+@click.option("--app-dir", "app_dir", default=".", show_default=True, help="Your APP directory.")
+@click.option("-s", "--speed", type=float, default=1, show_default=True, help="Ratio of the original pace.")
+@click.option("--max-speed", is_flag=True, help="Replay as fast as possible.")
+@click.option("-c", "--concurrency", type=int, default=1000, show_default=True, help="Max events in flight.")
+@click.option("--timeout", type=float, default=None, help="Timeout of each event.")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON.")
+@click.argument("app")
+@click.argument("recording", type=click.Path(exists=True, dir_okay=False))
+def replay(
+    app_dir: str,
+    speed: float,
+    max_speed: bool,
+    concurrency: int,
+    timeout: Union[float, None],
+    as_json: bool,
+    app: str,
+    recording: str,
+) -> None:
+    """Replay a RECORDING of events in the APP in-process, its `listen()` is not called."""
+    listener = load_app(app_dir, app)
+    loop = listener.setup_event_loop()
+    report = loop.run_until_complete(
+        run_replay(
+            listener,
+            recording,
+            speed=None if max_speed else speed,
+            concurrency=concurrency,
+            timeout=timeout,
+        )
+    )
+    echo_report(report, as_json)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+import math
+import time
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+from .errors import ListenerError
+
+if TYPE_CHECKING:
+    from .listener import Listener  # noqa # pylint: disable=unused-import
+    from .routing import Route
+
+
+class Policy:
+    """Decide whether an event of a route is admitted, routes with `priority` or higher are always admitted.
+
+    The priority of a route is set by its `priority` option, default to 0.
+    """
+
+    def __init__(self, priority: int = 1) -> None:
+        self.priority = priority
+
+    def attach(self, listener: "Listener") -> None:
+        """Check that the listener provides what the policy measures
+
+        :raises ListenerError: The policy can not work with this listener
+        """
+
+    def overloaded(self, controller: "AdmissionController", listener: "Listener") -> bool:
+        raise NotImplementedError()
+
+    def admit(self, controller: "AdmissionController", listener: "Listener", route: "Route") -> bool:
+        return route.opts.get("priority", 0) >= self.priority or not self.overloaded(controller, listener)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(priority={self.priority})"
+
+
+class LagPolicy(Policy):
+    """Shed when the loop lag measured by the listener `LoopMonitor` exceeds the target"""
+
+    def __init__(self, target: float, priority: int = 1) -> None:
+        super().__init__(priority)
+        self.target = target
+
+    def attach(self, listener: "Listener") -> None:
+        if listener.monitor is None:
+            raise ListenerError(f"{self} needs the listener to have a `LoopMonitor`")
+
+    def overloaded(self, controller: "AdmissionController", listener: "Listener") -> bool:
+        return listener.monitor is not None and listener.monitor.lag > self.target
+
+
+class QueueAgePolicy(Policy):
+    """Shed when events wait longer than the target between `trigger_event` and the start of their handling"""
+
+    def __init__(self, target: float, priority: int = 1) -> None:
+        super().__init__(priority)
+        self.target = target
+
+    def overloaded(self, controller: "AdmissionController", listener: "Listener") -> bool:
+        return controller.queue_age > self.target
+
+
+class InflightPolicy(Policy):
+    """Shed when too many events are running"""
+
+    def __init__(self, limit: int, priority: int = 1) -> None:
+        super().__init__(priority)
+        self.limit = limit
+
+    def overloaded(self, controller: "AdmissionController", listener: "Listener") -> bool:
+        return len(listener.inflight) >= self.limit
+
+
+class AdmissionController:
+    """Protect the listener latency by shedding low priority events when any policy reports an overload.
+
+    Shed events are rejected with `EventRejected`, or deferred `defer` seconds at most `max_defers` times.
+    """
+
+    def __init__(self, *policies: Policy, defer: float = 0, max_defers: int = 3, decay: float = 1) -> None:
+        """
+        :param policies: Admission policies, all of them must admit the event
+        :param defer: Seconds to defer a shed event before trying again, 0 means reject it at once
+        :param max_defers: Max times an event is deferred before being rejected
+        :param decay: Time constant in seconds of the queue age moving average
+        """
+        self.policies = policies
+        self.defer = defer
+        self.max_defers = max_defers
+        self.decay = decay
+        self.__queue_age: Tuple[float, float] = (0.0, time.monotonic())
+
+    @property
+    def queue_age(self) -> float:
+        """Moving average of the queue age, decaying when no event is dispatched"""
+        value, at = self.__queue_age
+        return value * math.exp((at - time.monotonic()) / self.decay)
+
+    def observe_queue_age(self, age: float) -> None:
+        value, at = self.__queue_age
+        now = time.monotonic()
+        weight = math.exp((at - now) / self.decay)
+        self.__queue_age = (value * weight + age * (1 - weight), now)
+
+    def attach(self, listener: "Listener") -> None:
+        """Called by the listener owning the controller
+
+        :raises ListenerError: A policy can not work with this listener
+        """
+        for policy in self.policies:
+            policy.attach(listener)
+
+    def admit(self, listener: "Listener", route: "Route") -> bool:
+        for policy in self.policies:
+            if not policy.admit(self, listener, route):
+                return False
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Admission state reported by `Listener.metrics()`"""
+        return {"queue_age": self.queue_age}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(policies={self.policies})"
@@ -0,0 +1,232 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from functools import partial
+from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, NamedTuple, Union
+
+from .errors import EventNotFound
+from .metrics import Histogram
+from .recorder import read_records
+
+if TYPE_CHECKING:
+    from .listener import Listener  # noqa # pylint: disable=unused-import
+
+
+class Template(NamedTuple):
+    """An event to generate, `{n}` and `{uuid}` in the path are replaced by the event number and a random UUID"""
+
+    path: str
+    data: Dict[str, Any]
+    weight: float = 1
+    cid: Union[str, None] = None
+
+    def render(self, n: int) -> str:
+        if "{" not in self.path:
+            return self.path
+        return self.path.format(n=n, uuid=uuid.uuid4() if "{uuid}" in self.path else None)
+
+
+def load_templates(filename: str) -> List[Template]:
+    """Load templates from a JSON array or a JSON lines file, such as:
+
+    {"path": "/user/{n}/login", "data": {"password": "***"}, "weight": 3}
+    {"path": "/user/{uuid}/logout"}
+    """
+    with open(filename, encoding="utf8") as f:
+        content = f.read().strip()
+    items = (
+        json.loads(content) if content.startswith("[") else [json.loads(line) for line in content.splitlines() if line]
+    )
+    templates = [Template(item["path"], item.get("data", {}), item.get("weight", 1), item.get("cid")) for item in items]
+    if not templates:
+        raise ValueError(f"No template found in `{filename}`")
+    return templates
+
+
+class RouteReport:
+    __slots__ = ("count", "errors", "latency")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors: DefaultDict[str, int] = defaultdict(int)
+        self.latency = Histogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "errors": dict(self.errors), "latency": self.latency.snapshot()}
+
+
+class Report:
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+        self.routes: DefaultDict[str, RouteReport] = defaultdict(RouteReport)
+
+    @property
+    def count(self) -> int:
+        return sum(route.count for route in self.routes.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "routes": {name: route.to_dict() for name, route in self.routes.items()},
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"{self.count} events in {self.elapsed:.3f}s, {self.throughput:,.1f} events/s",
+            "",
+            f"{'route':<32} {'count':>10} {'errors':>8} {'p50 ms':>10} {'p99 ms':>10} {'p999 ms':>10}",
+        ]
+        for name, route in sorted(self.routes.items()):
+            latency = route.latency
+            lines.append(
+                f"{name:<32} {route.count:>10} {sum(route.errors.values()):>8} "
+                f"{latency.percentile(0.5) * 1e3:>10.3f} "
+                f"{latency.percentile(0.99) * 1e3:>10.3f} "
+                f"{latency.percentile(0.999) * 1e3:>10.3f}"
+            )
+            for exc, n in sorted(route.errors.items()):
+                lines.append(f"    {exc}: {n}")
+        return "\n".join(lines)
+
+
+class _Driver:
+    """Trigger events with a bounded concurrency and report their outcome"""
+
+    def __init__(self, listener: "Listener", concurrency: int, timeout: Union[float, None]) -> None:
+        self.listener = listener
+        self.timeout = timeout
+        self.report = Report()
+        self.slots = asyncio.Semaphore(concurrency)
+        self.names: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_size = 1024
+        self.count = 0
+        self.started = 0.0
+
+    def route_name(self, path: str) -> str:
+        """Name of the route matching `path`, the paths are rendered per event so only the recent ones are cached"""
+        name = self.names.get(path)
+        if name is not None:
+            self.names.move_to_end(path)
+            return name
+        try:
+            name = self.listener.match_route(path)[0].name
+        except EventNotFound:
+            name = "<not found>"
+        self.names[path] = name
+        if len(self.names) > self.cache_size:
+            self.names.popitem(last=False)
+        return name
+
+    def on_done(self, name: str, started: float, future: "asyncio.Future[Any]") -> None:
+        self.slots.release()
+        route = self.report.routes[name]
+        route.count += 1
+        route.latency.record(time.perf_counter() - started)
+        if future.cancelled():
+            route.errors["CancelledError"] += 1
+        elif future.exception() is not None:
+            route.errors[type(future.exception()).__name__] += 1
+
+    async def trigger(self, path: str, cid: Union[str, None], data: Union[Dict[str, Any], None]) -> None:
+        await self.slots.acquire()
+        name = self.route_name(path)
+        begin = time.perf_counter()
+        try:
+            future = self.listener.trigger_event(path, cid=cid, timeout=self.timeout, data=data)
+        except Exception as e:
+            self.slots.release()
+            self.report.routes[name].count += 1
+            self.report.routes[name].errors[type(e).__name__] += 1
+        else:
+            future.add_done_callback(partial(self.on_done, name, begin))
+        self.count += 1
+        if self.count % 100 == 0:
+            await asyncio.sleep(0)  # let the loop run when the handlers never suspend
+
+    async def __aenter__(self) -> "_Driver":
+        for fn in self.listener._startup:  # noqa
+            await fn()
+        self.started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.listener.drain()
+        await asyncio.sleep(0)
+        self.report.elapsed = time.perf_counter() - self.started
+        for fn in self.listener._shutdown:  # noqa
+            await fn()
+
+
+async def run_bench(
+    listener: "Listener",
+    templates: List[Template],
+    count: Union[int, None] = 10000,
+    duration: Union[float, None] = None,
+    rate: Union[float, None] = None,
+    concurrency: int = 1000,
+    timeout: Union[float, None] = None,
+    seed: Union[int, None] = None,
+) -> Report:
+    """Drive `trigger_event` in-process with synthetic events and measure them.
+
+    The startup and shutdown callbacks of the listener are called, `listen()` is not.
+
+    :param count: Number of events to trigger, None means until `duration` is over
+    :param duration: Max seconds of the run
+    :param rate: Target events per second, None means as fast as possible
+    :param concurrency: Max events in flight
+    :param timeout: Timeout of each event
+    :param seed: Seed of the template selection
+    """
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(template.weight for template in templates))
+    loop = asyncio.get_event_loop()
+    async with _Driver(listener, concurrency, timeout) as driver:
+        start = loop.time()
+        for n in itertools.count() if count is None else range(count):
+            now = loop.time()
+            if duration is not None and now - start >= duration:
+                break
+            if rate is not None and start + n / rate > now:
+                await asyncio.sleep(start + n / rate - now)
+            template = rng.choices(templates, cum_weights=cum_weights)[0]
+            await driver.trigger(template.render(n), template.cid, dict(template.data))
+    return driver.report
+
+
+async def run_replay(
+    listener: "Listener",
+    filename: str,
+    speed: Union[float, None] = 1,
+    concurrency: int = 1000,
+    timeout: Union[float, None] = None,
+) -> Report:
+    """Trigger the events of a recording (see `tiny_listener.recorder.Recorder`) and measure them.
+
+    :param speed: Ratio of the original pace, e.g. 2 replays twice as fast, None means as fast as possible
+    :param concurrency: Max events in flight
+    :param timeout: Timeout of each event
+    """
+    loop = asyncio.get_event_loop()
+    async with _Driver(listener, concurrency, timeout) as driver:
+        start = loop.time()
+        first: Union[float, None] = None
+        for record in read_records(filename):
+            if first is None:
+                first = record.timestamp
+            if speed is not None:
+                delay = start + (record.timestamp - first) / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await driver.trigger(record.path, record.cid, record.data)
+    return driver.report
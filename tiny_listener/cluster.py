@@ -0,0 +1,435 @@
+import asyncio
+import bisect
+import hashlib
+import itertools
+import logging
+import math
+import struct
+import zlib
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Set, Tuple, Union
+
+from . import errors
+from .codec import decode_event, dumps, encode_event, loads
+from .context import ContextPool
+from .errors import ListenerError, RemoteError
+
+if TYPE_CHECKING:
+    from .listener import Listener  # noqa # pylint: disable=unused-import
+
+logger = logging.getLogger(__name__)
+
+FRAME = struct.Struct("<IBQ")
+"""Length of the payload, kind, request id"""
+TIMEOUT = struct.Struct("<d")
+REQUEST, RESPONSE, HELLO, BYE = 1, 2, 3, 4
+
+
+class HashRing:
+    """Consistent hashing of keys to nodes, each node is placed `replicas` times on the ring.
+
+    Adding or removing a node only moves the keys of the ring arcs it gains or loses, about 1/N of the keys.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.replicas = replicas
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        self.nodes: Set[str] = set()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+    def add(self, node: str) -> bool:
+        """
+        :return: False if the node is already on the ring
+        """
+        if node in self.nodes:
+            return False
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            point = self.hash(f"{node}#{i}")
+            index = bisect.bisect(self._hashes, point)
+            self._hashes.insert(index, point)
+            self._owners.insert(index, node)
+        return True
+
+    def remove(self, node: str) -> bool:
+        """
+        :return: False if the node is not on the ring
+        """
+        if node not in self.nodes:
+            return False
+        self.nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self._hashes, self._owners) if owner != node]
+        self._hashes = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+        return True
+
+    def node_for(self, key: str) -> str:
+        """
+        :raises LookupError: The ring is empty
+        """
+        if not self._hashes:
+            raise LookupError("No node on the ring")
+        index = bisect.bisect(self._hashes, self.hash(key))
+        return self._owners[index % len(self._owners)]
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(nodes={sorted(self.nodes)})"
+
+
+class Peer(asyncio.Protocol):
+    """Connection between two nodes, requests are pipelined: they are sent without waiting for the previous responses,
+    the frames queued during a loop iteration are written at once."""
+
+    def __init__(self, cluster: "Cluster", node: Union[str, None] = None) -> None:
+        """
+        :param node: Address of the remote node, None for an incoming connection until it says hello
+        """
+        self.cluster = cluster
+        self.node = node
+        self.transport: Union[asyncio.Transport, None] = None
+        self.pending: "Dict[int, asyncio.Future[Any]]" = {}
+        self._ids = itertools.count(1)
+        self._buffer = bytearray()
+        self._out: List[bytes] = []
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+        self.cluster.peers.add(self)
+
+    def connection_lost(self, exc: Union[Exception, None]) -> None:
+        self.cluster.peers.discard(self)
+        self.transport = None
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(RemoteError(f"Connection to {self.node} lost"))
+        self.pending.clear()
+        if self.node is not None:
+            self.cluster.on_peer_lost(self)
+
+    def data_received(self, data: bytes) -> None:
+        buffer = self._buffer
+        buffer += data
+        pos = 0
+        while len(buffer) - pos >= FRAME.size:
+            size, kind, ident = FRAME.unpack_from(buffer, pos)
+            end = pos + FRAME.size + size
+            if end > len(buffer):
+                break
+            payload = bytes(buffer[pos + FRAME.size : end])
+            pos = end
+            try:
+                self.cluster.on_frame(self, kind, ident, payload)
+            except Exception as e:
+                logger.error("Invalid frame from %s: %r", self.node, e)
+                self.close()
+                return
+        del buffer[:pos]
+
+    def send(self, kind: int, ident: int, payload: bytes) -> None:
+        if self.transport is None or self.transport.is_closing():
+            return
+        self._out.append(FRAME.pack(len(payload), kind, ident) + payload)
+        if len(self._out) == 1:
+            asyncio.get_event_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        out, self._out = self._out, []
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(b"".join(out))
+
+    def request(
+        self, path: str, cid: Union[str, None], timeout: Union[float, None], data: Union[Dict[str, Any], None]
+    ) -> "asyncio.Future[Any]":
+        """
+        :raises TypeError: The data can not be encoded
+        """
+        payload = TIMEOUT.pack(math.nan if timeout is None else timeout) + encode_event(path, cid, data)
+        ident = next(self._ids)
+        future = asyncio.get_event_loop().create_future()
+        self.pending[ident] = future
+        self.send(REQUEST, ident, payload)
+        return future
+
+    def close(self) -> None:
+        if self._out:
+            self._flush()
+        if self.transport is not None:
+            self.transport.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(node={self.node}, pending={len(self.pending)})"
+
+
+class Cluster:
+    """Route the events of a cid to the node owning it, so its context state stays on one node.
+
+        >>> app = App(cluster=Cluster("10.0.0.1:7000", peers=["10.0.0.2:7000", "10.0.0.3:7000"]))
+
+    `Listener.trigger_event` hashes the cid on a `HashRing` of the nodes, the events of another node are forwarded
+    over a pool of `pool_size` persistent connections (the events of a cid always use the same one, in order)
+    and the returned future gets the outcome of the remote event, with the result of its handler as the caller
+    can not read the remote event. Events without a cid stay local.
+    The event data and the handler results must be encodable, see `tiny_listener.codec`.
+
+    A node says hello to its peers when it starts and goodbye when it stops, so they add it to and remove it
+    from their rings. An unreachable peer is removed too and tried again every `reconnect_interval` seconds.
+    The owning node keeps the contexts of the cids it receives for their next events, up to `max_ctxs` of them
+    (see `ContextPool`). The cids moving to another node start with a new context there.
+    """
+
+    def __init__(
+        self,
+        node: str,
+        peers: Iterable[str] = (),
+        pool_size: int = 2,
+        replicas: int = 64,
+        reconnect_interval: float = 1,
+        max_ctxs: int = 10000,
+    ) -> None:
+        """
+        :param node: Address `host:port` of this node, where its peers connect
+        :param peers: Addresses of the other nodes
+        :param pool_size: Connections to each peer
+        :param replicas: Points of each node on the hash ring
+        :param reconnect_interval: Seconds between two attempts to connect an unreachable peer
+        :param max_ctxs: Contexts of the received cids kept, the least recently used idle ones are dropped beyond
+        """
+        self.node = node
+        self.ring = HashRing([node], replicas)
+        self.pool_size = pool_size
+        self.reconnect_interval = reconnect_interval
+        self.listener: Union["Listener", None] = None
+        self.server: Union[asyncio.AbstractServer, None] = None
+        self.peers: Set[Peer] = set()
+        self.pools: Dict[str, List[Peer]] = {}
+        self.forwarded = 0
+        self.received = 0
+        self._known = set(peers) - {node}
+        self._connecting: Set[str] = set()
+        self.ctxs = ContextPool(max_ctxs)
+
+    @staticmethod
+    def split(node: str) -> Tuple[str, int]:
+        host, _, port = node.rpartition(":")
+        return host, int(port)
+
+    async def start(self, listener: "Listener") -> None:
+        """Listen to the peers and connect to them"""
+        self.listener = listener
+        host, port = self.split(self.node)
+        loop = asyncio.get_event_loop()
+        self.server = await loop.create_server(lambda: Peer(self), host, port)
+        await asyncio.gather(*(self.connect(node) for node in self._known))
+
+    async def connect(self, node: str) -> bool:
+        """Open the pool of a node and say hello, the node joins the ring
+
+        :return: False if the node is unreachable, it is tried again later
+        """
+        if node in self.pools or node in self._connecting:
+            return True
+        self._connecting.add(node)
+        loop = asyncio.get_event_loop()
+        host, port = self.split(node)
+        pool: List[Peer] = []
+        try:
+            for _ in range(self.pool_size):
+                _, peer = await loop.create_connection(lambda: Peer(self, node), host, port)
+                pool.append(peer)
+        except OSError as e:
+            logger.warning("Node %s unreachable: %r", node, e)
+            for peer in pool:
+                peer.close()
+            self._retry(node)
+            return False
+        finally:
+            self._connecting.discard(node)
+        pool[0].send(HELLO, 0, self.node.encode())
+        self.pools[node] = pool
+        self._join(node)
+        return True
+
+    def _retry(self, node: str) -> None:
+        if self.listener is not None and node in self._known:
+            self.listener.scheduler.call_later(
+                self.reconnect_interval, lambda: asyncio.ensure_future(self.connect(node))
+            )
+
+    def _join(self, node: str) -> None:
+        if self.ring.add(node):
+            logger.info("Node %s joined, %d node(s)", node, len(self.ring))
+
+    def _leave(self, node: str) -> None:
+        if self.ring.remove(node):
+            logger.info("Node %s left, %d node(s)", node, len(self.ring))
+        for peer in self.pools.pop(node, []):
+            peer.close()
+
+    def disconnect(self, node: str) -> None:
+        """Remove a node from the ring, its cids move to the other nodes"""
+        self._known.discard(node)
+        self._leave(node)
+
+    def owner(self, cid: str) -> str:
+        return self.ring.node_for(cid)
+
+    def forward(
+        self,
+        node: str,
+        path: str,
+        cid: str,
+        timeout: Union[float, None],
+        data: Union[Dict[str, Any], None],
+    ) -> "asyncio.Future[Any]":
+        """Trigger an event on another node
+
+        :raises TypeError: The data can not be encoded
+        """
+        pool = self.pools[node]
+        self.forwarded += 1
+        return pool[zlib.crc32(cid.encode()) % len(pool)].request(path, cid, timeout, data)
+
+    def on_frame(self, peer: Peer, kind: int, ident: int, payload: bytes) -> None:
+        if kind == REQUEST:
+            self._on_request(peer, ident, payload)
+        elif kind == RESPONSE:
+            future = peer.pending.pop(ident, None)
+            if future is None or future.done():
+                return
+            error, result = loads(payload, copy=True)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(_rebuild(*error))
+        elif kind == HELLO:
+            node = payload.decode()
+            peer.node = node
+            self._known.add(node)
+            asyncio.ensure_future(self.connect(node))
+        elif kind == BYE:
+            self.disconnect(payload.decode())
+        else:
+            raise ValueError(f"Unknown frame kind {kind}")
+
+    def _on_request(self, peer: Peer, ident: int, payload: bytes) -> None:
+        listener = self.listener
+        assert listener is not None
+        self.received += 1
+        timeout = TIMEOUT.unpack_from(payload)[0]
+        path, cid, data, _ = decode_event(payload[TIMEOUT.size :], copy=True)
+        data = {} if data is None else data  # the event gets this very dict, see `_result`
+        if cid is not None:
+            self.ctxs.acquire(listener, cid)
+        try:
+            future = listener.trigger_local_event(path, cid, None if math.isnan(timeout) else timeout, data)
+        except ListenerError as e:
+            if cid is not None:
+                self.ctxs.release(listener, cid)
+            peer.send(RESPONSE, ident, _dump_response(e, None))
+            return
+        future.add_done_callback(partial(self._on_done, peer, ident, path, cid, data))
+
+    def _on_done(
+        self,
+        peer: Peer,
+        ident: int,
+        path: str,
+        cid: Union[str, None],
+        data: Dict[str, Any],
+        future: "asyncio.Future[Any]",
+    ) -> None:
+        error = _error(future)
+        result = None if error is not None or cid is None else self._result(path, cid, data)
+        if cid is not None:
+            self.ctxs.release(self.listener, cid)  # type: ignore
+        peer.send(RESPONSE, ident, _dump_response(error, result))
+
+    def _result(self, path: str, cid: str, data: Dict[str, Any]) -> Any:
+        """Result of the event of a request, found in its context by its data"""
+        listener = self.listener
+        assert listener is not None
+        ctx = listener.ctxs.get(cid)
+        if ctx is None:
+            return None
+        for event in reversed(ctx.events[listener.match_route(path)[0]]):
+            if event.data is data:
+                return event.result
+        return None
+
+    def on_peer_lost(self, peer: Peer) -> None:
+        node = peer.node
+        if node is None or peer not in self.pools.get(node, ()):
+            return
+        logger.warning("Connection to node %s lost", node)
+        self._leave(node)
+        self._retry(node)
+
+    def leave(self) -> None:
+        """Say goodbye to the peers, they stop forwarding events to this node, the events it forwards still run"""
+        self._known.clear()
+        for node in list(self.ring.nodes - {self.node}):
+            self.ring.remove(node)
+        for pool in self.pools.values():
+            pool[0].send(BYE, 0, self.node.encode())
+
+    async def close(self) -> None:
+        """Leave the cluster and close the connections"""
+        self.leave()
+        pools, self.pools = self.pools, {}
+        for pool in pools.values():
+            for peer in pool:
+                peer.close()
+        if self.server is not None:
+            self.server.close()
+        for peer in list(self.peers):
+            peer.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "cluster_nodes": len(self.ring),
+            "cluster_forwarded": self.forwarded,
+            "cluster_received": self.received,
+            "cluster_pending": sum(len(peer.pending) for pool in self.pools.values() for peer in pool),
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(node={self.node}, ring={self.ring})"
+
+
+def _error(future: "asyncio.Future[Any]") -> Union[BaseException, None]:
+    if future.cancelled():
+        return asyncio.CancelledError()
+    return future.exception()
+
+
+def _dump_response(error: Union[BaseException, None], result: Any) -> bytes:
+    """The error of an event or the result of its handler"""
+    if error is not None:
+        return dumps([[type(error).__name__, str(error)], None])
+    try:
+        return dumps([None, result])
+    except TypeError as e:
+        return dumps([["TypeError", f"Result can not be encoded: {e}"], None])
+
+
+def _rebuild(name: str, message: str) -> Exception:
+    """The same `ListenerError` as the remote node, a `RemoteError` for the other exceptions"""
+    kls = getattr(errors, name, None)
+    if isinstance(kls, type) and issubclass(kls, ListenerError):
+        return kls(message)
+    if name == "TimeoutError":
+        return asyncio.TimeoutError(message)
+    return RemoteError(f"{name}: {message}" if message else name)
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Union
+
+from .event import Event
+
+Reducer = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+REDUCERS: Dict[str, Reducer] = {
+    "latest": lambda acc, data: data,
+    "first": lambda acc, data: acc,
+}
+
+
+class Batch:
+    """Events of the same path collected within a coalescing window.
+
+    The handler runs once for the leader event, the followers are completed with its result.
+    """
+
+    def __init__(self, leader: Event, merge: Union[str, Reducer] = "latest") -> None:
+        """
+        :param leader: The first event of the window
+        :param merge: "latest", "first" or a reducer `(acc_data, new_data) -> data`
+        """
+        if not callable(merge) and merge not in REDUCERS:
+            raise ValueError(f"Unknown merge strategy `{merge}`, allowed: {list(REDUCERS)} or a callable")
+        self.leader = leader
+        self.followers: List[Event] = []
+        self.reduce: Reducer = merge if callable(merge) else REDUCERS[merge]
+        self.task: "asyncio.Future[Any]"
+
+    def join(self, event: Event) -> None:
+        self.leader.data = self.reduce(self.leader.data, event.data)
+        self.followers.append(event)
+
+    def resolve(self) -> None:
+        for event in self.followers:
+            event.error = self.leader.error
+            event.set_result(self.leader.result)
+            event.done()
+
+    def __len__(self) -> int:
+        return len(self.followers) + 1
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(leader={self.leader}, size={len(self)})"
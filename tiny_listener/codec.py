@@ -0,0 +1,266 @@
+import struct
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Tuple, Union
+
+if TYPE_CHECKING:
+    from .event import Event
+
+VERSION = 1
+FRAME = struct.Struct("<BHi")
+"""Version, length of the path, length of the cid (-1 means None)"""
+
+NONE, TRUE, FALSE, INT8, INT64, BIGINT, FLOAT, STR8, STR, BYTES8, BYTES, LIST, TUPLE, DICT = range(14)
+
+_b = struct.Struct("<b")
+_q = struct.Struct("<q")
+_d = struct.Struct("<d")
+_I = struct.Struct("<I")
+_BB = struct.Struct("<BB")
+_Bb = struct.Struct("<Bb")
+_BI = struct.Struct("<BI")
+_Bq = struct.Struct("<Bq")
+_Bd = struct.Struct("<Bd")
+
+Default = Callable[[Any], Any]
+
+
+class EventFrame(NamedTuple):
+    path: str
+    cid: Union[str, None]
+    data: Union[Dict[str, Any], None]
+    result: Any = None
+
+
+def dumps(value: Any, default: Union[Default, None] = None) -> bytes:
+    """Encode a value made of None, bool, int, float, str, bytes, list, tuple and dict.
+
+    The subclasses of these types are encoded as their base type, e.g. an `IntEnum` is decoded as an int.
+
+    :param default: Convert another value to an encodable one, e.g. `repr`
+    :raises TypeError: The value can not be encoded
+    """
+    out = bytearray()
+    _encode(out, value, default)
+    return bytes(out)
+
+
+def _encode(out: bytearray, value: Any, default: Union[Default, None]) -> None:
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:  # a subclass, e.g. IntEnum or OrderedDict, the exact types are looked up first
+        encoder = next((enc for cls, enc in _ENCODERS.items() if isinstance(value, cls)), None)
+    if encoder is not None:
+        encoder(out, value, default)
+    elif default is not None:
+        _encode(out, default(value), None)
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} can not be encoded")
+
+
+def _encode_str(out: bytearray, value: str, _: Any) -> None:
+    raw = value.encode()
+    size = len(raw)
+    out += _BB.pack(STR8, size) if size < 256 else _BI.pack(STR, size)
+    out += raw
+
+
+def _encode_int(out: bytearray, value: int, _: Any) -> None:
+    if -128 <= value < 128:
+        out += _Bb.pack(INT8, value)
+    elif -(1 << 63) <= value < 1 << 63:
+        out += _Bq.pack(INT64, value)
+    else:
+        raw = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+        out += _BI.pack(BIGINT, len(raw))
+        out += raw
+
+
+def _encode_bytes(out: bytearray, value: Any, _: Any) -> None:
+    size = value.nbytes if type(value) is memoryview else len(value)
+    out += _BB.pack(BYTES8, size) if size < 256 else _BI.pack(BYTES, size)
+    out += value
+
+
+def _encode_dict(out: bytearray, value: Dict[Any, Any], default: Union[Default, None]) -> None:
+    out += _BI.pack(DICT, len(value))
+    encoders = _ENCODERS
+    for key, item in value.items():
+        if type(key) is str:
+            _encode_str(out, key, None)
+        else:
+            _encode(out, key, default)
+        encoder = encoders.get(type(item))
+        if encoder is not None:
+            encoder(out, item, default)
+        else:
+            _encode(out, item, default)
+
+
+def _encode_list(out: bytearray, value: Union[List[Any], Tuple[Any, ...]], default: Union[Default, None]) -> None:
+    out += _BI.pack(LIST if isinstance(value, list) else TUPLE, len(value))
+    for item in value:
+        _encode(out, item, default)
+
+
+_ENCODERS: Dict[type, Callable[[bytearray, Any, Union[Default, None]], None]] = {
+    str: _encode_str,
+    int: _encode_int,
+    float: lambda out, value, _: out.extend(_Bd.pack(FLOAT, value)),
+    bool: lambda out, value, _: out.append(TRUE if value else FALSE),
+    type(None): lambda out, value, _: out.append(NONE),
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    dict: _encode_dict,
+    list: _encode_list,
+    tuple: _encode_list,
+}
+
+
+def loads(buffer: Union[bytes, bytearray, memoryview], copy: bool = False) -> Any:
+    """Decode a value of `dumps`
+
+    :param copy: Decode bytes as `bytes`, by default they are `memoryview` slices of `buffer`, without a copy
+    :raises ValueError: The buffer is truncated or invalid
+    """
+    with memoryview(buffer) as view:
+        value, end = _decode(view, 0, copy)
+        if end != len(view):
+            raise ValueError(f"{len(view) - end} unexpected trailing byte(s)")
+    return value
+
+
+def _decode(view: memoryview, pos: int, copy: bool) -> Tuple[Any, int]:
+    try:
+        return _DECODERS[view[pos]](view, pos + 1, copy)
+    except (IndexError, struct.error) as e:
+        raise ValueError("Truncated value") from e
+    except KeyError as e:
+        raise ValueError(f"Unknown tag {e}") from e
+    except TypeError as e:  # e.g. a list as a dict key
+        raise ValueError(f"Invalid value: {e}") from e
+
+
+def _decode_str8(view: memoryview, pos: int, _: bool) -> Tuple[Any, int]:
+    end = pos + 1 + view[pos]
+    if end > len(view):
+        raise IndexError()
+    return str(view[pos + 1 : end], "utf8"), end
+
+
+def _decode_str(view: memoryview, pos: int, _: bool) -> Tuple[Any, int]:
+    end = pos + 4 + _I.unpack_from(view, pos)[0]
+    if end > len(view):
+        raise IndexError()
+    return str(view[pos + 4 : end], "utf8"), end
+
+
+def _decode_bytes8(view: memoryview, pos: int, copy: bool) -> Tuple[Any, int]:
+    end = pos + 1 + view[pos]
+    if end > len(view):
+        raise IndexError()
+    return (view[pos + 1 : end].tobytes() if copy else view[pos + 1 : end]), end
+
+
+def _decode_bytes(view: memoryview, pos: int, copy: bool) -> Tuple[Any, int]:
+    end = pos + 4 + _I.unpack_from(view, pos)[0]
+    if end > len(view):
+        raise IndexError()
+    return (view[pos + 4 : end].tobytes() if copy else view[pos + 4 : end]), end
+
+
+def _decode_bigint(view: memoryview, pos: int, _: bool) -> Tuple[Any, int]:
+    end = pos + 4 + _I.unpack_from(view, pos)[0]
+    if end > len(view):
+        raise IndexError()
+    return int.from_bytes(view[pos + 4 : end], "little", signed=True), end
+
+
+def _decode_dict(view: memoryview, pos: int, copy: bool) -> Tuple[Any, int]:
+    count = _I.unpack_from(view, pos)[0]
+    pos += 4
+    mapping = {}
+    decoders = _DECODERS
+    for _ in range(count):
+        key, pos = decoders[view[pos]](view, pos + 1, copy)
+        mapping[key], pos = decoders[view[pos]](view, pos + 1, copy)
+    return mapping, pos
+
+
+def _decode_list(view: memoryview, pos: int, copy: bool) -> Tuple[Any, int]:
+    count = _I.unpack_from(view, pos)[0]
+    pos += 4
+    items = []
+    decoders = _DECODERS
+    for _ in range(count):
+        item, pos = decoders[view[pos]](view, pos + 1, copy)
+        items.append(item)
+    return items, pos
+
+
+def _decode_tuple(view: memoryview, pos: int, copy: bool) -> Tuple[Any, int]:
+    items, pos = _decode_list(view, pos, copy)
+    return tuple(items), pos
+
+
+_DECODERS: Dict[int, Callable[[memoryview, int, bool], Tuple[Any, int]]] = {
+    NONE: lambda view, pos, _: (None, pos),
+    TRUE: lambda view, pos, _: (True, pos),
+    FALSE: lambda view, pos, _: (False, pos),
+    INT8: lambda view, pos, _: (_b.unpack_from(view, pos)[0], pos + 1),
+    INT64: lambda view, pos, _: (_q.unpack_from(view, pos)[0], pos + 8),
+    BIGINT: _decode_bigint,
+    FLOAT: lambda view, pos, _: (_d.unpack_from(view, pos)[0], pos + 8),
+    STR8: _decode_str8,
+    STR: _decode_str,
+    BYTES8: _decode_bytes8,
+    BYTES: _decode_bytes,
+    LIST: _decode_list,
+    TUPLE: _decode_tuple,
+    DICT: _decode_dict,
+}
+
+
+def encode_event(
+    path: str,
+    cid: Union[str, None] = None,
+    data: Union[Dict[str, Any], None] = None,
+    result: Any = None,
+    default: Union[Default, None] = None,
+) -> bytes:
+    """Encode the fields of an event, see `decode_event`
+
+    :raises TypeError: The data or the result can not be encoded
+    """
+    path_bytes = path.encode()
+    cid_bytes = b"" if cid is None else cid.encode()
+    out = bytearray(FRAME.pack(VERSION, len(path_bytes), -1 if cid is None else len(cid_bytes)))
+    out += path_bytes
+    out += cid_bytes
+    _encode(out, data, default)
+    _encode(out, result, default)
+    return bytes(out)
+
+
+def dump_event(event: "Event", path: str, default: Union[Default, None] = None) -> bytes:
+    """Encode an event triggered by `path`, with its cid, data and result"""
+    return encode_event(path, event.ctx.cid, event.data, event.result, default)
+
+
+def decode_event(buffer: Union[bytes, bytearray, memoryview], copy: bool = False) -> EventFrame:
+    """
+    :param copy: See `loads`
+    :raises ValueError: The buffer is not a frame of this version, or is truncated
+    """
+    with memoryview(buffer) as view:
+        if len(view) < FRAME.size:
+            raise ValueError("Truncated frame")
+        version, path_len, cid_len = FRAME.unpack_from(view)
+        if version != VERSION:
+            raise ValueError(f"Unsupported frame version {version}")
+        pos = FRAME.size + path_len + max(cid_len, 0)
+        if pos > len(view):
+            raise ValueError("Truncated frame")
+        path = str(view[FRAME.size : FRAME.size + path_len], "utf8")
+        cid = None if cid_len < 0 else str(view[FRAME.size + path_len : pos], "utf8")
+        data, pos = _decode(view, pos, copy)
+        result, pos = _decode(view, pos, copy)
+    return EventFrame(path, cid, data, result)
@@ -0,0 +1,278 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from functools import partial
+from typing import Any, AsyncIterator, Deque, Dict, List, Set, Union
+
+from .context import Context
+from .errors import EventRejected, ListenerClosed, ListenerError
+from .listener import Listener
+from .scheduler import TimerHandle
+
+logger = logging.getLogger(__name__)
+
+
+class Message:
+    __slots__ = ("tag", "path", "body", "headers", "published_at", "redelivered", "raw")
+
+    def __init__(
+        self,
+        tag: Any,
+        path: str,
+        body: bytes = b"",
+        headers: Union[Dict[str, Any], None] = None,
+        published_at: Union[float, None] = None,
+        redelivered: bool = False,
+        raw: Any = None,
+    ) -> None:
+        """
+        :param tag: Delivery tag, given back to the broker to ack the message
+        :param path: Path of the event, e.g. the routing key
+        :param published_at: `time.time()` of the publication, if known
+        :param redelivered: The message was delivered before and not acked
+        :param raw: The message of the broker client
+        """
+        self.tag = tag
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+        self.published_at = published_at
+        self.redelivered = redelivered
+        self.raw = raw
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(tag={self.tag}, path={self.path})"
+
+
+class Broker:
+    """Adapter of a broker client for `QueueConsumerListener`"""
+
+    async def connect(self) -> None:
+        pass
+
+    def consume(self, prefetch: int) -> AsyncIterator[Message]:
+        """Deliver the messages, no more than `prefetch` of them unacked"""
+        raise NotImplementedError()
+
+    async def ack(self, messages: List[Message]) -> None:
+        raise NotImplementedError()
+
+    async def nack(self, messages: List[Message], requeue: bool) -> None:
+        raise NotImplementedError()
+
+    @property
+    def lag(self) -> Union[int, None]:
+        """Messages waiting in the queue, None if unknown"""
+        return None
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBroker(Broker):
+    """In-memory queue, a stand-in for a real broker in tests and benchmarks"""
+
+    def __init__(self) -> None:
+        self.queue: Deque[Message] = deque()
+        self.unacked: Dict[int, Message] = {}
+        self.acked: List[Message] = []
+        self.dead: List[Message] = []
+        self.ack_calls = 0
+        self.__tags = itertools.count(1)
+        self.__wakeup = asyncio.Event()
+
+    def publish(self, path: str, body: bytes = b"", headers: Union[Dict[str, Any], None] = None) -> None:
+        self.queue.append(Message(None, path, body, headers, time.time()))
+        self.__wakeup.set()
+
+    async def consume(self, prefetch: int) -> AsyncIterator[Message]:  # type: ignore
+        while True:
+            if self.queue and len(self.unacked) < prefetch:
+                message = self.queue.popleft()
+                message.tag = next(self.__tags)
+                self.unacked[message.tag] = message
+                yield message
+            else:
+                self.__wakeup.clear()
+                await self.__wakeup.wait()
+
+    async def ack(self, messages: List[Message]) -> None:
+        self.ack_calls += 1
+        for message in messages:
+            self.acked.append(self.unacked.pop(message.tag))
+        self.__wakeup.set()
+
+    async def nack(self, messages: List[Message], requeue: bool) -> None:
+        self.ack_calls += 1
+        for message in messages:
+            self.unacked.pop(message.tag)
+            if requeue:
+                message.redelivered = True
+                self.queue.appendleft(message)
+            else:
+                self.dead.append(message)
+        self.__wakeup.set()
+
+    @property
+    def lag(self) -> int:
+        return len(self.queue)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(queue={len(self.queue)}, unacked={len(self.unacked)})"
+
+
+class QueueConsumerListener(Listener):
+    """Consume a broker queue, each message triggers the event of its path with the event data `message`.
+
+    No more than `prefetch` messages are in flight. A message is acked once its event completes,
+    nacked when it fails or times out (requeued once, then dead-lettered) and when no route matches (dead-lettered).
+    Acks and nacks are sent in batches of `ack_batch`, or after `ack_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        prefetch: int = 100,
+        ack_batch: int = 50,
+        ack_interval: float = 0.1,
+        requeue: bool = True,
+        timeout: Union[float, None] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param broker: Broker adapter
+        :param prefetch: Max messages in flight
+        :param ack_batch: Acks sent at once, at most half of `prefetch` so the broker keeps delivering
+        :param ack_interval: Max seconds an ack is delayed
+        :param requeue: Requeue a failed message which was not redelivered yet
+        :param timeout: Timeout of each event
+        :param kwargs: See `Listener`
+        """
+        super().__init__(**kwargs)
+        self.broker = broker
+        self.prefetch = prefetch
+        self.ack_batch = max(1, min(ack_batch, prefetch // 2))
+        self.ack_interval = ack_interval
+        self.requeue = requeue
+        self.timeout = timeout
+        self.acked = 0
+        self.nacked = 0
+        self.unacked = 0
+        self._published: Dict[Message, float] = {}  # unacked message -> publication time
+        self._slots = asyncio.Semaphore(prefetch)
+        self._acks: List[Message] = []
+        self._nacks: Dict[bool, List[Message]] = {True: [], False: []}
+        self._flushing: Set["asyncio.Future[None]"] = set()
+        self._consumer: "Union[asyncio.Future[None], None]" = None
+        self.__timer: Union[TimerHandle, None] = None
+
+    async def listen(self) -> None:
+        await self.broker.connect()
+        self._consumer = asyncio.ensure_future(self._consume())
+        self.add_shutdown_callback(self._close)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the publication of the oldest unacked message, 0 if none"""
+        if not self._published:
+            return 0.0
+        return max(0.0, time.time() - min(self._published.values()))
+
+    async def graceful_shutdown(self, sig: int) -> None:
+        # the messages received during the drain would be rejected and requeued: stop consuming first
+        if self._consumer is not None:
+            self._consumer.cancel()
+        await super().graceful_shutdown(sig)
+
+    async def _consume(self) -> None:
+        messages = self.broker.consume(self.prefetch).__aiter__()
+        while True:
+            await self._slots.acquire()
+            try:
+                message = await messages.__anext__()
+            except StopAsyncIteration:
+                self._slots.release()
+                return
+            self.unacked += 1
+            if message.published_at is not None:
+                self._published[message] = message.published_at
+            self.on_message(message)
+
+    def on_message(self, message: Message) -> None:
+        """Trigger the event of a message in a new context, dropped once the event is done"""
+        ctx = self.new_ctx()
+        try:
+            future = ctx.trigger_event(message.path, self.timeout, {"message": message})
+        except ListenerError as e:
+            ctx.drop()
+            logger.debug("Message %r not consumed: %r", message, e)
+            self._settle(message, ok=False, requeue=isinstance(e, (EventRejected, ListenerClosed)))
+        else:
+            future.add_done_callback(partial(self._on_done, ctx, message))
+
+    def _on_done(self, ctx: Context, message: Message, future: "asyncio.Future[Any]") -> None:
+        ctx.drop()
+        ok = not future.cancelled() and future.exception() is None
+        self._settle(message, ok, requeue=self.requeue and not message.redelivered)
+
+    def _settle(self, message: Message, ok: bool, requeue: bool) -> None:
+        self._slots.release()
+        if ok:
+            self.acked += 1
+            self._acks.append(message)
+        else:
+            self.nacked += 1
+            self._nacks[requeue].append(message)
+        if len(self._acks) + len(self._nacks[True]) + len(self._nacks[False]) >= self.ack_batch:
+            self.flush()
+        elif self.__timer is None:
+            self.__timer = self.scheduler.call_later(self.ack_interval, self.flush)
+
+    def flush(self) -> "asyncio.Future[None]":
+        """Send the pending acks and nacks"""
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        acks, self._acks = self._acks, []
+        nacks, self._nacks = self._nacks, {True: [], False: []}
+        future = asyncio.ensure_future(self._send(acks, nacks))
+        self._flushing.add(future)
+        future.add_done_callback(self._flushing.discard)
+        return future
+
+    async def _send(self, acks: List[Message], nacks: Dict[bool, List[Message]]) -> None:
+        count = len(acks) + sum(map(len, nacks.values()))
+        try:
+            if acks:
+                await self.broker.ack(acks)
+            for requeue, messages in nacks.items():
+                if messages:
+                    await self.broker.nack(messages, requeue)
+        except Exception as e:
+            logger.error("Failed to ack %d message(s): %r", count, e)
+        finally:
+            self.unacked -= count
+            for message in itertools.chain(acks, *nacks.values()):
+                self._published.pop(message, None)
+
+    async def _close(self) -> None:
+        if self._consumer is not None:
+            self._consumer.cancel()
+        await self.flush()
+        if self._flushing:
+            await asyncio.wait(self._flushing)
+        await self.broker.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        snapshot = super().metrics()
+        snapshot["consumer_lag"] = self.broker.lag
+        snapshot["consumer_age"] = self.age
+        snapshot["consumer_unacked"] = self.unacked
+        snapshot["consumer_acked"] = self.acked
+        snapshot["consumer_nacked"] = self.nacked
+        return snapshot
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(broker={self.broker}, prefetch={self.prefetch})"
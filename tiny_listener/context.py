@@ -1,6 +1,6 @@
 import asyncio
 import weakref
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import TYPE_CHECKING, Any, DefaultDict, Dict, Final, List, Union
 
 from .event import Event
@@ -57,7 +57,7 @@ class Context:
 
     def trigger_event(
         self, path: str, timeout: Union[float, None] = None, data: Union[Dict, None] = None
-    ) -> asyncio.Task:
+    ) -> "asyncio.Future[Any]":
         """
         :param path: Event path
         :param timeout: Timeout
@@ -67,3 +67,52 @@ class Context:
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(cid={self.cid}, scope={self.scope})"
+
+
+class ContextPool:
+    """Contexts created for the cids of the events received from elsewhere, see `ShardDispatcher` and `Cluster`.
+
+    A context outlives its events, so the next events of its cid find its scope and `Depends` cache.
+    Beyond `max_size` contexts, the least recently used ones without running events are dropped.
+    The contexts which existed before are left alone.
+    """
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self.max_size = max_size
+        self._running: "OrderedDict[str, int]" = OrderedDict()  # cid -> running events, least recently used first
+
+    def acquire(self, listener: "Listener", cid: str) -> None:
+        """Create the context of `cid` if needed before an event runs in it, see `release`"""
+        if cid in self._running:
+            self._running.move_to_end(cid)
+            self._running[cid] += 1
+            if cid not in listener.ctxs:  # dropped by a handler
+                listener.new_ctx(cid)
+        elif cid not in listener.ctxs:
+            listener.new_ctx(cid)
+            self._running[cid] = 1
+            self._evict(listener)
+
+    def release(self, listener: "Listener", cid: str) -> None:
+        """An event of `cid` is done"""
+        if cid in self._running:
+            self._running[cid] -= 1
+            self._evict(listener)
+
+    def _evict(self, listener: "Listener") -> None:
+        if len(self._running) <= self.max_size:
+            return
+        for cid, running in list(self._running.items()):
+            if not running:
+                del self._running[cid]
+                ctx = listener.ctxs.get(cid)
+                if ctx is not None:
+                    ctx.drop()
+                if len(self._running) <= self.max_size:
+                    return
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(size={len(self)}, max_size={self.max_size})"
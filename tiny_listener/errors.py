@@ -40,3 +40,19 @@ class PathParamsError(ListenerError):
 
 class EventDataError(ListenerError):
     pass
+
+
+class ListenerClosed(ListenerError):
+    pass
+
+
+class EventRejected(ListenerError):
+    pass
+
+
+class RingFull(ListenerError):
+    pass
+
+
+class RemoteError(ListenerError):
+    pass
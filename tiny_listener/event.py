@@ -1,4 +1,5 @@
 import asyncio
+import time
 import weakref
 from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, List, TypeVar, Union
 
@@ -8,6 +9,7 @@ if TYPE_CHECKING:
     from .context import Context  # noqa # pylint: disable=unused-import
     from .listener import Listener
     from .routing import Route
+    from .tracing import Span
 
 
 CTXType = TypeVar("CTXType", bound="Context")
@@ -20,7 +22,7 @@ class Event(Generic[CTXType]):
         route: "Route",
         data: Union[Dict, None] = None,
     ) -> None:
-        self.data = data or {}
+        self.data = {} if data is None else data
         self.error: Union[Exception, None] = None
         self.__route = route
         self.__ctx: Callable[..., CTXType] = weakref.ref(ctx)  # type: ignore
@@ -28,6 +30,9 @@ class Event(Generic[CTXType]):
         self.__auto_done: bool = True
         self.__result: Any = None
         self.running: bool = False
+        self.attempt = 1
+        self.span: Union["Span", None] = None
+        self.created_at = time.perf_counter()
 
     @property
     def result(self) -> Any:
@@ -53,6 +58,9 @@ class Event(Generic[CTXType]):
     def is_done(self) -> bool:
         return self.__done.is_set()
 
+    def set_result(self, result: Any) -> None:
+        self.__result = result
+
     def prevent_auto_done(self) -> None:
         self.__auto_done = False
 
@@ -1,7 +1,7 @@
-import asyncio
 from abc import ABCMeta
 from functools import wraps
 from inspect import Parameter, isclass, signature
+from time import perf_counter
 from typing import Any, Final, Union
 
 from ._typing import CoroFunc, HookFunc, PathParams
@@ -33,8 +33,16 @@ class _Hook(metaclass=ABCMeta):
                     if default.use_cache and default in ctx.cache:
                         actual = ctx.cache.get(default)
                     else:
-                        actual = await asyncio.wait_for(default(event, params), timeout=default.timeout)
+                        span = getattr(event, "span", None)
+                        since = perf_counter() if span is not None else 0
+                        if default.timeout is None:
+                            actual = await default(event, params)
+                        else:
+                            with event.listener.scheduler.timeout(default.timeout):
+                                actual = await default(event, params)
                         ctx.cache[default] = actual
+                        if span is not None:
+                            span.mark(repr(default), since)
                 elif isclass(anno):
                     if issubclass(anno, Event):
                         actual = event
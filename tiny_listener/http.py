@@ -0,0 +1,535 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from email.utils import formatdate
+from functools import partial
+from http import HTTPStatus
+from typing import Any, Deque, Dict, Iterable, List, Set, Tuple, Union
+from urllib.parse import unquote
+
+from .context import Context
+from .errors import EventNotFound, EventRejected, ListenerClosed, ListenerError
+from .listener import Listener
+from .scheduler import TimerHandle
+
+try:
+    import httptools
+except ImportError:  # pragma: no cover
+    httptools = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[str, str]]
+
+STATUS_LINES: Dict[int, bytes] = {
+    status.value: f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode() for status in HTTPStatus
+}
+
+ERROR_STATUS = (
+    (EventNotFound, 404),
+    (EventRejected, 503),
+    (ListenerClosed, 503),
+    (asyncio.TimeoutError, 504),
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+
+def _check_transfer_encoding(headers: Headers) -> None:
+    """Only a chunked body is supported, its length would be unknown otherwise
+
+    :raises HTTPError: 400 if chunked is not the final coding, the body length is unknown, 501 for another coding
+    """
+    codings = [
+        coding.strip().lower() for name, value in headers if name == "transfer-encoding" for coding in value.split(",")
+    ]
+    if codings[-1] != "chunked":
+        raise HTTPError(400)
+    if len(codings) > 1:
+        raise HTTPError(501)
+
+
+class Request:
+    """An HTTP request, the event data `request` of its handler.
+
+    Reply with `respond()`, or return the body (`bytes` or `str`) from the handler.
+    """
+
+    __slots__ = ("method", "target", "path", "query", "version", "headers", "body", "keep_alive", "response", "_conn")
+
+    def __init__(
+        self,
+        conn: "HTTPConnection",
+        method: str,
+        target: str,
+        version: str,
+        headers: Headers,
+        body: bytes = b"",
+        keep_alive: bool = True,
+    ) -> None:
+        path, _, query = target.partition("?")
+        self.method = method
+        self.target = target
+        self.path = unquote(path)
+        self.query = query
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+        self.response: Union[bytes, None] = None
+        self._conn = conn
+
+    @property
+    def responded(self) -> bool:
+        return self.response is not None
+
+    def header(self, name: str, default: Union[str, None] = None) -> Union[str, None]:
+        """
+        :param name: Lower case header name
+        """
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return default
+
+    def respond(
+        self,
+        status: int = 200,
+        body: Union[bytes, str] = b"",
+        headers: Union[Iterable[Tuple[str, str]], None] = None,
+    ) -> None:
+        """Send the response, pipelined responses are sent in the order of their requests.
+
+        :param headers: Extra headers, `content-length`, `date` and `connection` are set
+        """
+        if self.response is not None:
+            return
+        if isinstance(body, str):
+            body = body.encode()
+        parts = [
+            STATUS_LINES.get(status) or f"HTTP/1.1 {status} \r\n".encode(),
+            self._conn.listener.date_header(),
+            b"content-length: %d\r\n" % len(body),
+        ]
+        if not self.keep_alive:
+            parts.append(b"connection: close\r\n")
+        for name, value in headers or ():
+            parts.append(f"{name}: {value}\r\n".encode("latin-1"))
+        parts.append(b"\r\n")
+        if self.method != "HEAD":
+            parts.append(body)
+        self.response = b"".join(parts)
+        self._conn.flush()
+        if self._conn.listener.access_log:
+            host, port, *_ = self._conn.peername or ("-", "-")
+            logger.info('%s:%s - "%s %s HTTP/%s" %d', host, port, self.method, self.target, self.version, status)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(method={self.method}, target={self.target})"
+
+
+class _Parser:
+    """HTTP/1.x request parser, chunked bodies included"""
+
+    def __init__(self, conn: "HTTPConnection") -> None:
+        self.conn = conn
+        self.max_header_size = conn.listener.max_header_size
+        self.max_body_size = conn.listener.max_body_size
+        self.buffer = bytearray()
+        self.request: Union[Request, None] = None
+        self.length = 0
+        self.chunked = False
+        self.chunk: Union[int, None] = None
+        self.chunks: List[bytes] = []
+
+    def feed(self, data: bytes) -> None:
+        """
+        :raises HTTPError: Bad request
+        """
+        buffer = self.buffer
+        buffer += data
+        while True:
+            if self.request is None:
+                end = buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(buffer) > self.max_header_size:
+                        raise HTTPError(431)
+                    return
+                self.request = self._parse_head(bytes(buffer[:end]))
+                del buffer[: end + 4]
+                if (self.chunked or len(buffer) < self.length) and self.request.header("expect") == "100-continue":
+                    self.conn.send_continue()
+
+            if self.chunked:
+                if not self._parse_chunks():
+                    return
+                self.request.body = b"".join(self.chunks)
+                self.chunks = []
+            elif len(buffer) < self.length:
+                return
+            elif self.length:
+                self.request.body = bytes(buffer[: self.length])
+                del buffer[: self.length]
+
+            request, self.request = self.request, None
+            self.conn.on_request(request)
+
+    def _parse_head(self, head: bytes) -> Request:
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, protocol = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400)
+        if not protocol.startswith("HTTP/1."):
+            raise HTTPError(505)
+
+        headers: Headers = []
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise HTTPError(400)
+            headers.append((name.strip().lower(), value.strip()))
+
+        request = Request(self.conn, method, target, protocol[5:], headers)
+        connection = (request.header("connection") or "").lower()
+        request.keep_alive = connection != "close" if request.version == "1.1" else connection == "keep-alive"
+        transfer_encoding, content_length = request.header("transfer-encoding"), request.header("content-length")
+        if transfer_encoding is not None and content_length is not None:
+            raise HTTPError(400)  # ambiguous framing, a request smuggling vector
+        if transfer_encoding is not None:
+            _check_transfer_encoding(headers)
+        self.chunked = transfer_encoding is not None
+        self.chunk = None
+        if content_length is None:
+            self.length = 0
+        elif content_length.isascii() and content_length.isdigit():
+            self.length = int(content_length)
+        else:
+            raise HTTPError(400)
+        if self.length > self.max_body_size:
+            raise HTTPError(413)
+        return request
+
+    def _parse_chunks(self) -> bool:
+        buffer = self.buffer
+        while True:
+            if self.chunk is None:
+                end = buffer.find(b"\r\n")
+                if end < 0:
+                    if len(buffer) > 1024:
+                        raise HTTPError(400)
+                    return False
+                try:
+                    size = int(buffer[:end].split(b";")[0], 16)
+                except ValueError:
+                    raise HTTPError(400)
+                del buffer[: end + 2]
+                self.length += size
+                if self.length > self.max_body_size:
+                    raise HTTPError(413)
+                self.chunk = size
+            if self.chunk == 0:
+                if buffer.startswith(b"\r\n"):
+                    del buffer[:2]
+                    return True
+                end = buffer.find(b"\r\n\r\n")  # trailers are ignored
+                if end < 0:
+                    return False
+                del buffer[: end + 4]
+                return True
+            if len(buffer) < self.chunk + 2:
+                return False
+            self.chunks.append(bytes(buffer[: self.chunk]))
+            del buffer[: self.chunk + 2]
+            self.chunk = None
+
+
+class _HttpToolsParser:
+    """Same as `_Parser`, built on httptools"""
+
+    def __init__(self, conn: "HTTPConnection") -> None:
+        self.conn = conn
+        self.max_header_size = conn.listener.max_header_size
+        self.max_body_size = conn.listener.max_body_size
+        self.parser = httptools.HttpRequestParser(self)
+        self.url = b""
+        self.headers: Headers = []
+        self.header_size = 0
+        self.body: List[bytes] = []
+        self.body_size = 0
+
+    def feed(self, data: bytes) -> None:
+        try:
+            self.parser.feed_data(data)
+        except httptools.HttpParserUpgrade:
+            raise HTTPError(501)
+        except httptools.HttpParserError as e:
+            raise HTTPError(getattr(e.__context__, "status", 400))
+
+    def on_url(self, url: bytes) -> None:
+        self.url += url
+        self.header_size += len(url)
+
+    def on_header(self, name: bytes, value: bytes) -> None:
+        self.header_size += len(name) + len(value)
+        if self.header_size > self.max_header_size:
+            raise HTTPError(431)
+        self.headers.append((name.decode("latin-1").lower(), value.decode("latin-1")))
+
+    def on_headers_complete(self) -> None:
+        if not self.parser.get_http_version().startswith("1."):
+            raise HTTPError(505)
+        if any(name == "transfer-encoding" for name, _ in self.headers):
+            _check_transfer_encoding(self.headers)
+        for name, value in self.headers:
+            if name == "content-length" and int(value) > self.max_body_size:
+                raise HTTPError(413)
+            if name == "expect" and value.lower() == "100-continue":
+                self.conn.send_continue()
+
+    def on_body(self, body: bytes) -> None:
+        self.body_size += len(body)
+        if self.body_size > self.max_body_size:
+            raise HTTPError(413)
+        self.body.append(body)
+
+    def on_message_complete(self) -> None:
+        request = Request(
+            self.conn,
+            self.parser.get_method().decode(),
+            self.url.decode("latin-1"),
+            self.parser.get_http_version(),
+            self.headers,
+            b"".join(self.body),
+            self.parser.should_keep_alive(),
+        )
+        self.url, self.headers, self.header_size, self.body, self.body_size = b"", [], 0, [], 0
+        self.conn.on_request(request)
+
+
+class HTTPConnection(asyncio.Protocol):
+    """A keep-alive HTTP/1.1 connection, requests may be pipelined"""
+
+    def __init__(self, listener: "HTTPListener") -> None:
+        self.listener = listener
+        self.transport: Union[asyncio.Transport, None] = None
+        self.parser: Union[_Parser, _HttpToolsParser] = (
+            _HttpToolsParser(self) if listener.use_httptools else _Parser(self)
+        )
+        self.pipeline: Deque[Request] = deque()
+        self.closing = False
+        self.__idle: Union[TimerHandle, None] = None
+
+    @property
+    def peername(self) -> Any:
+        return self.transport.get_extra_info("peername") if self.transport is not None else None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+        self.listener.connections.add(self)
+        self._arm_idle()
+
+    def connection_lost(self, exc: Union[Exception, None]) -> None:
+        self.listener.connections.discard(self)
+        self.closing = True
+        self._cancel_idle()
+
+    def data_received(self, data: bytes) -> None:
+        if self.closing:
+            return
+        self._cancel_idle()
+        try:
+            self.parser.feed(data)
+        except HTTPError as e:
+            self.closing = True
+            assert self.transport is not None
+            self.transport.pause_reading()
+            request = Request(self, "", "", "1.1", [], keep_alive=False)
+            self.pipeline.append(request)
+            request.respond(e.status, HTTPStatus(e.status).phrase)
+
+    def send_continue(self) -> None:
+        if not self.pipeline and self.transport is not None:
+            self.transport.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+    def on_request(self, request: Request) -> None:
+        self.pipeline.append(request)
+        if len(self.pipeline) >= self.listener.max_pipeline:
+            assert self.transport is not None
+            self.transport.pause_reading()
+        self.listener.on_request(self, request)
+
+    def flush(self) -> None:
+        """Send the responses which are ready, in the order of the requests"""
+        pipeline = self.pipeline
+        if not pipeline or pipeline[0].response is None:
+            return
+
+        out = []
+        keep_alive = True
+        while pipeline and pipeline[0].response is not None:
+            request = pipeline.popleft()
+            out.append(request.response)
+            if not request.keep_alive:
+                keep_alive = False
+                pipeline.clear()
+        if self.transport is None or self.transport.is_closing():
+            return
+
+        self.transport.write(b"".join(out))  # type: ignore
+        if not keep_alive or (self.closing and not pipeline):
+            self.closing = True
+            self.transport.close()
+        elif len(pipeline) < self.listener.max_pipeline:
+            self.transport.resume_reading()
+            if not pipeline:
+                self._arm_idle()
+
+    def close(self) -> None:
+        """Close once the pending requests are answered"""
+        self.closing = True
+        if not self.pipeline and self.transport is not None:
+            self.transport.close()
+
+    def _arm_idle(self) -> None:
+        timeout = self.listener.keep_alive_timeout
+        if timeout is not None:
+            self._cancel_idle()
+            self.__idle = self.listener.scheduler.call_later(timeout, self.close)
+
+    def _cancel_idle(self) -> None:
+        if self.__idle is not None:
+            self.__idle.cancel()
+            self.__idle = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(peername={self.peername}, pipeline={len(self.pipeline)})"
+
+
+class HTTPListener(Listener):
+    """Serve HTTP/1.1, each request triggers the event `METHOD:/path` (without the query string),
+    `HEAD` requests fall back to the `GET` routes:
+
+        >>> app = HTTPListener("127.0.0.1", 8000)
+        >>> @app.on_event("GET:/user/{username}")
+        ... async def hello(request: Data, username: Param):
+        ...     request.respond(200, f"Hello, {username}!", headers=[("content-type", "text/plain")])
+
+    A handler may return the body instead, `None` is answered with 204, an error with 500.
+    The requests are parsed by httptools when it is installed.
+    """
+
+    def __init__(
+        self,
+        host: Union[str, None],
+        port: int,
+        keep_alive_timeout: Union[float, None] = 5,
+        max_pipeline: int = 32,
+        max_header_size: int = 1 << 16,
+        max_body_size: int = 1 << 20,
+        request_timeout: Union[float, None] = None,
+        use_httptools: Union[bool, None] = None,
+        access_log: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param host: Interface to bind, None means all
+        :param port: Port to bind, 0 means a random one
+        :param keep_alive_timeout: Seconds an idle connection is kept open, None means forever
+        :param max_pipeline: Pending requests pausing the reading of a connection
+        :param max_header_size: Larger request heads are answered with 431
+        :param max_body_size: Larger request bodies are answered with 413
+        :param request_timeout: Timeout of the handlers, answered with 504
+        :param use_httptools: Parse with httptools, None means when it is installed
+        :param access_log: Log every response
+        :param kwargs: See `Listener`
+        """
+        super().__init__(**kwargs)
+        if use_httptools and httptools is None:
+            raise RuntimeError("httptools is not installed, `pip install httptools`")
+        self.host = host
+        self.port = port
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_pipeline = max_pipeline
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self.request_timeout = request_timeout
+        self.use_httptools = httptools is not None if use_httptools is None else use_httptools
+        self.access_log = access_log
+        self.connections: Set[HTTPConnection] = set()
+        self.server: Union[asyncio.AbstractServer, None] = None
+        self.__date: Tuple[int, bytes] = (0, b"")
+
+    async def listen(self) -> None:
+        loop = asyncio.get_event_loop()
+        self.server = await loop.create_server(lambda: HTTPConnection(self), self.host, self.port)
+        self.add_shutdown_callback(self._close)
+        host, port, *_ = self.server.sockets[0].getsockname()
+        logger.info("HTTP server running on http://%s:%d", host, port)
+
+    def on_request(self, conn: HTTPConnection, request: Request) -> None:
+        """Trigger the event of a request in a new context, dropped once the request is answered"""
+        ctx = self.new_ctx(scope={"request": request})
+        data = {"request": request}
+        try:
+            try:
+                future = ctx.trigger_event(f"{request.method}:{request.path}", self.request_timeout, data)
+            except EventNotFound:
+                if request.method != "HEAD":
+                    raise
+                future = ctx.trigger_event(f"GET:{request.path}", self.request_timeout, data)
+        except ListenerError as e:
+            ctx.drop()
+            request.respond(self.error_status(e))
+        else:
+            future.add_done_callback(partial(self._on_done, ctx, request))
+
+    def _on_done(self, ctx: Context, request: Request, future: "asyncio.Future[Any]") -> None:
+        ctx.drop()
+        if request.responded:
+            return
+        if future.cancelled():
+            request.respond(503)
+        elif future.exception() is not None:
+            error = future.exception()
+            status = self.error_status(error)  # type: ignore
+            if status == 500:
+                logger.error("Exception in %r", request, exc_info=error)
+            request.respond(status)
+        else:
+            result = next(iter(ctx.events.values()))[0].result
+            if result is None:
+                request.respond(204)
+            elif isinstance(result, (bytes, str)):
+                request.respond(200, result)
+            else:
+                logger.error("Unsupported result %r in %r, return bytes or str", type(result).__name__, request)
+                request.respond(500)
+
+    @staticmethod
+    def error_status(error: BaseException) -> int:
+        for kls, status in ERROR_STATUS:
+            if isinstance(error, kls):
+                return status
+        return 500
+
+    def date_header(self) -> bytes:
+        now = int(time.time())
+        if now != self.__date[0]:
+            self.__date = (now, f"date: {formatdate(now, usegmt=True)}\r\n".encode())
+        return self.__date[1]
+
+    async def _close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+        for conn in list(self.connections):
+            conn.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(host={self.host}, port={self.port}, connections={len(self.connections)})"
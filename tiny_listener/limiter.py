@@ -0,0 +1,142 @@
+import asyncio
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Union
+
+
+class Limiter:
+    """Bound the number of concurrent handlers of a route, the limit adapts to the observed latency.
+
+    Set it with the route option `limiter`:
+
+        >>> @app.on_event("/query/{sql}", limiter=AIMDLimiter(max_latency=0.5))
+        ... async def query(sql: Param):
+        ...     ...
+    """
+
+    def __init__(self, initial: int = 10, min_limit: int = 1, max_limit: int = 1000) -> None:
+        """
+        :param initial: Initial limit
+        :param min_limit: The limit never gets below
+        :param max_limit: The limit never gets above
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.inflight = 0
+        self._limit = float(initial)
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def update(self, latency: float, dropped: bool) -> float:
+        """Compute the new limit from a handler latency, `dropped` means the handler timed out"""
+        raise NotImplementedError()
+
+    async def acquire(self) -> None:
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.inflight -= 1
+                self._wake()
+            raise
+
+    def release(self, latency: float, dropped: bool = False) -> None:
+        self._limit = min(self.max_limit, max(self.min_limit, self.update(latency, dropped)))
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "inflight": self.inflight, "waiting": len(self._waiters)}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(limit={self.limit}, inflight={self.inflight})"
+
+
+class AIMDLimiter(Limiter):
+    """Additive increase, multiplicative decrease.
+
+    The limit grows by one when the handler is fast enough while the route is busy,
+    and is multiplied by `backoff` on a timeout or when the latency exceeds `max_latency`.
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        max_latency: Union[float, None] = None,
+        backoff: float = 0.9,
+    ) -> None:
+        """
+        :param max_latency: Latency considered as an overload, None means only timeouts are
+        :param backoff: Ratio applied to the limit on overload
+        """
+        super().__init__(initial, min_limit, max_limit)
+        self.max_latency = max_latency
+        self.backoff = backoff
+
+    def update(self, latency: float, dropped: bool) -> float:
+        if dropped or (self.max_latency is not None and latency > self.max_latency):
+            return self._limit * self.backoff
+        if self.inflight * 2 >= self._limit:
+            return self._limit + 1
+        return self._limit
+
+
+class GradientLimiter(Limiter):
+    """Follow the gradient between the long term latency and the latest one.
+
+    While the latency stays flat the gradient is 1 and the limit grows by its square root (the allowed queue),
+    when the latency rises above `tolerance` times the long term average, the limit shrinks down to half.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        window: int = 600,
+    ) -> None:
+        """
+        :param tolerance: Latency increase tolerated before backing off
+        :param smoothing: Weight of a new limit against the current one
+        :param window: Number of samples of the long term latency average
+        """
+        super().__init__(initial, min_limit, max_limit)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.window = window
+        self.long_latency: Union[float, None] = None
+
+    def update(self, latency: float, dropped: bool) -> float:
+        if self.long_latency is None:
+            self.long_latency = latency
+        else:
+            self.long_latency += (latency - self.long_latency) * 2 / (self.window + 1)
+
+        if dropped:
+            gradient = 0.5
+        elif latency <= 0:
+            gradient = 1.0
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.long_latency / latency))
+        new_limit = self._limit * gradient + math.sqrt(self._limit)
+        return self._limit * (1 - self.smoothing) + new_limit * self.smoothing
@@ -1,10 +1,16 @@
 import asyncio
+import logging
 import signal
 import threading
-from typing import Any, Callable, Dict, Generic, List, Tuple, Type, TypeVar, Union
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Generic, List, Set, Tuple, Type, TypeVar, Union
 from uuid import uuid4
 
 from ._typing import CoroFunc, PathParams
+from .admission import AdmissionController
+from .cluster import Cluster
+from .coalesce import REDUCERS, Batch
 from .context import Context
 from .errors import (
     ContextAlreadyExists,
@@ -12,14 +18,28 @@ from .errors import (
     DuplicateListener,
     EventAlreadyExists,
     EventNotFound,
+    EventRejected,
+    ListenerClosed,
+    ListenerError,
     ListenerNotFound,
+    RouteError,
 )
+from .event import Event
 from .hook import Hook
+from .metrics import Metrics, RouteMetrics, serve
+from .monitor import LoopMonitor
+from .recorder import Recorder
 from .routing import Route
+from .scheduler import SKIP, Cron, Job, Scheduler
+from .spill import SpillQueue
+from .tasks import chain_future, create_eager_task
+from .tracing import Tracer, current_span
 from .utils import check_coro_func, is_main_thread
+from .wal import WriteAheadLog
 
 CTXType = TypeVar("CTXType", bound=Context)
 
+logger = logging.getLogger(__name__)
 
 HANDLED_SIGNALS = (
     signal.SIGINT,  # Unix signal 2
@@ -30,9 +50,53 @@ HANDLED_SIGNALS = (
 class Listener(Generic[CTXType]):
     _instances: Dict[int, "Listener"] = {}
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        drain_timeout: Union[float, None] = 30,
+        drain_interval: float = 1,
+        eager: bool = False,
+        tracer: Union[Tracer, None] = None,
+        monitor: Union[LoopMonitor, None] = None,
+        admission: Union[AdmissionController, None] = None,
+        recorder: Union[Recorder, None] = None,
+        wal: Union[WriteAheadLog, None] = None,
+        spill: Union[SpillQueue, None] = None,
+        cluster: Union[Cluster, None] = None,
+    ) -> None:
+        """
+        :param drain_timeout: Max seconds to wait for in-flight events on shutdown, None means wait forever
+        :param drain_interval: Seconds between two drain progress reports
+        :param eager: Run events inline in `trigger_event` until they suspend, can be overridden by route option `eager`
+        :param tracer: Record a span for every event
+        :param monitor: Measure the loop lag and catch blocking handlers while running
+        :param admission: Shed low priority events when the listener is overloaded
+        :param recorder: Record every triggered event, to replay it later
+        :param wal: Log every triggered event before running it, the events lost by a crash are replayed by `main()`
+        :param spill: Spill the events to disk while the listener is overloaded
+        :param cluster: Route the events of a cid to the node owning it
+        """
         self.ctxs: Dict[str, CTXType] = {}
         self.routes: Dict[str, Route] = {}
+        self.drain_timeout = drain_timeout
+        self.drain_interval = drain_interval
+        self.eager = eager
+        self.tracer = tracer
+        self.monitor = monitor
+        self.admission = admission
+        self.recorder = recorder
+        self.wal = wal
+        self.spill = spill
+        self.cluster = cluster
+        if admission is not None:
+            admission.attach(self)
+        self.inflight: Dict["asyncio.Future[Any]", Event] = {}
+        self._batches: Dict[str, Batch] = {}
+        self.scheduler = Scheduler()
+        self.jobs: List[Job] = []
+        self._delayed: "Set[asyncio.Future[Any]]" = set()
+        self._committing: "Set[asyncio.Future[Any]]" = set()
+        self._deferred: "Set[asyncio.Future[Any]]" = set()
+        self._metrics = Metrics()
 
         self._startup: List[CoroFunc] = []
         self._shutdown: List[CoroFunc] = []
@@ -41,6 +105,8 @@ class Listener(Generic[CTXType]):
         self._error_handlers: List[Tuple[Type[Exception], Hook]] = []
         self.__context_cls: Type = Context
         self.__exiting = asyncio.Event()
+        self.__stopped = asyncio.Event()
+        self.__started = False
 
     async def listen(self) -> None:
         raise NotImplementedError()
@@ -60,8 +126,30 @@ class Listener(Generic[CTXType]):
             return
 
         self.__exiting.set()
+        for job in self.jobs:
+            job.cancel()
+        for future in [*self._delayed, *self._deferred]:
+            future.cancel()
+        if self.cluster is not None:
+            self.cluster.leave()
+        stragglers = await self.drain(self.drain_timeout)
+        if stragglers:
+            logger.warning("Drain deadline exceeded, cancelling %d in-flight event(s)", stragglers)
+        if self.cluster is not None:
+            await self.cluster.close()
         for cb in self._shutdown:
             await cb()
+        if self.tracer is not None:
+            self.tracer.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.spill is not None:
+            self.spill.close()
+        if self.wal is not None:
+            await self.wal.close()
+        if self.monitor is not None:
+            self.monitor.stop()
+        self.__stopped.set()
         tasks = []
         for task in asyncio.all_tasks(loop):
             if task is not asyncio.current_task(loop):
@@ -69,6 +157,33 @@ class Listener(Generic[CTXType]):
                 tasks.append(task)
         await asyncio.gather(*tasks)
 
+    async def drain(self, timeout: Union[float, None] = None) -> int:
+        """Wait for in-flight events to finish, the calling event (if any) is not waited.
+
+        :param timeout: Max seconds to wait, None means wait forever
+        :return: Number of events still running when the deadline is reached
+        """
+        loop = asyncio.get_event_loop()
+        current = asyncio.current_task()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            pending = [task for task in self.inflight if task is not current]
+            if self.spill is not None and self.spill.feeder is not None:
+                pending.append(self.spill.feeder)
+            pending.extend(self._committing)
+            pending.extend(self._deferred)
+            if not pending:
+                return 0
+
+            wait = self.drain_interval
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return len(pending)
+                wait = min(wait, remaining)
+            logger.info("Draining %d in-flight event(s)", len(pending))
+            await asyncio.wait(pending, timeout=wait)
+
     def set_context_cls(self, kls: Type[Context]) -> None:
         """
         :param kls: Context class
@@ -137,6 +252,13 @@ class Listener(Generic[CTXType]):
         path: str = "{_:path}",
         **opts: Any,
     ) -> None:
+        if "retry" in opts and "coalesce" in opts:
+            raise RouteError("A coalesced route can not be retried")
+        window, merge = opts.get("coalesce"), opts.get("merge", "latest")
+        if window is not None and (isinstance(window, bool) or not isinstance(window, (int, float)) or window < 0):
+            raise RouteError(f"Invalid coalesce window `{window!r}`, expected seconds")
+        if not callable(merge) and merge not in REDUCERS:
+            raise RouteError(f"Unknown merge strategy `{merge}`, allowed: {list(REDUCERS)} or a callable")
         route = Route(path=path, fn=fn, opts=opts)
         if route.name in self.routes:
             raise EventAlreadyExists(f"Event `{route.name}` already exists")
@@ -187,6 +309,84 @@ class Listener(Generic[CTXType]):
 
         return f
 
+    def add_periodic_event(
+        self,
+        path: str,
+        interval: Union[float, None] = None,
+        cron: Union[str, None] = None,
+        jitter: float = 0,
+        missed: str = SKIP,
+        data: Union[Dict, None] = None,
+    ) -> Job:
+        """Trigger an event periodically, in a new context each time, from the start of the listener until its shutdown
+
+        :param interval: Seconds between two events
+        :param cron: Cron expression of the minutes of the events, instead of an interval, see `Cron`
+        :param jitter: Max seconds added at random to each event
+        :param missed: Policy of the ticks missed while the loop was busy, see `tiny_listener.scheduler.SKIP`
+        :param data: Event data
+        :raises ValueError: Invalid period or policy
+        """
+        job = Job(
+            self.scheduler,
+            self._tick,
+            (path, data),
+            interval=interval,
+            cron=None if cron is None else Cron(cron),
+            jitter=jitter,
+            missed=missed,
+        )
+        self.jobs.append(job)
+        if self.__started:
+            job.start()
+        return job
+
+    def every(
+        self, interval: float, path: Union[str, None] = None, jitter: float = 0, missed: str = SKIP, **opts: Any
+    ) -> Callable[[CoroFunc], CoroFunc]:
+        """Trigger the decorated handler every `interval` seconds, see `add_periodic_event`
+
+        :param path: Path of the route, default to the name of the handler
+        """
+
+        def _decorator(fn: CoroFunc) -> CoroFunc:
+            self.add_on_event_hook(fn, path or fn.__name__, **opts)
+            self.add_periodic_event(path or fn.__name__, interval=interval, jitter=jitter, missed=missed)
+            return fn
+
+        return _decorator
+
+    def cron(
+        self, expr: str, path: Union[str, None] = None, jitter: float = 0, missed: str = SKIP, **opts: Any
+    ) -> Callable[[CoroFunc], CoroFunc]:
+        """Trigger the decorated handler at the minutes matching a cron expression, see `add_periodic_event`
+
+        :param path: Path of the route, default to the name of the handler
+        """
+
+        def _decorator(fn: CoroFunc) -> CoroFunc:
+            self.add_on_event_hook(fn, path or fn.__name__, **opts)
+            self.add_periodic_event(path or fn.__name__, cron=expr, jitter=jitter, missed=missed)
+            return fn
+
+        return _decorator
+
+    def _tick(self, path: str, data: Union[Dict, None]) -> None:
+        ctx = self.new_ctx()
+        try:
+            future = ctx.trigger_event(path, data=data)
+        except ListenerError as e:
+            ctx.drop()
+            logger.warning("Periodic event `%s` dropped: %r", path, e)
+        else:
+            future.add_done_callback(partial(self._tick_done, ctx, path))
+
+    @staticmethod
+    def _tick_done(ctx: Context, path: str, future: "asyncio.Future[Any]") -> None:
+        ctx.drop()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Periodic event `%s` failed: %r", path, future.exception())
+
     def match_route(self, path: str) -> Tuple[Route, PathParams]:
         """
         :raises: EventNotFound
@@ -203,34 +403,415 @@ class Listener(Generic[CTXType]):
         cid: Union[str, None] = None,
         timeout: Union[float, None] = None,
         data: Union[Dict, None] = None,
-    ) -> asyncio.Task:
+        delay: Union[float, None] = None,
+        at: Union[float, None] = None,
+    ) -> "asyncio.Future[Any]":
+        """
+        :param delay: Seconds to wait before triggering the event
+        :param at: Timestamp (see `time.time`) when to trigger the event, instead of a delay
+        :raises EventNotFound:
+        :raises EventAlreadyExists:
+        :raises ListenerClosed:
+        :raises EventRejected:
         """
+        if self.__exiting.is_set():
+            raise ListenerClosed("Listener is shutting down, no more events accepted")
+        if at is not None:
+            delay = at - time.time()
+        if delay is not None and delay > 0:
+            return self._delay(path, cid, timeout, data, delay)
+
+        if self.recorder is not None:
+            self.recorder.record(path, cid, data)
+        if self.cluster is not None and cid is not None:
+            node = self.cluster.owner(cid)
+            if node != self.cluster.node:
+                return self.cluster.forward(node, path, cid, timeout, data)
+        return self._trigger_local(path, cid, timeout, data)
+
+    def trigger_local_event(
+        self,
+        path: str,
+        cid: Union[str, None] = None,
+        timeout: Union[float, None] = None,
+        data: Union[Dict, None] = None,
+    ) -> "asyncio.Future[Any]":
+        """Trigger an event on this node whatever the owner of its cid, see `Cluster`
+
         :raises EventNotFound:
         :raises EventAlreadyExists:
+        :raises ListenerClosed:
+        :raises EventRejected:
         """
+        if self.__exiting.is_set():
+            raise ListenerClosed("Listener is shutting down, no more events accepted")
+        return self._trigger_local(path, cid, timeout, data)
+
+    def _trigger_local(
+        self,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+    ) -> "asyncio.Future[Any]":
+        started = time.perf_counter() if self.tracer is not None else 0
         route, params = self.match_route(path)
+        if self.wal is None:
+            return self._admit(route, params, path, cid, timeout, data, started)
+
+        seq = self.wal.append(path, cid, data)
+        if self.wal.wait_commit:
+            future = asyncio.get_event_loop().create_future()
+            self._committing.add(future)
+            future.add_done_callback(self._committing.discard)
+            commit = partial(self._committed, route, params, path, cid, timeout, data, started, future)
+            self.wal.committed().add_done_callback(commit)
+        else:
+            try:
+                future = self._admit(route, params, path, cid, timeout, data, started)
+            except Exception:
+                self.wal.done(seq)
+                raise
+        future.add_done_callback(partial(self._wal_done, seq))
+        return future
+
+    def _committed(
+        self,
+        route: Route,
+        params: PathParams,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        started: float,
+        future: "asyncio.Future[Any]",
+        commit: "asyncio.Future[None]",
+    ) -> None:
+        """The entry of the event is durable, the event can run"""
+        self._committing.discard(future)
+        if future.done():
+            return
+        if commit.cancelled() or commit.exception() is not None:
+            future.set_exception(commit.exception() or ListenerClosed("Write-ahead log closed"))
+            return
+        try:
+            task = self._admit(route, params, path, cid, timeout, data, started)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            chain_future(task, future)
+            future.add_done_callback(lambda f: task.cancel() if f.cancelled() else None)
+
+    def _admit(
+        self,
+        route: Route,
+        params: PathParams,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        started: float,
+    ) -> "asyncio.Future[Any]":
+        if self.spill is not None and self.spill.holds(self, cid):
+            return self.spill.put(self, path, cid, timeout, data)
+        if self.admission is not None and not self.admission.admit(self, route):
+            return self._shed(route, params, path, cid, timeout, data)
+        return self._dispatch(route, params, path, cid, timeout, data, started)
+
+    def dispatch_spilled(
+        self,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        future: "asyncio.Future[Any]",
+    ) -> None:
+        """Dispatch an event of the `SpillQueue`, its outcome is copied to `future`"""
+        try:
+            route, params = self.match_route(path)
+            task = self._dispatch(route, params, path, cid, timeout, data, time.perf_counter())
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            chain_future(task, future)
+
+    def _delay(
+        self,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        delay: float,
+    ) -> "asyncio.Future[Any]":
+        """The delayed events wait in the scheduler heap, cancelling the future cancels the event"""
+        self.match_route(path)  # fail now on an unknown path
+        future = asyncio.get_event_loop().create_future()
+        handle = self.scheduler.call_later(delay, self._trigger_delayed, path, cid, timeout, data, future)
+        self._delayed.add(future)
+        future.add_done_callback(lambda _: handle.cancel())
+        future.add_done_callback(self._delayed.discard)
+        return future
+
+    def _trigger_delayed(
+        self,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        future: "asyncio.Future[Any]",
+    ) -> None:
+        if future.done():
+            return
+        try:
+            task = self.trigger_event(path, cid, timeout, data)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            chain_future(task, future)
+
+    def _wal_done(self, seq: int, future: "asyncio.Future[Any]") -> None:
+        """A cancelled event (e.g. by the drain deadline) did not complete, it is replayed on the next start"""
+        if self.wal is not None and not future.cancelled():
+            self.wal.done(seq)
+
+    def _dispatch(
+        self,
+        route: Route,
+        params: PathParams,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        started: Union[float, None] = None,
+    ) -> "asyncio.Future[Any]":
         ctx = self.new_ctx() if cid not in self.ctxs else self.ctxs[cid]
-        event = ctx.new_event(route, data or {})
-
-        async def _trigger() -> None:
+        event = ctx.new_event(route, {} if data is None else data)
+        self._metrics.routes[route.name].events += 1
+
+        window = route.opts.get("coalesce")
+        if window is None:
+            coro = self._trigger(event, params, timeout)
+        elif path in self._batches:
+            batch = self._batches[path]
+            batch.join(event)
+            return batch.task
+        else:
+            batch = self._batches[path] = Batch(event, route.opts.get("merge", "latest"))
+            coro = self._coalesce(path, batch, params, timeout, window)
+
+        if self.tracer is not None:
+            if started is None:
+                started = time.perf_counter()
+            self.tracer.start_span(event, path, started).mark("match", started)
+        if route.opts.get("eager", self.eager):
+            task = create_eager_task(coro)
+        else:
+            task = asyncio.get_event_loop().create_task(coro)
+        if window is not None:
+            batch.task = task
+        if not task.done():
+            self.inflight[task] = event
+            task.add_done_callback(self.inflight.pop)
+        if route.opts.get("retry") is None:
+            return task
+        future = asyncio.get_event_loop().create_future()
+        future.add_done_callback(lambda f: self.inflight.pop(f, None))
+        task.add_done_callback(partial(self._attempt_done, event, params, path, timeout, future))
+        return future
+
+    def _attempt_done(
+        self,
+        event: Event,
+        params: PathParams,
+        path: str,
+        timeout: Union[float, None],
+        future: "asyncio.Future[Any]",
+        task: "asyncio.Future[Any]",
+    ) -> None:
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+            return
+        error = task.exception()
+        retry = event.route.opts["retry"]
+        if error is None or not retry.should_retry(event, error):
+            chain_future(task, future)
+            return
+        self._metrics.routes[event.route.name].retries += 1
+        self.inflight[future] = event  # waiting for the next attempt
+        handle = self.scheduler.call_later(
+            retry.delay(event.attempt), self._retry_event, event, params, path, timeout, future
+        )
+        future.add_done_callback(lambda _: handle.cancel())
+
+    def _retry_event(
+        self,
+        event: Event,
+        params: PathParams,
+        path: str,
+        timeout: Union[float, None],
+        future: "asyncio.Future[Any]",
+    ) -> None:
+        self.inflight.pop(future, None)
+        event.attempt += 1
+        event.error = None
+        if self.tracer is not None:  # each attempt is a child of the previous one, in the trace of the event
+            self.tracer.start_span(event, path, parent=event.span)
+        task = asyncio.get_event_loop().create_task(self._trigger(event, params, timeout))
+        self.inflight[task] = event
+        task.add_done_callback(self.inflight.pop)
+        task.add_done_callback(partial(self._attempt_done, event, params, path, timeout, future))
+        future.add_done_callback(lambda _: task.cancel())
+
+    def _shed(
+        self,
+        route: Route,
+        params: PathParams,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        attempt: int = 0,
+        future: "Union[asyncio.Future[Any], None]" = None,
+    ) -> "asyncio.Future[Any]":
+        assert self.admission is not None
+        metrics = self._metrics.routes[route.name]
+        if not self.admission.defer or attempt >= self.admission.max_defers:
+            metrics.shed += 1
+            error = EventRejected(f"Event `{path}` rejected, listener is overloaded")
+            if future is None:
+                raise error
+            future.set_exception(error)
+            return future
+
+        metrics.deferred += 1
+        if future is None:  # waits in `_deferred` until dispatched, then the task is in-flight
+            future = asyncio.get_event_loop().create_future()
+            self._deferred.add(future)
+            future.add_done_callback(self._deferred.discard)
+        args = (route, params, path, cid, timeout, data, attempt + 1, future)
+        self.scheduler.call_later(self.admission.defer, self._retry_deferred, *args)
+        return future
+
+    def _retry_deferred(
+        self,
+        route: Route,
+        params: PathParams,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        attempt: int,
+        future: "asyncio.Future[Any]",
+    ) -> None:
+        if future.done():
+            return
+        if self.__exiting.is_set():
+            future.set_exception(ListenerClosed("Listener is shutting down, no more events accepted"))
+        elif self.admission is not None and not self.admission.admit(self, route):
+            self._shed(route, params, path, cid, timeout, data, attempt, future)
+        else:
             try:
-                for f in self._middleware_before_event:
-                    await f(event, {})
-                await asyncio.wait_for(event(params), timeout=timeout)
-                for f in self._middleware_after_event:
-                    await f(event, {})
+                task = self._dispatch(route, params, path, cid, timeout, data, time.perf_counter())
             except Exception as e:
-                event.error = e
-                handlers = [fn for kls, fn in self._error_handlers if isinstance(e, kls)]
-                if not handlers:
-                    raise e
+                future.set_exception(e)
+            else:
+                self._deferred.discard(future)
+                chain_future(task, future)
+
+    async def _trigger(self, event: Event, params: PathParams, timeout: Union[float, None]) -> None:
+        metrics = self._metrics.routes[event.route.name]
+        metrics.inflight += 1
+        retrying = False
+        start = mark = time.perf_counter()
+        if self.admission is not None:
+            self.admission.observe_queue_age(start - event.created_at)
+        span = event.span
+        if span is not None:
+            current_span.set(span)
+        try:
+            for f in self._middleware_before_event:
+                await f(event, {})
+            if span is not None:
+                mark = span.mark("before_event", mark)
+            limiter = event.route.opts.get("limiter")
+            with self.scheduler.timeout(timeout) as timer:
+                if limiter is None:
+                    await event(params)
                 else:
-                    [await handler(event, {}) for handler in handlers]
-            finally:
-                if event.auto_done:
-                    event.done()
-
-        return asyncio.get_event_loop().create_task(_trigger())
+                    await limiter.acquire()
+                    begin = time.perf_counter()
+                    try:
+                        await event(params)
+                    finally:
+                        limiter.release(time.perf_counter() - begin, dropped=timer.expired)
+            if span is not None:
+                mark = span.mark("handler", mark)
+            for f in self._middleware_after_event:
+                await f(event, {})
+            if span is not None:
+                span.mark("after_event", mark)
+        except Exception as e:
+            metrics.observe_error(e)
+            event.error = e
+            retry = event.route.opts.get("retry")
+            if retry is not None and retry.should_retry(event, e):
+                retrying = True
+                raise e
+            handlers = [fn for kls, fn in self._error_handlers if isinstance(e, kls)]
+            if not handlers:
+                raise e
+            else:
+                [await handler(event, {}) for handler in handlers]
+        finally:
+            metrics.inflight -= 1
+            metrics.latency.record(time.perf_counter() - start)
+            if span is not None and self.tracer is not None:
+                self.tracer.finish_span(span, event.error)
+            if event.auto_done and not retrying:
+                event.done()
+
+    async def _coalesce(
+        self, path: str, batch: Batch, params: PathParams, timeout: Union[float, None], window: float
+    ) -> None:
+        try:
+            await asyncio.sleep(window)
+            del self._batches[path]
+            await self._trigger(batch.leader, params, timeout)
+        finally:
+            if self._batches.get(path) is batch:
+                del self._batches[path]
+            batch.resolve()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of the listener metrics, see `tiny_listener.metrics.to_prometheus` to export it."""
+        snapshot = self._metrics.snapshot()
+        for name, route in self.routes.items():
+            limiter = route.opts.get("limiter")
+            if limiter is not None:
+                snapshot["routes"].setdefault(name, RouteMetrics().snapshot())["limit"] = limiter.limit
+        snapshot["ctxs"] = len(self.ctxs)
+        snapshot["inflight"] = len(self.inflight)
+        if self.monitor is not None:
+            snapshot["loop_lag"] = self.monitor.lag
+        if self.admission is not None:
+            snapshot.update(self.admission.snapshot())
+        if self.spill is not None:
+            snapshot["spilled"] = len(self.spill)
+            snapshot["spilled_total"] = self.spill.spilled
+        if self.wal is not None:
+            snapshot["wal_pending"] = self.wal.pending
+            snapshot["wal_commits"] = self.wal.commits
+        if self.cluster is not None:
+            snapshot.update(self.cluster.metrics())
+        snapshot["jobs"] = sum(not job.cancelled for job in self.jobs)
+        snapshot["delayed"] = len(self._delayed)
+        return snapshot
+
+    async def serve_metrics(self, host: str = "127.0.0.1", port: int = 9100) -> asyncio.AbstractServer:
+        """Expose `metrics()` in Prometheus text format over HTTP"""
+        return await serve(self.metrics, host, port)
 
     @staticmethod
     def setup_event_loop() -> asyncio.AbstractEventLoop:
@@ -242,13 +823,39 @@ class Listener(Generic[CTXType]):
         return asyncio.get_event_loop()
 
     async def main(self) -> None:
+        if self.monitor is not None:
+            self.monitor.start(self)
         for fn in self._startup:
             await fn()
+        if self.cluster is not None:
+            await self.cluster.start(self)
+        if self.wal is not None:
+            await self.replay_wal()
+        self.__started = True
+        for job in self.jobs:
+            job.start()
         await self.listen()
         await self.wait_for_shutdown()
 
+    async def replay_wal(self) -> int:
+        """Trigger again the events which did not complete in the previous run, see `WriteAheadLog`
+
+        :return: Number of events replayed
+        """
+        assert self.wal is not None
+        replayed = 0
+        for frame in self.wal.recover():
+            try:
+                self.trigger_event(frame.path, frame.cid, data=frame.data)
+            except ListenerError as e:
+                logger.warning("Recovered event `%s` dropped: %r", frame.path, e)
+            else:
+                replayed += 1
+        await self.wal.sync()
+        return replayed
+
     async def wait_for_shutdown(self) -> None:
-        await self.__exiting.wait()
+        await self.__stopped.wait()
 
     def run(self) -> None:
         ident = threading.get_ident()
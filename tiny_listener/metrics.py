@@ -0,0 +1,211 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, List, Tuple
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+# (route snapshot key, metric name, metric type, help)
+ROUTE_METRICS: List[Tuple[str, str, str, str]] = [
+    ("events", "events_total", "counter", "Events triggered per route."),
+    ("inflight", "route_inflight", "gauge", "Events running per route."),
+    ("timeouts", "timeouts_total", "counter", "Events timed out per route."),
+    ("shed", "shed_total", "counter", "Events rejected by the admission controller per route."),
+    ("deferred", "deferred_total", "counter", "Events deferred by the admission controller per route."),
+    ("retries", "retries_total", "counter", "Failed events run again per route."),
+    ("limit", "concurrency_limit", "gauge", "Concurrency limit of the routes with an adaptive limiter."),
+]
+
+
+class Histogram:
+    """Log-linear latency histogram in the spirit of HdrHistogram.
+
+    Values are recorded in microseconds, each power of two is split into `2 ** (SUB_BITS - 1)` buckets,
+    so a recorded value is off by at most 1 / 2 ** (SUB_BITS - 1) (6.25%) and recording is O(1) without allocation.
+    """
+
+    SUB_BITS = 5
+    SUB_COUNT = 1 << SUB_BITS
+    HALF_COUNT = SUB_COUNT >> 1
+
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * self.SUB_COUNT
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    @classmethod
+    def index(cls, micros: int) -> int:
+        if micros < cls.SUB_COUNT:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BITS
+        return cls.SUB_COUNT + (shift - 1) * cls.HALF_COUNT + (micros >> shift) - cls.HALF_COUNT
+
+    @classmethod
+    def value(cls, index: int) -> float:
+        """Middle of the bucket in seconds"""
+        if index < cls.SUB_COUNT:
+            return index / 1e6
+        shift, mantissa = divmod(index - cls.SUB_COUNT, cls.HALF_COUNT)
+        shift += 1
+        return (((mantissa + cls.HALF_COUNT) << shift) + (1 << (shift - 1))) / 1e6
+
+    def record(self, seconds: float) -> None:
+        idx = self.index(int(seconds * 1e6))
+        counts = self.counts
+        if idx >= len(counts):
+            counts.extend([0] * (idx + 1 - len(counts)))
+        counts[idx] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        if q >= 1:
+            return self.max
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(max(self.value(idx), self.min), self.max)
+        return self.max  # pragma: no cover
+
+    def snapshot(self) -> Dict[str, float]:
+        data = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+        for key, q in PERCENTILES.items():
+            data[key] = self.percentile(q)
+        return data
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count={self.count}, p50={self.percentile(0.5)}, max={self.max})"
+
+
+class RouteMetrics:
+    __slots__ = ("events", "inflight", "timeouts", "shed", "deferred", "retries", "errors", "latency")
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.inflight = 0
+        self.timeouts = 0
+        self.shed = 0
+        self.deferred = 0
+        self.retries = 0
+        self.errors: DefaultDict[str, int] = defaultdict(int)
+        self.latency = Histogram()
+
+    def observe_error(self, e: BaseException) -> None:
+        if isinstance(e, asyncio.TimeoutError):
+            self.timeouts += 1
+        else:
+            self.errors[type(e).__name__] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "inflight": self.inflight,
+            "timeouts": self.timeouts,
+            "shed": self.shed,
+            "deferred": self.deferred,
+            "retries": self.retries,
+            "errors": dict(self.errors),
+            "latency": self.latency.snapshot(),
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(events={self.events}, inflight={self.inflight})"
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.routes: DefaultDict[str, RouteMetrics] = defaultdict(RouteMetrics)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"routes": {name: route.snapshot() for name, route in self.routes.items()}}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(routes={list(self.routes)})"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def to_prometheus(snapshot: Dict[str, Any], prefix: str = "tiny_listener") -> str:
+    """Render a `Listener.metrics()` snapshot in Prometheus text format"""
+    lines = []
+
+    def metric(name: str, kind: str, help_: str, samples: List[str]) -> None:
+        lines.append(f"# HELP {prefix}_{name} {help_}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.extend(samples)
+
+    routes: Dict[str, Dict[str, Any]] = snapshot.get("routes", {})
+    families = {name for _, name, _, _ in ROUTE_METRICS} | {"errors_total", "latency_seconds"}
+    for key, value in snapshot.items():
+        if isinstance(value, (int, float)) and key not in families:
+            metric(key, "gauge", f"Listener {key}.", [f"{prefix}_{key} {value}"])
+
+    for key, name, kind, help_ in ROUTE_METRICS:
+        metric(
+            name, kind, help_, [f"{prefix}_{name}{_labels(route=n)} {r[key]}" for n, r in routes.items() if key in r]
+        )
+    metric(
+        "errors_total",
+        "counter",
+        "Events failed per route and exception type.",
+        [
+            f"{prefix}_errors_total{_labels(route=n, exception=exc)} {count}"
+            for n, r in routes.items()
+            for exc, count in r["errors"].items()
+        ],
+    )
+    samples = []
+    for n, r in routes.items():
+        latency = r["latency"]
+        for key, q in PERCENTILES.items():
+            samples.append(f"{prefix}_latency_seconds{_labels(route=n, quantile=q)} {latency[key]}")
+        samples.append(f"{prefix}_latency_seconds_sum{_labels(route=n)} {latency['sum']}")
+        samples.append(f"{prefix}_latency_seconds_count{_labels(route=n)} {latency['count']}")
+    metric("latency_seconds", "summary", "Event handling latency per route.", samples)
+    return "\n".join(lines) + "\n"
+
+
+async def serve(
+    snapshot: Callable[[], Dict[str, Any]], host: str = "127.0.0.1", port: int = 9100
+) -> asyncio.AbstractServer:
+    """Serve the metrics in Prometheus text format over HTTP, any path is accepted"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = to_prometheus(snapshot()).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                b"Connection: close\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
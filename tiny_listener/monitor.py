@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Union
+
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from .listener import Listener  # noqa # pylint: disable=unused-import
+
+LOOP = "<loop>"
+"""Route name of a blocking callback not running an event"""
+
+
+class Stall:
+    """Aggregated blocking calls of one route"""
+
+    __slots__ = ("count", "max", "cids", "stacks")
+
+    def __init__(self, keep: int) -> None:
+        self.count = 0
+        self.max = 0.0
+        self.cids: Deque[str] = deque(maxlen=keep)
+        self.stacks: Counter = Counter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "max": self.max,
+            "cids": list(self.cids),
+            "stacks": [{"stack": stack, "count": count} for stack, count in self.stacks.most_common()],
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count={self.count}, max={self.max})"
+
+
+class LoopMonitor:
+    """Measure the event loop lag and catch the handlers blocking it.
+
+    A tick is scheduled on the loop every `interval` seconds, the lag is how late it runs.
+    A watchdog thread samples the stack of the loop thread when no tick ran for `interval + threshold` seconds,
+    the blocking event is found through the running task.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, keep: int = 10, stack_limit: int = 8) -> None:
+        """
+        :param interval: Seconds between two lag measures
+        :param threshold: Seconds the loop may be blocked before a stack sample is taken
+        :param keep: Number of blocked context IDs kept per route
+        :param stack_limit: Number of frames kept per stack sample
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.keep = keep
+        self.stack_limit = stack_limit
+        self.lag = 0.0
+        self.lags = Histogram()
+        self.stalls: Dict[str, Stall] = {}
+        self.__lock = threading.Lock()
+        self.__heartbeat = 0.0
+        self.__expected = 0.0
+        self.__pending: Union[Stall, None] = None
+        self.__timer: Union[asyncio.TimerHandle, None] = None
+        self.__stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.__timer is not None
+
+    def start(self, listener: "Listener") -> None:
+        """Must be called from the event loop thread"""
+        loop = asyncio.get_event_loop()
+        self.__stopped.clear()
+        self.__heartbeat = time.monotonic()
+        self.__expected = loop.time() + self.interval
+        self.__timer = loop.call_at(self.__expected, self._tick, loop)
+        ident = threading.get_ident()
+        threading.Thread(target=self._watch, args=(listener, loop, ident), name="LoopMonitor", daemon=True).start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+    def _tick(self, loop: asyncio.AbstractEventLoop) -> None:
+        now = loop.time()
+        self.lag = max(0.0, now - self.__expected)
+        self.lags.record(self.lag)
+        with self.__lock:
+            self.__heartbeat = time.monotonic()
+            if self.__pending is not None:
+                self.__pending.max = max(self.__pending.max, self.lag)
+                self.__pending = None
+        self.__expected = now + self.interval
+        self.__timer = loop.call_at(self.__expected, self._tick, loop)
+
+    def _watch(self, listener: "Listener", loop: asyncio.AbstractEventLoop, ident: int) -> None:
+        reported = 0.0
+        while not self.__stopped.wait(self.threshold / 2):
+            with self.__lock:
+                heartbeat = self.__heartbeat
+                if heartbeat == reported or time.monotonic() - heartbeat < self.interval + self.threshold:
+                    continue
+                reported = heartbeat
+                frame = sys._current_frames().get(ident)  # noqa
+                task = asyncio.current_task(loop)
+                event = listener.inflight.get(task) if task is not None else None
+                name, cid = (event.route.name, event.ctx.cid) if event is not None else (LOOP, None)
+                stall = self.stalls.setdefault(name, Stall(self.keep))
+                stall.count += 1
+                if cid is not None:
+                    stall.cids.append(cid)
+                if frame is not None:
+                    stall.stacks["".join(traceback.format_stack(frame, limit=self.stack_limit))] += 1
+                self.__pending = stall
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.__lock:
+            return {
+                "lag": self.lag,
+                "lags": self.lags.snapshot(),
+                "stalls": {name: stall.snapshot() for name, stall in self.stalls.items()},
+            }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(interval={self.interval}, threshold={self.threshold}, lag={self.lag})"
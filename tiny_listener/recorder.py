@@ -0,0 +1,110 @@
+import json
+import os
+import struct
+import time
+from functools import partial
+from typing import IO, Any, Callable, Dict, Iterator, NamedTuple, Union
+
+from . import codec
+
+MAGIC = b"TLREC"
+VERSION = 2
+"""Version 1 recorded the data as JSON, version 2 with `tiny_listener.codec`, both are read"""
+HEADER = struct.Struct("<5sB")
+RECORD = struct.Struct("<dIiI")
+"""Timestamp, length of the path, length of the cid (-1 means None), length of the data"""
+
+
+class Record(NamedTuple):
+    timestamp: float
+    path: str
+    cid: Union[str, None]
+    data: Union[Dict[str, Any], None]
+
+
+class Recorder:
+    """Append every `trigger_event` call of a listener to a binary file, see `read_records` to read it.
+
+        >>> app = App(recorder=Recorder("events.rec"))
+
+    Each record is a fixed size header followed by the path, the cid and the data (see `tiny_listener.codec`),
+    values of the data which can not be encoded are recorded as their `repr()`.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        self.path = path
+        self.count = 0
+        if os.path.exists(path) and os.path.getsize(path):  # checked before the file is opened, nothing to close
+            version = _check_header(path)
+            if version != VERSION:
+                raise ValueError(f"`{path}` is a recording of version {version}, it can only be read")
+        self.__file: IO[bytes] = open(path, "ab", buffering=buffer_size)
+        if self.__file.tell() == 0:
+            self.__file.write(HEADER.pack(MAGIC, VERSION))
+
+    def record(
+        self,
+        path: str,
+        cid: Union[str, None],
+        data: Union[Dict[str, Any], None],
+        timestamp: Union[float, None] = None,
+    ) -> None:
+        """
+        :param timestamp: Time of the event, default to now
+        """
+        path_bytes = path.encode()
+        cid_bytes = b"" if cid is None else cid.encode()
+        data_bytes = b"" if data is None else codec.dumps(data, default=repr)
+        header = RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            len(path_bytes),
+            -1 if cid is None else len(cid_bytes),
+            len(data_bytes),
+        )
+        self.__file.write(b"".join((header, path_bytes, cid_bytes, data_bytes)))
+        self.count += 1
+
+    def flush(self) -> None:
+        self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path}, count={self.count})"
+
+
+def _check_header(filename: str) -> int:
+    with open(filename, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+        raise ValueError(f"`{filename}` is not a recording")
+    version = HEADER.unpack(header)[1]
+    if version not in (1, VERSION):
+        raise ValueError(f"Unsupported recording version {version} of `{filename}`")
+    return version
+
+
+def read_records(filename: str) -> Iterator[Record]:
+    """Iterate over the records of a file, a truncated last record (e.g. after a crash) is ignored.
+
+    :raises ValueError: The file is not a recording
+    """
+    decode: Callable[[bytes], Any] = json.loads
+    if _check_header(filename) != 1:
+        decode = partial(codec.loads, copy=True)
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        f.seek(HEADER.size)
+        offset = HEADER.size
+        while offset + RECORD.size <= size:
+            timestamp, path_len, cid_len, data_len = RECORD.unpack(f.read(RECORD.size))
+            body_len = path_len + max(cid_len, 0) + data_len
+            offset += RECORD.size + body_len
+            if offset > size:
+                return
+            body = f.read(body_len)
+            path = body[:path_len].decode()
+            cid = None if cid_len < 0 else body[path_len : path_len + cid_len].decode()
+            data = decode(body[path_len + max(cid_len, 0) :]) if data_len else None
+            yield Record(timestamp, path, cid, data)
@@ -0,0 +1,60 @@
+import random
+from typing import TYPE_CHECKING, Tuple, Type
+
+if TYPE_CHECKING:
+    from .event import Event
+
+
+class Retry:
+    """Run the failed events of a route again, after an exponential backoff.
+
+    Set it with the route option `retry`:
+
+        >>> @app.on_event("/charge/{order_id}", retry=Retry(attempts=5, retry_on=(ConnectionError,)))
+        ... async def charge(order_id: Param, event: Event):
+        ...     print("attempt", event.attempt)
+
+    The same event runs again, `Event.attempt` counts its runs. Between two attempts the event waits in the listener
+    scheduler, not in a sleeping task, it still counts as in flight. The error hooks only see the last failure.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 10,
+        multiplier: float = 2,
+        jitter: bool = True,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    ) -> None:
+        """
+        :param attempts: Max runs of an event, including the first one
+        :param backoff: Seconds before the first retry
+        :param max_backoff: The backoff never gets above
+        :param multiplier: Growth of the backoff after each retry
+        :param jitter: Wait a random time between 0 and the backoff ("full jitter"), so failed events do not retry in sync
+        :param retry_on: Exception classes worth a retry, the other errors fail the event at once
+        """
+        if attempts < 1:
+            raise ValueError("A retry policy needs at least 1 attempt")
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError("The backoff of a retry policy must not be negative")
+        if multiplier < 1:
+            raise ValueError("The backoff multiplier of a retry policy must be at least 1")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.retry_on = retry_on
+
+    def should_retry(self, event: "Event", error: BaseException) -> bool:
+        return event.attempt < self.attempts and isinstance(error, self.retry_on)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the failure of `attempt`"""
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(attempts={self.attempts}, backoff={self.backoff})"
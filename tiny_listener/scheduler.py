@@ -0,0 +1,368 @@
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from types import TracebackType
+from typing import Any, Callable, List, Set, Type, Union
+
+
+class TimerHandle:
+    __slots__ = ("when", "seq", "callback", "args", "cancelled", "_scheduler")
+
+    def __init__(self, scheduler: "Scheduler", when: float, seq: int, callback: Callable, args: Any) -> None:
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._scheduler: Union[Scheduler, None] = scheduler
+
+    def cancel(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler._cancelled += 1  # noqa
+            self._scheduler = None
+            self.cancelled = True
+
+    def __lt__(self, other: "TimerHandle") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(when={self.when}, callback={self.callback}, cancelled={self.cancelled})"
+
+
+class Timeout:
+    """Cancel the current task when the deadline is reached and raise `asyncio.TimeoutError` instead.
+
+    :Example:
+
+        >>> with scheduler.timeout(1):
+        ...     await do_something()
+    """
+
+    __slots__ = ("scheduler", "delay", "expired", "_task", "_handle", "_cancelling")
+
+    def __init__(self, scheduler: "Scheduler", delay: Union[float, None]) -> None:
+        self.scheduler = scheduler
+        self.delay = delay
+        self.expired = False
+        self._task: Union[asyncio.Task, None] = None
+        self._handle: Union[TimerHandle, None] = None
+        self._cancelling = 0
+
+    def __enter__(self) -> "Timeout":
+        if self.delay is None:
+            return self
+        if self.delay <= 0:
+            self.expired = True
+            raise asyncio.TimeoutError()
+
+        self._task = task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("Timeout should be used inside a task")
+        self._cancelling = task.cancelling() if hasattr(task, "cancelling") else 0
+        self._handle = self.scheduler.call_later(self.delay, self._expire)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Union[Type[BaseException], None],
+        exc: Union[BaseException, None],
+        tb: Union[TracebackType, None],
+    ) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        if self.expired and exc_type is asyncio.CancelledError:
+            task = self._task
+            if hasattr(task, "uncancel") and task.uncancel() > self._cancelling:  # type: ignore
+                return  # cancelled by someone else as well
+            raise asyncio.TimeoutError() from exc
+
+    def _expire(self) -> None:
+        self.expired = True
+        self._task.cancel()  # type: ignore
+
+
+SKIP, CATCH_UP, DELAY = "skip", "catch_up", "delay"
+"""What a periodic job does with the ticks missed while the loop was busy:
+skip them and stay on the grid, run each of them at once, or restart the interval from now"""
+
+
+class Cron:
+    """Cron expression of 5 fields: minute, hour, day of month, month and day of week (0 or 7 is Sunday).
+
+    A field is `*`, a value, a range `a-b`, a step `*/n` or `a-b/n`, or a list of them `a,b-c`.
+    When both days are restricted, a day matching either of them matches, as in cron.
+    """
+
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    __slots__ = ("expr", "minutes", "hours", "days", "months", "weekdays", "any_day", "any_weekday")
+
+    def __init__(self, expr: str) -> None:
+        """
+        :raises ValueError: The expression is invalid
+        """
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression `{expr}` must have 5 fields")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            try:
+                if span == "*":
+                    start, end = low, high
+                elif "-" in span:
+                    start, end = map(int, span.split("-", 1))
+                else:
+                    start = end = int(span)
+                stride = int(step) if step else 1
+            except ValueError:
+                raise ValueError(f"Invalid cron field `{field}`") from None
+            if not low <= start <= end <= high or stride < 1:
+                raise ValueError(f"Cron field `{field}` out of [{low}, {high}]")
+            values.update(range(start, end + 1, stride))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next(self, after: float) -> float:
+        """First matching minute after a timestamp, in local time
+
+        :raises ValueError: The expression never matches, e.g. on February 30
+        """
+        moment = datetime.fromtimestamp(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 8)  # every date, including a 29th of February on a given weekday
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = divmod(moment.month, 12)
+                moment = moment.replace(year=moment.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression `{self.expr}` never matches")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.expr!r})"
+
+
+class Job:
+    """Callback run periodically by a `Scheduler`, see `Scheduler.every` and `Scheduler.cron`.
+
+    Only the next run of a job is in the heap of the scheduler, a job costs one timer whatever its period.
+    """
+
+    __slots__ = (
+        "scheduler",
+        "callback",
+        "args",
+        "interval",
+        "cron",
+        "jitter",
+        "missed",
+        "next",
+        "runs",
+        "skipped",
+        "handle",
+    )
+
+    def __init__(
+        self,
+        scheduler: "Scheduler",
+        callback: Callable,
+        args: Any,
+        interval: Union[float, None] = None,
+        cron: Union[Cron, None] = None,
+        jitter: float = 0,
+        missed: str = SKIP,
+    ) -> None:
+        if missed not in (SKIP, CATCH_UP, DELAY):
+            raise ValueError(f"Unknown missed tick policy `{missed}`")
+        if (interval is None) == (cron is None):
+            raise ValueError("A job needs either an interval or a cron expression")
+        if interval is not None and interval <= 0:
+            raise ValueError("The interval of a job must be positive")
+        self.scheduler = scheduler
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.cron = cron
+        self.jitter = jitter
+        self.missed = missed
+        self.next = 0.0  # loop time of the next tick, a timestamp for a cron job
+        self.runs = 0
+        self.skipped = 0
+        self.handle: Union[TimerHandle, None] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.handle is None
+
+    def start(self, delay: Union[float, None] = None) -> "Job":
+        """
+        :param delay: Seconds before the first run, default to one interval, or the next match of the cron expression
+        """
+        if self.cron is not None:
+            self.next = self.cron.next(time.time()) if delay is None else time.time() + delay
+        else:
+            self.next = self.scheduler.time() + (self.interval if delay is None else delay)  # type: ignore
+        self._schedule()
+        return self
+
+    def _schedule(self) -> None:
+        when = self.next + random.uniform(0, self.jitter) if self.jitter else self.next
+        if self.cron is not None:
+            when += self.scheduler.time() - time.time()
+        self.handle = self.scheduler.call_at(when, self._run)
+
+    def _run(self) -> None:
+        self.runs += 1
+        if self.cron is not None:
+            now = time.time()
+            self.next = self.cron.next(self.next)
+            if self.next <= now and self.missed != CATCH_UP:
+                self.next = self.cron.next(now)
+        else:
+            now = self.scheduler.time()
+            interval: float = self.interval  # type: ignore
+            self.next += interval
+            if self.next <= now:
+                if self.missed == SKIP:
+                    missed = math.floor((now - self.next) / interval) + 1
+                    self.next += missed * interval
+                    self.skipped += missed
+                elif self.missed == DELAY:
+                    self.next = now + interval
+        self._schedule()  # before the callback, a failing run does not stop the job
+        self.callback(*self.args)
+
+    def cancel(self) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def __repr__(self) -> str:
+        period = self.cron if self.cron is not None else self.interval
+        return f"{self.__class__.__name__}(period={period}, callback={self.callback}, runs={self.runs})"
+
+
+class Scheduler:
+    """Run many timers on top of one event loop timer.
+
+    Pending timers are kept in a heap and the loop is only woken up for the earliest one,
+    cancelled timers are dropped lazily and the heap is compacted when they pile up.
+    """
+
+    COMPACT_MIN_SIZE = 256
+    RESOLUTION = time.get_clock_info("monotonic").resolution
+
+    def __init__(self) -> None:
+        self._heap: List[TimerHandle] = []
+        self._cancelled = 0
+        self._seq = itertools.count()
+        self._timer: Union[asyncio.TimerHandle, None] = None
+        self._armed_at = float("inf")
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    @staticmethod
+    def time() -> float:
+        return asyncio.get_event_loop().time()
+
+    def call_at(self, when: float, callback: Callable, *args: Any) -> TimerHandle:
+        if self._cancelled > self.COMPACT_MIN_SIZE and self._cancelled > len(self._heap) // 2:
+            self._heap = [handle for handle in self._heap if not handle.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        handle = TimerHandle(self, when, next(self._seq), callback, args)
+        heapq.heappush(self._heap, handle)
+        if when < self._armed_at:
+            self._arm()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        return self.call_at(self.time() + delay, callback, *args)
+
+    def every(
+        self,
+        interval: float,
+        callback: Callable,
+        *args: Any,
+        jitter: float = 0,
+        missed: str = SKIP,
+        delay: Union[float, None] = None,
+    ) -> Job:
+        """Run a callback every `interval` seconds
+
+        :param jitter: Max seconds added at random to each run, to spread the jobs of the same interval
+        :param missed: Policy of the ticks missed while the loop was busy, see `SKIP`, `CATCH_UP` and `DELAY`
+        :param delay: Seconds before the first run, default to `interval`
+        """
+        return Job(self, callback, args, interval=interval, jitter=jitter, missed=missed).start(delay)
+
+    def cron(self, expr: str, callback: Callable, *args: Any, jitter: float = 0, missed: str = SKIP) -> Job:
+        """Run a callback at the minutes matching a cron expression, see `Cron`
+
+        :raises ValueError: The expression is invalid
+        """
+        return Job(self, callback, args, cron=Cron(expr), jitter=jitter, missed=missed).start()
+
+    def timeout(self, delay: Union[float, None]) -> Timeout:
+        return Timeout(self, delay)
+
+    def _arm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._armed_at = float("inf")
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        if self._heap:
+            self._armed_at = self._heap[0].when
+            self._timer = asyncio.get_event_loop().call_at(self._armed_at, self._run)
+
+    def _run(self) -> None:
+        self._timer = None
+        self._armed_at = float("inf")
+        now = self.time() + self.RESOLUTION
+        heap = self._heap
+        while heap and heap[0].when <= now:
+            handle = heapq.heappop(heap)
+            if handle.cancelled:
+                self._cancelled -= 1
+                continue
+            handle._scheduler = None  # noqa
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                asyncio.get_event_loop().call_exception_handler(
+                    {"message": f"Exception in scheduled callback {handle.callback!r}", "exception": e}
+                )
+        self._arm()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(pending={len(self)})"
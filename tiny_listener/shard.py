@@ -0,0 +1,205 @@
+import asyncio
+import itertools
+import logging
+import os
+import signal
+import threading
+import zlib
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Union
+
+from .context import ContextPool
+from .errors import ListenerClosed, ListenerError
+from .listener import Listener
+
+logger = logging.getLogger(__name__)
+
+
+class Shard:
+    """A listener running in its own thread and event loop, see `ShardDispatcher`"""
+
+    def __init__(self, index: int, factory: Callable[[], Listener], max_ctxs: int = 10000) -> None:
+        self.index = index
+        self.factory = factory
+        self.ctxs = ContextPool(max_ctxs)
+        self.listener: Union[Listener, None] = None
+        self.loop: Union[asyncio.AbstractEventLoop, None] = None
+        self.thread = threading.Thread(target=self._run, name=f"shard-{index}", daemon=True)
+        self.ready = threading.Event()
+        self.lock = threading.Lock()  # the counters are updated by the caller threads and by the worker
+        self.events = 0
+        self.completed = 0
+        self.keys: Counter = Counter()
+
+    @property
+    def inflight(self) -> int:
+        with self.lock:
+            return self.events - self.completed
+
+    def count(self, cid: Union[str, None]) -> None:
+        """Count an event sent to the shard"""
+        with self.lock:
+            self.events += 1
+            if cid is not None:
+                self.keys[cid] += 1
+
+    def _complete(self) -> None:
+        with self.lock:
+            self.completed += 1
+
+    def _run(self) -> None:
+        async def started() -> None:
+            self.loop = asyncio.get_event_loop()
+            self.ready.set()
+
+        try:
+            self.listener = listener = self.factory()
+            listener.add_startup_callback(started)
+            listener.run()
+        finally:
+            self.ready.set()
+            if self.loop is not None:  # let the shutdown task finish, the loop dies with the thread
+                self.loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(self.loop), return_exceptions=True))
+                self.loop.close()
+
+    def trigger(
+        self,
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict, None],
+        future: "Future[Any]",
+    ) -> None:
+        """Trigger an event in the loop of the shard, its outcome is copied to `future`"""
+        listener = self.listener
+        assert listener is not None
+        if not future.set_running_or_notify_cancel():
+            self._complete()
+            return
+        if cid is not None:
+            self.ctxs.acquire(listener, cid)
+        try:
+            task = listener.trigger_event(path, cid, timeout, data)
+        except Exception as e:
+            if cid is not None:
+                self.ctxs.release(listener, cid)
+            self._complete()
+            future.set_exception(e)
+            return
+        task.add_done_callback(lambda t: self._on_done(cid, t, future))
+
+    def _on_done(self, cid: Union[str, None], task: "asyncio.Future[Any]", future: "Future[Any]") -> None:
+        self._complete()
+        if cid is not None:
+            self.ctxs.release(self.listener, cid)  # type: ignore
+        if task.cancelled():  # a running concurrent future can not be cancelled
+            future.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())  # type: ignore
+        else:
+            future.set_result(None)
+
+    def metrics(self, hot_keys: int) -> Dict[str, Any]:
+        with self.lock:
+            keys, self.keys = self.keys, Counter()
+            events, inflight = self.events, self.events - self.completed
+        listener = self.listener
+        return {
+            "events": events,
+            "inflight": inflight,
+            "ctxs": 0 if listener is None else len(listener.ctxs),
+            "hot_keys": keys.most_common(hot_keys),
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(index={self.index}, inflight={self.inflight})"
+
+
+class ShardDispatcher:
+    """Dispatch the events to `workers` listeners, each one running in its own thread and event loop.
+
+        >>> shards = ShardDispatcher(make_app, workers=4)
+        >>> shards.start()
+        >>> await asyncio.wrap_future(shards.trigger_event("/order/42", cid="customer-7"))
+
+    The events of a cid always go to the same worker, by the same hash as the consumers of a `SharedRing`,
+    so the context of a cid (its `Depends` cache and its events, see `Event.wait_event_done`) stays in one place.
+    The dispatcher creates the context of a cid on its worker and keeps it for the next events of the cid,
+    up to `max_ctxs` contexts per worker (see `ContextPool`). The events without a cid are dealt round robin.
+
+    `metrics()` reports the events and the load of each shard, with its hottest cids since the previous call.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Listener],
+        workers: Union[int, None] = None,
+        hot_keys: int = 10,
+        max_ctxs: int = 10000,
+    ) -> None:
+        """
+        :param factory: Create the listener of a worker, it is called in the thread of the worker
+        :param workers: Number of workers, default to the number of CPUs
+        :param hot_keys: Number of cids reported per shard by `metrics()`
+        :param max_ctxs: Contexts kept per worker, the least recently used idle ones are dropped beyond
+        """
+        self.hot_keys = hot_keys
+        self.shards = [Shard(i, factory, max_ctxs) for i in range(workers or os.cpu_count() or 1)]
+        self._next = itertools.cycle(self.shards)
+
+    def start(self, timeout: Union[float, None] = None) -> None:
+        """Start the workers and wait until their listeners run
+
+        :raises ListenerError: A worker failed to start
+        """
+        for shard in self.shards:
+            shard.thread.start()
+        for shard in self.shards:
+            shard.ready.wait(timeout)
+            if shard.loop is None:
+                raise ListenerError(f"Worker {shard.index} failed to start")
+
+    def shard_for(self, cid: str) -> Shard:
+        return self.shards[zlib.crc32(cid.encode()) % len(self.shards)]
+
+    def trigger_event(
+        self,
+        path: str,
+        cid: Union[str, None] = None,
+        timeout: Union[float, None] = None,
+        data: Union[Dict, None] = None,
+    ) -> "Future[Any]":
+        """Trigger an event on the worker of its cid, it may be called from any thread
+
+        :return: Future of the event outcome, see `asyncio.wrap_future` to await it
+        :raises ListenerClosed: The worker is not running
+        """
+        shard = next(self._next) if cid is None else self.shard_for(cid)
+        if shard.loop is None or shard.loop.is_closed():
+            raise ListenerClosed(f"Worker {shard.index} is not running")
+        future: "Future[Any]" = Future()
+        shard.count(cid)
+        shard.loop.call_soon_threadsafe(shard.trigger, path, cid, timeout, data, future)
+        return future
+
+    def stop(self, timeout: Union[float, None] = None) -> None:
+        """Shut the workers down gracefully and wait for their threads"""
+        for shard in self.shards:
+            if shard.listener is not None and shard.loop is not None and shard.thread.is_alive():
+                shutdown = shard.listener.graceful_shutdown(signal.SIGTERM)
+                shard.loop.call_soon_threadsafe(asyncio.ensure_future, shutdown)
+        for shard in self.shards:
+            shard.thread.join(timeout)
+            if shard.thread.is_alive():
+                logger.warning("Worker %d did not stop in time", shard.index)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Load of each shard, its `hot_keys` busiest cids are counted since the previous call"""
+        shards: List[Dict[str, Any]] = [shard.metrics(self.hot_keys) for shard in self.shards]
+        events = [shard["events"] for shard in shards]
+        mean = sum(events) / len(events)
+        return {"shards": shards, "skew": max(events) / mean if mean else 0.0}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(workers={len(self.shards)})"
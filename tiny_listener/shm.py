@@ -0,0 +1,289 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import struct
+import sys
+import zlib
+from functools import partial
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Set, Tuple, Union
+
+from .context import Context
+from .errors import ListenerError, RingFull
+from .listener import Listener
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TLSHM"
+VERSION = 1
+HEADER = struct.Struct("<5sBHQ")
+"""Magic, version, number of consumers, capacity of the data area"""
+POSITION = struct.Struct("<Q")
+RECORD = struct.Struct("<IHHi")
+"""Size of the record, consumer, length of the path, length of the cid (-1 means None).
+A size of 0, or no room left for a header, means the next record is at the start of the ring."""
+ALIGN = 8
+SLOT = 64  # positions are written by different processes, one cache line each
+
+Item = Tuple[str, Union[str, None], bytes]
+
+_created: Set[str] = set()
+
+
+class SharedRing:
+    """Single producer, multi consumer ring buffer in shared memory, see `SharedMemoryListener`.
+
+        >>> ring = SharedRing.create(size=1 << 24, consumers=4)
+        >>> ring.put("order/42", b'{"qty": 1}', cid="customer-7")
+
+    Each record is written once and read in place by its consumer, no pickling, no pipe and no syscall per record.
+    The records of a cid always go to the same consumer (so they stay in order), the others are dealt round robin.
+    Positions are monotonic counters: the producer publishes its position after writing a record,
+    each consumer publishes its own after reading, and the space is free once every consumer is past it.
+    A consumer which does not read blocks the producer, its records are waiting for it.
+
+    Python has no memory barrier: the ring relies on the positions being aligned 8 bytes words, written at once,
+    and on the stores of a process being seen in order by the others, as on x86-64 (total store order).
+    On a weakly ordered CPU (e.g. ARM) a consumer could see a position before the record it publishes.
+    `python -m benchmarks -s ingress` compares the ring with a pipe, within a process and between two processes.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        magic, version, consumers, capacity = HEADER.unpack_from(shm.buf)
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"{shm.name} is not a ring buffer of version {VERSION}")
+        self.shm = shm
+        self.owner = owner
+        self.consumers = consumers
+        self.capacity = capacity
+        self._buf = shm.buf
+        self._data = _data_offset(consumers)
+        self._next = itertools.cycle(range(consumers))
+        self._limit = 0
+
+    @classmethod
+    def create(cls, size: int = 1 << 24, consumers: int = 1, name: Union[str, None] = None) -> "SharedRing":
+        """
+        :param size: Bytes of the data area, a record can not be longer than half of it
+        :param consumers: Number of consumers, each one reads the records dealt to it
+        :param name: Name of the shared memory block, default to a random one
+        """
+        if not 1 <= consumers < 0xFFFF:
+            raise ValueError("The consumers of a ring must be in [1, 65535)")
+        capacity = size - size % ALIGN
+        shm = shared_memory.SharedMemory(name, create=True, size=_data_offset(consumers) + capacity)
+        _created.add(shm.name)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, consumers, capacity)
+        for offset in range(SLOT, _data_offset(consumers), SLOT):
+            POSITION.pack_into(shm.buf, offset, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRing":
+        """Open the ring created by another process"""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name)
+            # the block belongs to its creator, the resource tracker of an unrelated process
+            # would unlink it when that process exits (a child process shares the tracker of its parent)
+            if shm.name not in _created and multiprocessing.parent_process() is None:
+                resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _read(self, offset: int) -> int:
+        return POSITION.unpack_from(self._buf, offset)[0]
+
+    def _tail(self, consumer: int) -> int:
+        return self._read(2 * SLOT + consumer * SLOT)
+
+    @property
+    def used(self) -> int:
+        """Bytes not read yet by the slowest consumer"""
+        return self._read(SLOT) - min(map(self._tail, range(self.consumers)))
+
+    def put(self, path: str, data: bytes = b"", cid: Union[str, None] = None) -> bool:
+        """Write a record, only one process may write to a ring
+
+        :return: False if the ring is full
+        :raises RingFull: The record can never fit
+        """
+        path_bytes = path.encode()
+        cid_bytes = b"" if cid is None else cid.encode()
+        size = RECORD.size + len(path_bytes) + len(cid_bytes) + len(data)
+        padded = -(-size // ALIGN) * ALIGN
+        if padded > self.capacity // 2:
+            raise RingFull(f"Record of {size} bytes exceeds half of the ring ({self.capacity} bytes)")
+
+        head, capacity, buf = self._read(SLOT), self.capacity, self._buf
+        index = head % capacity
+        skip = capacity - index if index + padded > capacity else 0
+        if head + skip + padded > self._limit:  # the tails only grow, they are read again only when the ring looks full
+            self._limit = min(map(self._tail, range(self.consumers))) + capacity
+            if head + skip + padded > self._limit:
+                return False
+        if skip:
+            if skip >= RECORD.size:
+                RECORD.pack_into(buf, self._data + index, 0, 0, 0, 0)
+            head += skip
+            index = 0
+
+        consumer = zlib.crc32(cid_bytes) % self.consumers if cid is not None else next(self._next)
+        header = RECORD.pack(size, consumer, len(path_bytes), -1 if cid is None else len(cid_bytes))
+        start = self._data + index
+        buf[start : start + size] = b"".join((header, path_bytes, cid_bytes, data))
+        POSITION.pack_into(buf, SLOT, head + padded)  # publish the record once it is complete, see the class docstring
+        return True
+
+    def get(self, consumer: int, limit: int = 256) -> List[Item]:
+        """Read up to `limit` records dealt to `consumer`, only one process may read as a given consumer"""
+        buf, data, capacity, unpack = self._buf, self._data, self.capacity, RECORD.unpack_from
+        offset = 2 * SLOT + consumer * SLOT
+        tail, head = self._read(offset), self._read(SLOT)
+        items: List[Item] = []
+        while tail < head and len(items) < limit:
+            index = tail % capacity
+            start = data + index
+            if capacity - index < RECORD.size:
+                tail += capacity - index
+                continue
+            size, target, path_len, cid_len = unpack(buf, start)
+            if not size:
+                tail += capacity - index
+                continue
+            tail += -(-size // ALIGN) * ALIGN
+            if target != consumer:
+                continue
+            # copied once out of the ring, slicing the small bytes again is cheaper than decoding memoryview slices
+            record = buf[start + RECORD.size : start + size].tobytes()
+            path = record[:path_len].decode()
+            if cid_len < 0:
+                items.append((path, None, record[path_len:]))
+            else:
+                end = path_len + cid_len
+                items.append((path, record[path_len:end].decode(), record[end:]))
+        POSITION.pack_into(buf, offset, tail)
+        return items
+
+    def close(self) -> None:
+        """Detach from the ring, it is removed when its creator closes it"""
+        self._buf = None  # type: ignore
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            _created.discard(self.shm.name)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, consumers={self.consumers}, capacity={self.capacity})"
+
+
+def _data_offset(consumers: int) -> int:
+    return 2 * SLOT + consumers * SLOT
+
+
+class SharedMemoryListener(Listener):
+    """Consume the records of a `SharedRing` written by another process, each record triggers the event of its path.
+
+        >>> app = SharedMemoryListener(ring_name, consumer=0)
+        >>> @app.on_event("order/{order_id}")
+        ... async def order(order_id: Param, data: Data):
+        ...     ...
+
+    The record bytes are the event data `data`. The events of a cid share one context while some of them run.
+    The ring is drained `batch_size` records at a time, and polled every `interval` seconds when it is empty.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        consumer: int = 0,
+        batch_size: int = 256,
+        interval: float = 0.001,
+        high_water: int = 1000,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param name: Name of the ring, see `SharedRing.name`
+        :param consumer: Index of this consumer in the ring
+        :param batch_size: Max records read at once
+        :param interval: Seconds between two polls of an empty ring
+        :param high_water: In-flight events pausing the reading
+        :param kwargs: See `Listener`
+        """
+        super().__init__(**kwargs)
+        self.name = name
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.high_water = high_water
+        self.ring: Union[SharedRing, None] = None
+        self.received = 0
+        self.dropped = 0
+        self._running: Dict[str, int] = {}
+        self._reader: "Union[asyncio.Future[None], None]" = None
+
+    async def listen(self) -> None:
+        self.ring = SharedRing.attach(self.name)
+        if not 0 <= self.consumer < self.ring.consumers:
+            ring, self.ring = self.ring, None
+            ring.close()
+            raise ValueError(f"{ring} has no consumer {self.consumer}")
+        self._reader = asyncio.ensure_future(self._drain())
+        self.add_shutdown_callback(self._close)
+
+    async def _drain(self) -> None:
+        while True:
+            await asyncio.sleep(0 if self.poll() else self.interval)
+
+    def poll(self) -> bool:
+        """Trigger a batch of records
+
+        :return: True if the ring may have more records
+        """
+        assert self.ring is not None
+        if len(self.inflight) >= self.high_water:
+            return False
+        items = self.ring.get(self.consumer, self.batch_size)
+        self.received += len(items)
+        for path, cid, data in items:
+            self.on_record(path, cid, data)
+        return len(items) == self.batch_size
+
+    def on_record(self, path: str, cid: Union[str, None], data: bytes) -> None:
+        """Trigger the event of a record, override it to decode the data"""
+        created = cid not in self.ctxs
+        ctx = self.new_ctx(cid) if created else self.ctxs[cid]  # type: ignore
+        try:
+            future = ctx.trigger_event(path, data={"data": data})
+        except ListenerError as e:
+            if created:
+                ctx.drop()
+            self.dropped += 1
+            logger.debug("Record %r dropped: %r", path, e)
+        else:
+            self._running[ctx.cid] = self._running.get(ctx.cid, 0) + 1
+            future.add_done_callback(partial(self._on_done, ctx))
+
+    def _on_done(self, ctx: Context, _: Any) -> None:
+        running = self._running[ctx.cid] - 1
+        if running:
+            self._running[ctx.cid] = running
+        else:
+            del self._running[ctx.cid]
+            ctx.drop()
+
+    async def _close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, consumer={self.consumer})"
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Tuple, Union
+
+from .codec import Default, decode_event, encode_event
+
+if TYPE_CHECKING:
+    from .listener import Listener  # noqa # pylint: disable=unused-import
+
+logger = logging.getLogger(__name__)
+
+RECORD = struct.Struct("<Id")
+"""Length of the event frame, timeout of the event (NaN means None)"""
+
+Spilled = Tuple[str, Union[str, None], Union[float, None], Union[Dict[str, Any], None]]
+
+
+class Segment:
+    """Memory-mapped file of spilled events, written and read in order.
+
+    The file is unlinked as soon as it is mapped, the kernel writes its pages back to the disk under memory pressure
+    and frees them when the segment is closed, nothing is left behind by a crash.
+    """
+
+    __slots__ = ("size", "mapped", "write_pos", "read_pos")
+
+    def __init__(self, directory: str, size: int) -> None:
+        fd, path = tempfile.mkstemp(suffix=".spill", dir=directory)
+        try:
+            os.ftruncate(fd, size)
+            self.mapped = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+            os.remove(path)
+        self.size = size
+        self.write_pos = 0
+        self.read_pos = 0
+
+    def write(self, timeout: Union[float, None], frame: bytes) -> bool:
+        """
+        :return: False if the segment is full
+        """
+        end = self.write_pos + RECORD.size + len(frame)
+        if end > self.size:
+            return False
+        RECORD.pack_into(self.mapped, self.write_pos, len(frame), math.nan if timeout is None else timeout)
+        self.mapped[self.write_pos + RECORD.size : end] = frame
+        self.write_pos = end
+        return True
+
+    def read(self) -> Spilled:
+        size, timeout = RECORD.unpack_from(self.mapped, self.read_pos)
+        start = self.read_pos + RECORD.size
+        self.read_pos = start + size
+        with memoryview(self.mapped) as view:
+            frame = decode_event(view[start : self.read_pos], copy=True)
+        return frame.path, frame.cid, None if math.isnan(timeout) else timeout, frame.data
+
+    def close(self) -> None:
+        self.mapped.close()
+
+
+class SpillQueue:
+    """Overflow tier of a listener, events are spilled to disk instead of being kept in memory or rejected.
+
+        >>> app = App(spill=SpillQueue(high_water=10000))
+
+    While `high_water` events or more are in flight, `Listener.trigger_event` encodes the new events
+    (see `tiny_listener.codec`) into memory-mapped segment files, and returns a future of the event outcome.
+    Once the in-flight events drop to `low_water`, the spilled events are dispatched again in order.
+    An event whose cid still has spilled events is spilled too, so the events of a cid keep their order.
+
+    Spilling is not durable, the events spilled at shutdown are cancelled, see `WriteAheadLog` to replay them.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, None] = None,
+        high_water: int = 1000,
+        low_water: Union[int, None] = None,
+        segment_size: int = 16 << 20,
+        interval: float = 0.01,
+        default: Union[Default, None] = None,
+    ) -> None:
+        """
+        :param directory: Directory of the segment files, default to the temporary directory
+        :param high_water: In-flight events from which new events are spilled
+        :param low_water: In-flight events from which spilled events are dispatched again, default to half of `high_water`
+        :param segment_size: Bytes of a segment file, a larger event gets a segment of its own
+        :param interval: Seconds between two checks of the in-flight events while some events are spilled
+        :param default: Convert the event data which can not be encoded, see `tiny_listener.codec.dumps`
+        """
+        self.directory = directory or tempfile.gettempdir()
+        self.high_water = high_water
+        self.low_water = high_water // 2 if low_water is None else low_water
+        self.segment_size = segment_size
+        self.interval = interval
+        self.default = default
+        self.spilled = 0
+        self._segments: Deque[Segment] = deque()
+        self._futures: "Deque[asyncio.Future[Any]]" = deque()
+        self._cids: Dict[str, int] = {}
+        self.feeder: "Union[asyncio.Future[None], None]" = None
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def holds(self, listener: "Listener", cid: Union[str, None]) -> bool:
+        """The event must be spilled"""
+        return len(listener.inflight) >= self.high_water or (cid is not None and cid in self._cids)
+
+    def put(
+        self,
+        listener: "Listener",
+        path: str,
+        cid: Union[str, None],
+        timeout: Union[float, None],
+        data: Union[Dict[str, Any], None],
+    ) -> "asyncio.Future[Any]":
+        """Spill an event
+
+        :raises TypeError: The data can not be encoded
+        """
+        frame = encode_event(path, cid, data, default=self.default)
+        if not self._segments or not self._segments[-1].write(timeout, frame):
+            segment = Segment(self.directory, max(self.segment_size, RECORD.size + len(frame)))
+            segment.write(timeout, frame)
+            self._segments.append(segment)
+        if cid is not None:
+            self._cids[cid] = self._cids.get(cid, 0) + 1
+        self.spilled += 1
+        future = asyncio.get_event_loop().create_future()
+        self._futures.append(future)
+        if self.feeder is None:
+            logger.warning("%d events in flight, spilling to %s", len(listener.inflight), self.directory)
+            self.feeder = asyncio.ensure_future(self._feed(listener))
+        return future
+
+    def pop(self) -> "Tuple[Spilled, asyncio.Future[Any]]":
+        """The oldest spilled event
+
+        :raises IndexError: No event is spilled
+        """
+        segment = self._segments[0]
+        spilled = segment.read()
+        if segment.read_pos == segment.write_pos:
+            if len(self._segments) > 1:
+                segment.close()
+                self._segments.popleft()
+            else:
+                segment.read_pos = segment.write_pos = 0
+        cid = spilled[1]
+        if cid is not None:
+            count = self._cids.pop(cid) - 1
+            if count:
+                self._cids[cid] = count
+        return spilled, self._futures.popleft()
+
+    async def _feed(self, listener: "Listener") -> None:
+        try:
+            while self._futures:
+                if len(listener.inflight) > self.low_water:
+                    await asyncio.sleep(self.interval)
+                    continue
+                while self._futures and len(listener.inflight) < self.high_water:
+                    (path, cid, timeout, data), future = self.pop()
+                    if not future.done():
+                        listener.dispatch_spilled(path, cid, timeout, data, future)
+                await asyncio.sleep(0)
+            logger.info("Spilled events dispatched")
+        finally:
+            self.feeder = None
+
+    def close(self) -> None:
+        """Cancel the spilled events"""
+        if self.feeder is not None:
+            self.feeder.cancel()
+            self.feeder = None
+        if self._futures:
+            logger.warning("%d spilled event(s) cancelled", len(self._futures))
+        for future in self._futures:
+            future.cancel()
+        self._futures.clear()
+        self._cids.clear()
+        while self._segments:
+            self._segments.popleft().close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(directory={self.directory}, spilled={len(self)})"
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
+
+from .context import Context
+from .errors import ListenerError
+from .listener import Listener
+
+logger = logging.getLogger(__name__)
+
+PathMapper = Callable[[str, str], Union[str, None]]
+"""Map a record and its filename to the path of an event, None to skip the record"""
+
+
+class TailedFile:
+    """Position of a followed file, the file stays open so the end of a rotated file is still read"""
+
+    __slots__ = ("path", "fd", "inode", "offset")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fd: Union[int, None] = None
+        self.inode: Union[int, None] = None
+        self.offset = 0
+
+    def open(self, offset: Union[int, None] = None) -> bool:
+        """Open the file at `offset`, None means at its end
+
+        :return: False if the file does not exist
+        """
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        self.close()
+        stat = os.fstat(fd)
+        self.fd, self.inode = fd, stat.st_ino
+        self.offset = stat.st_size if offset is None else min(offset, stat.st_size)
+        return True
+
+    def rotated(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != self.inode
+        except FileNotFoundError:
+            return False
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path}, offset={self.offset})"
+
+
+class FileTailListener(Listener):
+    """Follow files like `tail -F`, each record (a line by default) triggers an event.
+
+        >>> app = FileTailListener(["/var/log/app.log"], to_path=lambda record, filename: record.split(" ", 1)[0])
+        >>> @app.on_event("ERROR")
+        ... async def error(record: Data):
+        ...     ...
+
+    The event data are `record` and `filename`. Files are polled every `interval` seconds and read through `mmap`
+    (or `os.pread` chunks), records are decoded from the mapped memory without copying them first.
+    A rotated file is read to its end before the new one is opened, a truncated file is read from its start.
+    The offsets are saved to `checkpoint` so a restart resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        files: Iterable[str],
+        to_path: Union[PathMapper, None] = None,
+        separator: bytes = b"\n",
+        interval: float = 0.5,
+        chunk_size: int = 1 << 20,
+        use_mmap: bool = True,
+        checkpoint: Union[str, None] = None,
+        checkpoint_interval: float = 5,
+        from_end: bool = False,
+        high_water: int = 1000,
+        encoding: str = "utf8",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param files: Paths of the files to follow
+        :param to_path: Map a record to an event path, default to the record itself
+        :param separator: End of a record
+        :param interval: Seconds between two polls of the files
+        :param chunk_size: Max bytes read from a file at once, a longer record is split
+        :param use_mmap: Read with `mmap` instead of `os.pread`
+        :param checkpoint: JSON file of the offsets, None means no checkpoint
+        :param checkpoint_interval: Seconds between two checkpoints
+        :param from_end: Start at the end of the files which are not in the checkpoint
+        :param high_water: In-flight events pausing the reading
+        :param encoding: Encoding of the records
+        :param kwargs: See `Listener`
+        """
+        super().__init__(**kwargs)
+        self.files = {path: TailedFile(path) for path in files}
+        self.to_path = to_path
+        self.separator = separator
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.from_end = from_end
+        self.high_water = high_water
+        self.encoding = encoding
+        self.records = 0
+        self.dropped = 0
+        self._follower: "Union[asyncio.Future[None], None]" = None
+
+    async def listen(self) -> None:
+        offsets = self.load_checkpoint()
+        for path, tailed in self.files.items():
+            if tailed.open(None if self.from_end else 0) and path in offsets:
+                # another file or a truncated one is read from its start
+                inode, offset = offsets[path]
+                same = inode == tailed.inode and offset <= os.fstat(tailed.fd).st_size  # type: ignore
+                tailed.offset = offset if same else 0
+        self._follower = asyncio.ensure_future(self._follow())
+        self.add_shutdown_callback(self._close)
+
+    async def graceful_shutdown(self, sig: int) -> None:
+        # the records read during the drain would be rejected, their offsets saved: stop reading first
+        if self._follower is not None:
+            self._follower.cancel()
+        await super().graceful_shutdown(sig)
+
+    async def _follow(self) -> None:
+        loop = asyncio.get_event_loop()
+        saved = loop.time()
+        while True:
+            more = self.poll()
+            if self.checkpoint is not None and loop.time() - saved >= self.checkpoint_interval:
+                self.save_checkpoint()
+                saved = loop.time()
+            await asyncio.sleep(0 if more else self.interval)
+
+    def poll(self) -> bool:
+        """Read the new records of every file
+
+        :return: True if some files have more data to read
+        """
+        more = False
+        for tailed in self.files.values():
+            if len(self.inflight) >= self.high_water:
+                return True
+            if tailed.fd is None:
+                if not tailed.open(0):
+                    continue
+            size = os.fstat(tailed.fd).st_size  # type: ignore
+            if size < tailed.offset:
+                logger.info("%s truncated, reading from its start", tailed.path)
+                tailed.offset = 0
+            rotated = tailed.rotated()
+            if size > tailed.offset and self._read(tailed, size, final=rotated):
+                more = True
+            elif rotated:
+                logger.info("%s rotated, opening the new file", tailed.path)
+                tailed.open(0)
+                more = True
+        return more
+
+    def _read(self, tailed: TailedFile, size: int, final: bool = False) -> bool:
+        """
+        :param final: The file is not written anymore, its last record has no separator
+        :return: True if the file has more data to read
+        """
+        assert tailed.fd is not None
+        end = min(size, tailed.offset + self.chunk_size)
+        full = end - tailed.offset == self.chunk_size
+        final = final and end == size
+        if self.use_mmap:
+            start = tailed.offset - tailed.offset % mmap.ALLOCATIONGRANULARITY
+            with mmap.mmap(tailed.fd, end - start, offset=start, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    consumed = self._split(tailed.path, mapped, view, tailed.offset - start, full, final)
+        else:
+            data = os.pread(tailed.fd, end - tailed.offset, tailed.offset)
+            with memoryview(data) as view:
+                consumed = self._split(tailed.path, data, view, 0, full, final)
+        tailed.offset += consumed
+        return end < size
+
+    def _split(self, filename: str, buffer: Any, view: memoryview, pos: int, full: bool, final: bool) -> int:
+        """Trigger the complete records of `buffer[pos:]`, the rest is a record too
+        at the `final` end of a file or if no record ends in a `full` buffer
+
+        :return: Number of bytes consumed
+        """
+        separator, encoding, begin = self.separator, self.encoding, pos
+        while True:
+            end = buffer.find(separator, pos)
+            if end < 0:
+                if pos < len(view) and (final or full and pos == begin):
+                    self._emit(filename, str(view[pos:], encoding, "replace"))
+                    return len(view) - begin
+                return pos - begin
+            if end > pos:
+                self._emit(filename, str(view[pos:end], encoding, "replace"))
+            pos = end + len(separator)
+
+    def _emit(self, filename: str, record: str) -> None:
+        path = record if self.to_path is None else self.to_path(record, filename)
+        if path is None:
+            return
+        self.records += 1
+        ctx = self.new_ctx()
+        try:
+            future = ctx.trigger_event(path, data={"record": record, "filename": filename})
+        except ListenerError as e:
+            ctx.drop()
+            self.dropped += 1
+            logger.debug("Record %r of %s dropped: %r", record, filename, e)
+        else:
+            future.add_done_callback(partial(self._on_done, ctx))
+
+    @staticmethod
+    def _on_done(ctx: Context, _: Any) -> None:
+        ctx.drop()
+
+    def load_checkpoint(self) -> Dict[str, Tuple[int, int]]:
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return {}
+        with open(self.checkpoint, encoding="utf8") as f:
+            return {path: (item["inode"], item["offset"]) for path, item in json.load(f).items()}
+
+    def save_checkpoint(self) -> None:
+        """Write the offsets atomically"""
+        if self.checkpoint is None:
+            return
+        offsets = {
+            path: {"inode": tailed.inode, "offset": tailed.offset}
+            for path, tailed in self.files.items()
+            if tailed.inode is not None
+        }
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w", encoding="utf8") as f:
+            json.dump(offsets, f)
+        os.replace(tmp, self.checkpoint)
+
+    async def _close(self) -> None:
+        if self._follower is not None:
+            self._follower.cancel()
+        self.save_checkpoint()
+        for tailed in self.files.values():
+            tailed.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(files={list(self.files)})"
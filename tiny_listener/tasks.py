@@ -0,0 +1,97 @@
+import asyncio
+import collections.abc
+import contextvars
+import sys
+from typing import Any, Coroutine, Generator, Union
+
+
+def chain_future(source: "asyncio.Future[Any]", destination: "asyncio.Future[Any]") -> None:
+    """Copy the outcome of `source` to `destination` once done"""
+
+    def _copy(fut: "asyncio.Future[Any]") -> None:
+        if destination.done():
+            return
+        if fut.cancelled():
+            destination.cancel()
+        elif fut.exception() is not None:
+            destination.set_exception(fut.exception())  # type: ignore
+        else:
+            destination.set_result(fut.result())
+
+    source.add_done_callback(_copy)
+
+
+_FINISHED = object()
+
+
+class _Resume(collections.abc.Coroutine):
+    """Coroutine of the task of an eagerly started coroutine, the task takes it over where the inline step stopped."""
+
+    __slots__ = ("coro", "context", "yielded", "started")
+
+    def __init__(self, coro: Coroutine, context: contextvars.Context) -> None:
+        self.coro = coro
+        self.context = context
+        self.yielded: Any = _FINISHED
+        self.started = False
+
+    def send(self, value: Any) -> Any:
+        if not self.started:  # the first step already ran inline, hand over what it yielded
+            self.started = True
+            if self.yielded is _FINISHED:
+                raise StopIteration()
+            return self.yielded
+        return self.context.run(self.coro.send, value)
+
+    def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
+        self.started = True
+        if val is None and tb is None:
+            return self.context.run(self.coro.throw, typ)
+        return self.context.run(self.coro.throw, typ, val, tb)  # pragma: no cover
+
+    def close(self) -> None:
+        self.coro.close()
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        return self  # type: ignore
+
+
+def create_eager_task(coro: Coroutine, loop: Union[asyncio.AbstractEventLoop, None] = None) -> "asyncio.Future[Any]":
+    """Run the coroutine inline until it suspends for the first time.
+
+    A coroutine finishing without suspending is not awaited by the loop, the returned future is already done.
+    Otherwise, the rest of it runs in a task, the eager task factory is used where available (Python 3.12+).
+    Before 3.12 the task is created first and is the current task during the inline step,
+    so `asyncio.current_task()`, `asyncio.timeout` and the like see the task of the coroutine, not the caller.
+    """
+    loop = loop or asyncio.get_event_loop()
+    if not loop.is_running():
+        return loop.create_task(coro)
+    if sys.version_info >= (3, 12):  # pragma: no cover
+        return asyncio.Task(coro, loop=loop, eager_start=True)  # type: ignore
+
+    resume = _Resume(coro, contextvars.copy_context())
+    task = loop.create_task(resume)  # type: ignore
+    caller = asyncio.current_task(loop)
+    if caller is not None:
+        asyncio.tasks._leave_task(loop, caller)  # type: ignore
+    asyncio.tasks._enter_task(loop, task)  # type: ignore
+    try:
+        resume.yielded = resume.context.run(coro.send, None)
+    except StopIteration as stop:
+        future = loop.create_future()
+        future.set_result(stop.value)
+        return future
+    except asyncio.CancelledError:
+        future = loop.create_future()
+        future.cancel()
+        return future
+    except Exception as e:
+        future = loop.create_future()
+        future.set_exception(e)
+        return future
+    finally:
+        asyncio.tasks._leave_task(loop, task)  # type: ignore
+        if caller is not None:
+            asyncio.tasks._enter_task(loop, caller)  # type: ignore
+    return task
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+from typing import Any, List, Set, Union
+
+from .context import Context
+from .errors import ListenerError
+from .listener import Listener
+
+logger = logging.getLogger(__name__)
+
+
+class Connection(asyncio.BufferedProtocol):
+    """A client of a `TCPListener`, each line it sends is triggered as an event.
+
+    Data is received into a reusable buffer and split in bulk, the connection keeps one context for all its events,
+    so `Depends` results are cached for the lifetime of the connection.
+    """
+
+    def __init__(self, listener: "TCPListener") -> None:
+        self.listener = listener
+        self.transport: Union[asyncio.Transport, None] = None
+        self.ctx: Union[Context, None] = None
+        self._buffer = bytearray(listener.buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._out: List[bytes] = []
+        self._drained: Union["asyncio.Future[None]", None] = None
+
+    @property
+    def peername(self) -> Any:
+        return self.transport.get_extra_info("peername") if self.transport is not None else None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+        self.ctx = self.listener.new_ctx(scope={"connection": self})
+        self.listener.connections.add(self)
+        if self.listener.paused:
+            transport.pause_reading()
+
+    def connection_lost(self, exc: Union[Exception, None]) -> None:
+        self.listener.connections.discard(self)
+        if self.ctx is not None:
+            self.ctx.drop()
+        if self._drained is not None and not self._drained.done():
+            self._drained.set_result(None)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        capacity = len(self._buffer)
+        if capacity - self._end < capacity // 4:
+            size = self._end - self._start
+            if size >= self.listener.max_line_size:
+                logger.warning("Line of %s exceeds %d bytes, closing", self.peername, self.listener.max_line_size)
+                assert self.transport is not None
+                self.transport.close()
+                size = 0
+            elif self._start:
+                self._buffer[:size] = self._buffer[self._start : self._end]
+            if capacity - size < capacity // 4:
+                self._view.release()
+                self._buffer.extend(bytes(capacity))
+                self._view = memoryview(self._buffer)
+            self._start, self._end = 0, size
+        return self._view[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        end = self._end + nbytes
+        last = self._buffer.rfind(b"\n", self._end, end)
+        self._end = end
+        if last < 0:
+            return
+
+        lines = self._buffer[self._start : last].split(b"\n")
+        if last + 1 == end:
+            self._start = self._end = 0
+        else:
+            self._start = last + 1
+
+        self._prune()
+        encoding = self.listener.encoding
+        for line in lines:
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if line:
+                self.listener.on_line(self, line.decode(encoding, "replace"))
+        self.listener.check_load()
+
+    def eof_received(self) -> bool:
+        if self._end > self._start:
+            line = self._buffer[self._start : self._end].rstrip(b"\r")
+            self._start = self._end = 0
+            if line:
+                self.listener.on_line(self, line.decode(self.listener.encoding, "replace"))
+        asyncio.ensure_future(self._close_when_done())
+        return True
+
+    async def _close_when_done(self) -> None:
+        """Keep the connection half open until the replies to its last events are sent"""
+        pending = [task for task, event in self.listener.inflight.items() if event.ctx is self.ctx]
+        if pending:
+            await asyncio.wait(pending)
+        self.close()
+
+    def write(self, data: bytes) -> None:
+        """Queue a reply, the replies queued during a loop iteration are sent at once"""
+        if self.transport is None or self.transport.is_closing():
+            return
+        self._out.append(data)
+        if len(self._out) == 1:
+            asyncio.get_event_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        out, self._out = self._out, []
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(b"".join(out))
+
+    def pause_writing(self) -> None:
+        self._drained = asyncio.get_event_loop().create_future()
+
+    def resume_writing(self) -> None:
+        if self._drained is not None and not self._drained.done():
+            self._drained.set_result(None)
+        self._drained = None
+
+    async def drain(self) -> None:
+        """Wait until the client reads the replies, when its transport buffer is full"""
+        if self._drained is not None:
+            await asyncio.shield(self._drained)
+
+    def close(self) -> None:
+        if self._out:
+            self._flush()
+        if self.transport is not None:
+            self.transport.close()
+
+    def _prune(self) -> None:
+        """Forget the finished events, the context of a connection would grow forever otherwise"""
+        assert self.ctx is not None
+        for events in self.ctx.events.values():
+            if events and events[0].is_done:
+                events[:] = [event for event in events if not event.is_done]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(peername={self.peername})"
+
+
+class TCPListener(Listener):
+    """Listen to a line based TCP protocol, each line is the path of an event.
+
+    The `Connection` is given to the handlers as the event data `connection`:
+
+        >>> app = TCPListener("127.0.0.1", 12345)
+        >>> @app.on_event("ping")
+        ... async def ping(connection: Data):
+        ...     connection.write(b"pong\\n")
+
+    The clients stop being read while `high_water` events or more are in flight, until it drops to `low_water`.
+    """
+
+    def __init__(
+        self,
+        host: Union[str, None],
+        port: int,
+        buffer_size: int = 1 << 16,
+        max_line_size: int = 1 << 20,
+        high_water: int = 1000,
+        low_water: Union[int, None] = None,
+        encoding: str = "utf8",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param host: Interface to bind, None means all
+        :param port: Port to bind, 0 means a random one
+        :param buffer_size: Initial size of the receive buffer of a connection
+        :param max_line_size: Connections sending a longer line are closed
+        :param high_water: In-flight events pausing the reading of the connections
+        :param low_water: In-flight events resuming the reading of the connections, default to half of `high_water`
+        :param encoding: Encoding of the lines
+        :param kwargs: See `Listener`
+        """
+        super().__init__(**kwargs)
+        self.host = host
+        self.port = port
+        self.buffer_size = buffer_size
+        self.max_line_size = max_line_size
+        self.high_water = high_water
+        self.low_water = high_water // 2 if low_water is None else low_water
+        self.encoding = encoding
+        self.connections: Set[Connection] = set()
+        self.paused = False
+        self._watched = 0
+        self.server: Union[asyncio.AbstractServer, None] = None
+
+    async def listen(self) -> None:
+        loop = asyncio.get_event_loop()
+        self.server = await loop.create_server(lambda: Connection(self), self.host, self.port)
+        self.add_shutdown_callback(self._close)
+
+    def on_line(self, connection: Connection, line: str) -> None:
+        """Trigger the event of a line, override it to parse another protocol"""
+        assert connection.ctx is not None
+        try:
+            connection.ctx.trigger_event(line, data={"connection": connection})
+        except ListenerError as e:
+            self.on_error_line(connection, line, e)
+
+    def on_error_line(self, connection: Connection, line: str, error: ListenerError) -> None:
+        """Called when a line can not be triggered, e.g. `EventNotFound`, override it to reply to the client"""
+        logger.debug("Line %r of %s dropped: %r", line, connection.peername, error)
+
+    def check_load(self) -> None:
+        if self.paused or len(self.inflight) < self.high_water:
+            return
+        self.paused = True
+        for connection in self.connections:
+            if connection.transport is not None:
+                connection.transport.pause_reading()
+        self._watch()
+
+    def _watch(self) -> None:
+        self._watched = len(self.inflight)
+        for task in list(self.inflight):
+            task.add_done_callback(self._maybe_resume)
+
+    def _maybe_resume(self, _: Any) -> None:
+        self._watched -= 1
+        if not self.paused:
+            return
+        if len(self.inflight) > self.low_water:
+            if not self._watched:
+                self._watch()  # events triggered while paused are still running
+            return
+        self.paused = False
+        for connection in self.connections:
+            if connection.transport is not None and not connection.transport.is_closing():
+                connection.transport.resume_reading()
+
+    async def _close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+        for connection in list(self.connections):
+            connection.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(host={self.host}, port={self.port}, connections={len(self.connections)})"
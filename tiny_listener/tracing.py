@@ -0,0 +1,141 @@
+import json
+import random
+import time
+from contextvars import ContextVar
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Tuple, Union
+
+if TYPE_CHECKING:
+    from .event import Event  # noqa # pylint: disable=unused-import
+
+current_span: ContextVar[Union["Span", None]] = ContextVar("tiny_listener_current_span", default=None)
+"""Span of the event being handled, parent of the events it triggers"""
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "path",
+        "cid",
+        "start",
+        "duration",
+        "error",
+        "phases",
+        "_t0",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        cid: str,
+        parent: Union["Span", None] = None,
+        started: Union[float, None] = None,
+    ) -> None:
+        """
+        :param name: Route name
+        :param path: Event path
+        :param cid: Context ID
+        :param parent: Span of the event which triggered this one
+        :param started: `time.perf_counter()` when the event was triggered
+        """
+        self.trace_id: str = parent.trace_id if parent else _new_id(128)
+        self.span_id: str = _new_id(64)
+        self.parent_id: Union[str, None] = parent.span_id if parent else None
+        self.name = name
+        self.path = path
+        self.cid = cid
+        self.start = time.time()
+        self.duration: Union[float, None] = None
+        self.error: Union[str, None] = None
+        self.phases: List[Tuple[str, float, float]] = []
+        self._t0 = time.perf_counter() if started is None else started
+
+    def mark(self, name: str, since: float) -> float:
+        """Record a phase of the event, such as a middleware, a dependency or the handler.
+
+        :param since: `time.perf_counter()` when the phase began
+        :return: `time.perf_counter()` when the phase ended
+        """
+        now = time.perf_counter()
+        self.phases.append((name, since - self._t0, now - since))
+        return now
+
+    def finish(self, error: Union[BaseException, None] = None) -> None:
+        self.duration = time.perf_counter() - self._t0
+        if error is not None:
+            self.error = type(error).__name__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "path": self.path,
+            "cid": self.cid,
+            "start": self.start,
+            "duration": self.duration,
+            "error": self.error,
+            "phases": [{"name": name, "start": start, "duration": duration} for name, start, duration in self.phases],
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, trace_id={self.trace_id}, span_id={self.span_id})"
+
+
+class SpanExporter:
+    def export(self, span: Span) -> None:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+
+class JSONLinesExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line"""
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        self.path = path
+        self.__file: IO[str] = open(path, "a", buffering=buffer_size, encoding="utf8")
+
+    def export(self, span: Span) -> None:
+        self.__file.write(json.dumps(span.to_dict(), separators=(",", ":")) + "\n")
+
+    def flush(self) -> None:
+        self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path})"
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter) -> None:
+        self.exporter = exporter
+
+    def start_span(
+        self, event: "Event", path: str, started: Union[float, None] = None, parent: Union[Span, None] = None
+    ) -> Span:
+        """Start the span of an event, its parent defaults to the span of the running event (if any)"""
+        span = Span(event.route.name, path, event.ctx.cid, parent=parent or current_span.get(), started=started)
+        event.span = span
+        return span
+
+    def finish_span(self, span: Span, error: Union[BaseException, None] = None) -> None:
+        span.finish(error)
+        self.exporter.export(span)
+
+    def close(self) -> None:
+        self.exporter.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(exporter={self.exporter})"
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import socket
+from functools import partial
+from typing import Any, Dict, List, Tuple, Union
+
+from .context import Context
+from .errors import ListenerError
+from .listener import Listener
+
+logger = logging.getLogger(__name__)
+
+Datagram = Tuple[bytes, Any]
+
+
+class UDPListener(Listener):
+    """Listen to UDP datagrams, each datagram is the path of an event by default.
+
+    The socket is drained `batch_size` datagrams at a time into a reusable buffer. With `batch_event`,
+    all the datagrams of a batch are given to one event instead, as the event data `datagrams`:
+
+        >>> app = UDPListener("0.0.0.0", 8125, batch_event="telemetry")
+        >>> @app.on_event("telemetry")
+        ... async def telemetry(datagrams: Data):
+        ...     for payload, addr in datagrams:
+        ...         ...
+
+    Datagrams are received with `loop.add_reader`, which the Windows proactor event loop does not support.
+    """
+
+    def __init__(
+        self,
+        host: Union[str, None],
+        port: int,
+        batch_size: int = 64,
+        buffer_size: int = 65535,
+        batch_event: Union[str, None] = None,
+        encoding: str = "utf8",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param host: Interface to bind, None means all
+        :param port: Port to bind, 0 means a random one
+        :param batch_size: Max datagrams read from the socket at once
+        :param buffer_size: Size of the receive buffer, longer datagrams are truncated
+        :param batch_event: Path of the event triggered per batch, None means an event per datagram
+        :param encoding: Encoding of the datagrams used as paths
+        :param kwargs: See `Listener`
+        """
+        super().__init__(**kwargs)
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_event = batch_event
+        self.encoding = encoding
+        self.sock: Union[socket.socket, None] = None
+        self.received = 0
+        self.dropped = 0
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+
+    async def listen(self) -> None:
+        loop = asyncio.get_event_loop()
+        family, kind, proto, _, address = socket.getaddrinfo(
+            self.host, self.port, type=socket.SOCK_DGRAM, flags=socket.AI_PASSIVE
+        )[0]
+        sock = socket.socket(family, kind, proto)
+        if family == socket.AF_INET6 and self.host is None:  # the IPv4 clients too
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        sock.setblocking(False)
+        sock.bind(address)
+        self.sock = sock
+        loop.add_reader(sock.fileno(), self._on_readable)
+        self.add_shutdown_callback(self._close)
+
+    @property
+    def address(self) -> Any:
+        return self.sock.getsockname() if self.sock is not None else None
+
+    def _on_readable(self) -> None:
+        assert self.sock is not None
+        recvfrom_into = self.sock.recvfrom_into
+        buffer, view = self._buffer, self._view
+        batch: List[Datagram] = []
+        for _ in range(self.batch_size):
+            try:
+                nbytes, addr = recvfrom_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                logger.warning("Receive error: %r", e)
+                break
+            batch.append((view[:nbytes].tobytes(), addr))
+
+        self.received += len(batch)
+        if self.batch_event is not None:
+            if batch:
+                self.emit(self.batch_event, {"datagrams": batch})
+        else:
+            for payload, addr in batch:
+                self.on_datagram(payload, addr)
+
+    def on_datagram(self, payload: bytes, addr: Any) -> None:
+        """Trigger the event of a datagram, override it to parse another protocol"""
+        path = payload.decode(self.encoding, "replace").strip()
+        self.emit(path, {"datagram": payload, "addr": addr})
+
+    def emit(self, path: str, data: Dict[str, Any]) -> None:
+        """Trigger an event in a new context, dropped once the event is done"""
+        ctx = self.new_ctx()
+        try:
+            future = ctx.trigger_event(path, data=data)
+        except ListenerError as e:
+            ctx.drop()
+            self.dropped += 1
+            logger.debug("Datagram %r dropped: %r", path, e)
+        else:
+            future.add_done_callback(partial(self._on_done, ctx))
+
+    @staticmethod
+    def _on_done(ctx: Context, _: Any) -> None:
+        ctx.drop()
+
+    def sendto(self, payload: bytes, addr: Any) -> None:
+        """Send a datagram, it is dropped when the socket buffer is full"""
+        assert self.sock is not None
+        try:
+            self.sock.sendto(payload, addr)
+        except (BlockingIOError, InterruptedError):
+            logger.debug("Send buffer full, datagram to %s dropped", addr)
+
+    async def _close(self) -> None:
+        if self.sock is not None:
+            asyncio.get_event_loop().remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(host={self.host}, port={self.port}, received={self.received})"
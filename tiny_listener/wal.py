@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Union
+
+from .codec import Default, EventFrame, decode_event, encode_event
+
+logger = logging.getLogger(__name__)
+
+ENTRY = struct.Struct("<IIBQ")
+"""Length of the payload, CRC32 of the rest of the entry, kind, sequence number"""
+ADD, DONE = 1, 2
+SUFFIX = ".wal"
+
+
+class WriteAheadLog:
+    """Durable log of the triggered events, the events which did not complete are replayed on the next start.
+
+        >>> app = App(wal=WriteAheadLog("/var/lib/app/wal"))
+
+    `Listener.trigger_event` appends every event (path, cid and data, see `tiny_listener.codec`) and dispatches it
+    once its entry is committed, so a handler never runs for an event the log could lose. The event is marked done
+    once it completes, failed or not. The log is written by group commit: the entries appended while the previous
+    batch is synced are written and synced together, so durability costs one `fsync` per batch of events.
+    With `wait_commit=False` the events are dispatched at once and the entries not committed yet are lost on a crash.
+
+    The log is split in segments of `segment_size` bytes, a segment is removed once all its events and the events
+    of the older segments are done.
+    An event done right before a crash may be replayed, handlers should be idempotent.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 << 20,
+        commit_delay: float = 0,
+        fsync: bool = True,
+        default: Union[Default, None] = None,
+        wait_commit: bool = True,
+    ) -> None:
+        """
+        :param directory: Directory of the segments, created if needed
+        :param segment_size: Bytes of a segment before a new one is started
+        :param commit_delay: Seconds to wait for more entries before a commit, 0 means the next loop iteration
+        :param fsync: Sync every commit to the disk, False only writes it to the OS
+        :param default: Convert the event data which can not be encoded, see `tiny_listener.codec.dumps`
+        :param wait_commit: Dispatch an event once its entry is committed, False dispatches it at once
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self.commit_delay = commit_delay
+        self.fsync = fsync
+        self.default = default
+        self.wait_commit = wait_commit
+        self.commits = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending: Dict[int, Union[str, None]] = {}  # seq -> segment, None if not written yet
+        self._segments: Dict[str, int] = {}  # segment -> pending events
+        self._buffer = bytearray()
+        self._unwritten: List[int] = []
+        self._waiters: List["asyncio.Future[None]"] = []
+        self._batch: "Union[asyncio.Future[None], None]" = None
+        self._scheduled = False
+        self._committing: "Union[asyncio.Future[None], None]" = None
+        self._recovered: List[EventFrame] = []
+        self._old: List[str] = []
+        self._seq = 0
+        self._recover()
+        self._segment = ""
+        self._fd = -1
+        self._size = 0
+        self._start_segment()
+
+    @property
+    def pending(self) -> int:
+        """Events appended and not done yet"""
+        return len(self._pending)
+
+    def _recover(self) -> None:
+        adds: Dict[int, bytes] = {}
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(SUFFIX):
+                continue
+            segment = os.path.join(self.directory, name)
+            for kind, seq, payload in _read_segment(segment):
+                self._seq = max(self._seq, seq + 1)
+                if kind == ADD:
+                    adds[seq] = payload
+                else:
+                    adds.pop(seq, None)
+            self._segments[segment] = 1  # kept until the recovered events are taken
+            self._old.append(segment)
+        self._recovered = [decode_event(adds[seq], copy=True) for seq in sorted(adds)]
+        if self._recovered:
+            logger.info("%d event(s) recovered from %s", len(self._recovered), self.directory)
+
+    def recover(self) -> List[EventFrame]:
+        """Take the events which did not complete in the previous run, in order.
+
+        The old segments are removed at the next commit, the recovered events must be appended again by then.
+        """
+        recovered, self._recovered = self._recovered, []
+        for segment in self._old:
+            self._segments[segment] -= 1
+        self._old = []
+        return recovered
+
+    def _start_segment(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._segment = os.path.join(self.directory, f"{self._seq:020d}{SUFFIX}")
+        self._fd = os.open(self._segment, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = os.fstat(self._fd).st_size
+        self._segments.setdefault(self._segment, 0)
+        if self.fsync:
+            _sync_directory(self.directory)
+
+    def append(self, path: str, cid: Union[str, None], data: Union[Dict[str, Any], None]) -> int:
+        """Append an event, it is written at the next commit
+
+        :return: Sequence number of the event, see `done`
+        :raises TypeError: The data can not be encoded
+        """
+        seq = self._seq
+        self._write(ADD, seq, encode_event(path, cid, data, default=self.default))
+        self._seq += 1
+        self._pending[seq] = None
+        self._unwritten.append(seq)
+        return seq
+
+    def done(self, seq: int) -> None:
+        """Mark an event as done, it will not be replayed"""
+        segment = self._pending.pop(seq, ...)
+        if segment is ...:
+            return
+        self._write(DONE, seq, b"")
+        if segment is not None:
+            self._segments[segment] -= 1
+
+    def _write(self, kind: int, seq: int, payload: bytes) -> None:
+        header = ENTRY.pack(len(payload), 0, kind, seq)
+        crc = zlib.crc32(payload, zlib.crc32(header[8:]))
+        self._buffer += ENTRY.pack(len(payload), crc, kind, seq)
+        self._buffer += payload
+        if not self._scheduled and self._committing is None:
+            self._scheduled = True
+            loop = asyncio.get_event_loop()
+            if self.commit_delay:
+                loop.call_later(self.commit_delay, self._start_commit)
+            else:
+                loop.call_soon(self._start_commit)
+
+    def _start_commit(self) -> None:
+        self._scheduled = False
+        if self._committing is None:
+            self._committing = asyncio.ensure_future(self._commit())
+
+    async def _commit(self) -> None:
+        loop = asyncio.get_event_loop()
+        waiters: List["asyncio.Future[None]"] = []
+        try:
+            while True:
+                buffer, self._buffer = self._buffer, bytearray()
+                unwritten, self._unwritten = self._unwritten, []
+                waiters, self._waiters = self._waiters, []
+                self._batch = None
+                segment = self._segment
+                if buffer:
+                    with memoryview(buffer) as view:
+                        while view:
+                            view = view[os.write(self._fd, view) :]
+                    self._size += len(buffer)
+                    for seq in unwritten:
+                        if seq in self._pending:
+                            self._pending[seq] = segment
+                            self._segments[segment] += 1
+                    if self.fsync:
+                        await loop.run_in_executor(None, os.fsync, self._fd)
+                    self.commits += 1
+                if self._size >= self.segment_size:
+                    self._start_segment()
+                self._remove_done()
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+                if not self._buffer and not self._waiters:
+                    return
+        except OSError as e:
+            logger.error("Failed to commit %s: %r", self._segment, e)
+            for waiter in waiters + self._waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            self._waiters = []
+            self._batch = None
+        finally:
+            self._committing = None
+
+    def _remove_done(self) -> None:
+        # oldest first: a segment holds the DONE entries of the events of the older ones, it is removed after them
+        for segment, count in list(self._segments.items()):
+            if count > 0 or segment == self._segment:
+                break
+            del self._segments[segment]
+            try:
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+
+    def committed(self) -> "asyncio.Future[None]":
+        """Future of the commit of the entries appended so far, shared by all the entries of a batch"""
+        if self._batch is None:
+            self._batch = asyncio.get_event_loop().create_future()
+            self._waiters.append(self._batch)
+            if not self._scheduled and self._committing is None:
+                self._scheduled = True
+                asyncio.get_event_loop().call_soon(self._start_commit)
+        return self._batch
+
+    async def sync(self) -> None:
+        """Wait until the entries appended so far are committed"""
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        self._start_commit()
+        await asyncio.shield(waiter)
+
+    async def close(self) -> None:
+        """Commit the last entries, the events still pending are replayed on the next start"""
+        await self.sync()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(directory={self.directory}, pending={self.pending})"
+
+
+def _read_segment(segment: str) -> List[Any]:
+    """Entries of a segment, up to the first torn or corrupted one"""
+    with open(segment, "rb") as f:
+        content = f.read()
+    entries = []
+    pos = 0
+    while pos + ENTRY.size <= len(content):
+        size, crc, kind, seq = ENTRY.unpack_from(content, pos)
+        end = pos + ENTRY.size + size
+        if end > len(content) or zlib.crc32(content[pos + 8 : end]) != crc or kind not in (ADD, DONE):
+            logger.warning("%s is corrupted at byte %d, ignoring the rest", segment, pos)
+            break
+        entries.append((kind, seq, content[pos + ENTRY.size : end]))
+        pos = end
+    return entries
+
+
+def _sync_directory(directory: str) -> None:
+    """Make the creation of a file durable"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)